@@ -10,11 +10,29 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from src.models.database import init_db
+from src.config import get_settings
+from src.core.scheduler import LLMScheduler
+from src.core.single_flight import SingleFlight
+from src.models.database import AsyncSessionLocal, SessionLocal, async_engine, init_db
+from src.services import (
+    OllamaService,
+    QueryEmbeddingCache,
+    SemanticAnswerCache,
+    SearchResultCache,
+    DishCatalog,
+    DishScopeCache,
+    HealthMonitor,
+    TraceWriter,
+    WarmupService,
+    NumpyVectorIndex,
+    Reranker,
+    TextService,
+)
 from src.api.routers import (
     health_router,
     dishes_router,
     chat_router,
+    search_router,
     admin_router,
 )
 
@@ -24,8 +42,54 @@ async def lifespan(app: FastAPI):
     """Application lifespan handler for startup/shutdown events."""
     # Startup
     init_db()
+    settings = get_settings()
+    app.state.ollama_service = OllamaService(
+        settings,
+        chat_scheduler=LLMScheduler(
+            "chat",
+            max_concurrency=settings.llm_chat_max_concurrency,
+            max_queue=settings.llm_chat_max_queue,
+        ),
+        embed_scheduler=LLMScheduler(
+            "embed",
+            max_concurrency=settings.llm_embed_max_concurrency,
+            max_queue=settings.llm_embed_max_queue,
+        ),
+    )
+    app.state.query_embedding_cache = QueryEmbeddingCache(settings)
+    app.state.answer_cache = SemanticAnswerCache(settings)
+    app.state.search_cache = SearchResultCache(settings)
+    # Pre-serialized /dishes snapshot, reloaded when the dish rows change
+    app.state.dish_catalog = DishCatalog(AsyncSessionLocal, settings)
+    app.state.dish_catalog.start()
+    # Per-dish embedding counts for search planning, scoped to the catalog version
+    app.state.scope_cache = DishScopeCache(settings, app.state.dish_catalog)
+    app.state.chat_single_flight = SingleFlight()
+    app.state.trace_writer = TraceWriter(SessionLocal, settings)
+    app.state.trace_writer.start()
+    # Warm models and index pages in the background; /ready waits for it
+    app.state.warmup = WarmupService(app.state.ollama_service, SessionLocal, settings)
+    app.state.warmup.start()
+    # Probes share rate-limited dependency checks and estimated table stats
+    app.state.health_monitor = HealthMonitor(app.state.ollama_service, AsyncSessionLocal, settings)
+    # In-process vector index (loaded in the background; pgvector serves until then)
+    app.state.vector_index = None
+    if settings.vector_index_backend == "numpy":
+        app.state.vector_index = NumpyVectorIndex(SessionLocal, settings)
+        app.state.vector_index.start()
+    # Re-ranker caches per-chunk features, so it lives as long as the app
+    app.state.reranker = None
+    if settings.rerank_enabled:
+        app.state.reranker = Reranker(TextService(settings), settings)
     yield
-    # Shutdown (nothing to do)
+    # Shutdown
+    if app.state.vector_index is not None:
+        await app.state.vector_index.aclose()
+    await app.state.dish_catalog.aclose()
+    await app.state.warmup.aclose()
+    await app.state.trace_writer.aclose()
+    await app.state.ollama_service.aclose()
+    await async_engine.dispose()
 
 
 def create_app() -> FastAPI:
@@ -50,6 +114,7 @@ def create_app() -> FastAPI:
     app.include_router(health_router)
     app.include_router(dishes_router)
     app.include_router(chat_router)
+    app.include_router(search_router)
     app.include_router(admin_router)
 
     return app
@@ -21,7 +21,7 @@ def _dish_template(
     notes: str,
     pairing: str,
 ) -> dict[str, Any]:
-    """Build a dish data dictionary with ficha text."""
+    """Build a dish data dictionary with ficha text and its structured facts."""
     ficha = (
         f"FICHA TÉCNICA (fuente de verdad)\n"
         f"Plato: {name}\n"
@@ -45,6 +45,13 @@ def _dish_template(
         "price_cents": price_cents,
         "tags": tags,
         "ficha_text": ficha,
+        "facts": {
+            "allergens_contains": allergens_contains,
+            "allergens_may_contain": allergens_may_contain,
+            "gluten_free": gluten_free,
+            "vegan": vegan,
+            "vegetarian": vegetarian,
+        },
     }
 
 
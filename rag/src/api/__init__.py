@@ -1,29 +1,71 @@
 from .dependencies import (
     get_settings,
     get_db,
+    get_async_db,
     get_ollama_service,
+    get_query_embedding_cache,
+    get_answer_cache,
+    get_search_cache,
+    get_dish_catalog,
+    get_scope_cache,
+    get_health_monitor,
+    get_chat_single_flight,
+    get_trace_writer,
+    get_warmup_service,
+    get_vector_index,
+    get_reranker,
     get_text_service,
     get_prompt_service,
     get_dish_repo,
     get_chunk_repo,
     get_embedding_repo,
     get_chat_repo,
+    get_fact_repo,
+    get_fact_service,
+    get_async_dish_repo,
+    get_async_chunk_repo,
+    get_async_embedding_repo,
+    get_async_chat_repo,
+    get_async_fact_repo,
     get_retrieval_service,
     get_chat_service,
+    get_search_service,
     get_seed_service,
+    get_indexing_service,
 )
 
 __all__ = [
     "get_settings",
     "get_db",
+    "get_async_db",
     "get_ollama_service",
+    "get_query_embedding_cache",
+    "get_answer_cache",
+    "get_search_cache",
+    "get_dish_catalog",
+    "get_scope_cache",
+    "get_health_monitor",
+    "get_chat_single_flight",
+    "get_trace_writer",
+    "get_warmup_service",
+    "get_vector_index",
+    "get_reranker",
     "get_text_service",
     "get_prompt_service",
     "get_dish_repo",
     "get_chunk_repo",
     "get_embedding_repo",
     "get_chat_repo",
+    "get_fact_repo",
+    "get_fact_service",
+    "get_async_dish_repo",
+    "get_async_chunk_repo",
+    "get_async_embedding_repo",
+    "get_async_chat_repo",
+    "get_async_fact_repo",
     "get_retrieval_service",
     "get_chat_service",
+    "get_search_service",
     "get_seed_service",
+    "get_indexing_service",
 ]
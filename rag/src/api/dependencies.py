@@ -1,15 +1,23 @@
-from typing import Annotated, Generator
+from typing import Annotated, AsyncGenerator, Generator, cast
 
-from fastapi import Depends
+from fastapi import Depends, Request
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from src.config import Settings, get_settings as _get_settings
-from src.models.database import SessionLocal
+from src.core.single_flight import SingleFlight
+from src.models.database import SessionLocal, AsyncSessionLocal
 from src.repositories import (
     DishRepository,
     ChunkRepository,
     EmbeddingRepository,
     ChatRepository,
+    DishFactRepository,
+    AsyncDishRepository,
+    AsyncChunkRepository,
+    AsyncEmbeddingRepository,
+    AsyncChatRepository,
+    AsyncDishFactRepository,
 )
 from src.services import (
     OllamaService,
@@ -17,7 +25,20 @@ from src.services import (
     PromptService,
     RetrievalService,
     ChatService,
+    SearchService,
+    SearchResultCache,
+    DishCatalog,
+    DishScopeCache,
+    HealthMonitor,
     SeedService,
+    IndexingService,
+    QueryEmbeddingCache,
+    SemanticAnswerCache,
+    TraceWriter,
+    FactService,
+    WarmupService,
+    NumpyVectorIndex,
+    Reranker,
 )
 
 
@@ -35,14 +56,76 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """Get async database session (request path)."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 # Type aliases for cleaner dependency injection
 SettingsDep = Annotated[Settings, Depends(get_settings)]
 DbDep = Annotated[Session, Depends(get_db)]
+AsyncDbDep = Annotated[AsyncSession, Depends(get_async_db)]
+
+
+def get_ollama_service(request: Request) -> OllamaService:
+    """Get the app-lifetime Ollama service (shared HTTP connection pool)."""
+    return cast(OllamaService, request.app.state.ollama_service)
+
+
+def get_query_embedding_cache(request: Request) -> QueryEmbeddingCache:
+    """Get the app-lifetime query embedding cache."""
+    return cast(QueryEmbeddingCache, request.app.state.query_embedding_cache)
+
+
+def get_answer_cache(request: Request) -> SemanticAnswerCache:
+    """Get the app-lifetime semantic answer cache."""
+    return cast(SemanticAnswerCache, request.app.state.answer_cache)
+
+
+def get_search_cache(request: Request) -> SearchResultCache:
+    """Get the app-lifetime /search result cache."""
+    return cast(SearchResultCache, request.app.state.search_cache)
+
+
+def get_dish_catalog(request: Request) -> DishCatalog:
+    """Get the app-lifetime dish catalog snapshot."""
+    return cast(DishCatalog, request.app.state.dish_catalog)
+
+
+def get_scope_cache(request: Request) -> DishScopeCache:
+    """Get the app-lifetime cache of per-dish embedding counts."""
+    return cast(DishScopeCache, request.app.state.scope_cache)
+
+
+def get_health_monitor(request: Request) -> HealthMonitor:
+    """Get the app-lifetime health monitor."""
+    return cast(HealthMonitor, request.app.state.health_monitor)
+
 
+def get_chat_single_flight(request: Request) -> SingleFlight:
+    """Get the app-lifetime coalescer for identical in-flight chat requests."""
+    return cast(SingleFlight, request.app.state.chat_single_flight)
 
-def get_ollama_service(settings: SettingsDep) -> OllamaService:
-    """Get Ollama service instance."""
-    return OllamaService(settings)
+
+def get_trace_writer(request: Request) -> TraceWriter:
+    """Get the app-lifetime write-behind writer for chat turns and traces."""
+    return cast(TraceWriter, request.app.state.trace_writer)
+
+
+def get_warmup_service(request: Request) -> WarmupService:
+    """Get the app-lifetime warm-up service (readiness)."""
+    return cast(WarmupService, request.app.state.warmup)
+
+
+def get_vector_index(request: Request) -> NumpyVectorIndex | None:
+    """Get the app-lifetime in-process vector index (None with the pgvector backend)."""
+    return cast("NumpyVectorIndex | None", request.app.state.vector_index)
+
+
+def get_reranker(request: Request) -> Reranker | None:
+    """Get the app-lifetime re-ranker (None when re-ranking is disabled)."""
+    return cast("Reranker | None", request.app.state.reranker)
 
 
 def get_text_service(settings: SettingsDep) -> TextService:
@@ -76,34 +159,112 @@ def get_chat_repo(db: DbDep) -> ChatRepository:
     return ChatRepository(db)
 
 
+def get_fact_repo(db: DbDep) -> DishFactRepository:
+    """Get dish fact repository instance."""
+    return DishFactRepository(db)
+
+
+# Async repository dependencies (request path)
+def get_async_dish_repo(db: AsyncDbDep) -> AsyncDishRepository:
+    """Get async dish repository instance."""
+    return AsyncDishRepository(db)
+
+
+def get_async_chunk_repo(db: AsyncDbDep) -> AsyncChunkRepository:
+    """Get async chunk repository instance."""
+    return AsyncChunkRepository(db)
+
+
+def get_async_embedding_repo(db: AsyncDbDep) -> AsyncEmbeddingRepository:
+    """Get async embedding repository instance."""
+    return AsyncEmbeddingRepository(db)
+
+
+def get_async_chat_repo(db: AsyncDbDep) -> AsyncChatRepository:
+    """Get async chat repository instance."""
+    return AsyncChatRepository(db)
+
+
+def get_async_fact_repo(db: AsyncDbDep) -> AsyncDishFactRepository:
+    """Get async dish fact repository instance."""
+    return AsyncDishFactRepository(db)
+
+
 # Service dependencies with type aliases
 OllamaServiceDep = Annotated[OllamaService, Depends(get_ollama_service)]
 TextServiceDep = Annotated[TextService, Depends(get_text_service)]
 PromptServiceDep = Annotated[PromptService, Depends(get_prompt_service)]
+QueryEmbeddingCacheDep = Annotated[QueryEmbeddingCache, Depends(get_query_embedding_cache)]
+AnswerCacheDep = Annotated[SemanticAnswerCache, Depends(get_answer_cache)]
+SearchCacheDep = Annotated[SearchResultCache, Depends(get_search_cache)]
+DishCatalogDep = Annotated[DishCatalog, Depends(get_dish_catalog)]
+ScopeCacheDep = Annotated[DishScopeCache, Depends(get_scope_cache)]
+HealthMonitorDep = Annotated[HealthMonitor, Depends(get_health_monitor)]
+ChatSingleFlightDep = Annotated[SingleFlight, Depends(get_chat_single_flight)]
+TraceWriterDep = Annotated[TraceWriter, Depends(get_trace_writer)]
+WarmupServiceDep = Annotated[WarmupService, Depends(get_warmup_service)]
+VectorIndexDep = Annotated[NumpyVectorIndex | None, Depends(get_vector_index)]
+RerankerDep = Annotated[Reranker | None, Depends(get_reranker)]
 DishRepoDep = Annotated[DishRepository, Depends(get_dish_repo)]
 ChunkRepoDep = Annotated[ChunkRepository, Depends(get_chunk_repo)]
 EmbeddingRepoDep = Annotated[EmbeddingRepository, Depends(get_embedding_repo)]
 ChatRepoDep = Annotated[ChatRepository, Depends(get_chat_repo)]
+FactRepoDep = Annotated[DishFactRepository, Depends(get_fact_repo)]
+AsyncDishRepoDep = Annotated[AsyncDishRepository, Depends(get_async_dish_repo)]
+AsyncChunkRepoDep = Annotated[AsyncChunkRepository, Depends(get_async_chunk_repo)]
+AsyncEmbeddingRepoDep = Annotated[AsyncEmbeddingRepository, Depends(get_async_embedding_repo)]
+AsyncChatRepoDep = Annotated[AsyncChatRepository, Depends(get_async_chat_repo)]
+AsyncFactRepoDep = Annotated[AsyncDishFactRepository, Depends(get_async_fact_repo)]
+
+
+def get_fact_service(
+    fact_repo: AsyncFactRepoDep,
+    dish_repo: AsyncDishRepoDep,
+    text_service: TextServiceDep,
+) -> FactService:
+    """Get fact service instance."""
+    return FactService(fact_repo, dish_repo, text_service)
+
+
+FactServiceDep = Annotated[FactService, Depends(get_fact_service)]
 
 
 def get_retrieval_service(
-    embedding_repo: EmbeddingRepoDep,
+    embedding_repo: AsyncEmbeddingRepoDep,
     settings: SettingsDep,
+    vector_index: VectorIndexDep,
+    reranker: RerankerDep,
+    scope_cache: ScopeCacheDep,
 ) -> RetrievalService:
     """Get retrieval service instance."""
-    return RetrievalService(embedding_repo, settings)
+    return RetrievalService(
+        embedding_repo,
+        settings,
+        vector_index=vector_index,
+        reranker=reranker,
+        scope_cache=scope_cache,
+    )
+
+
+RetrievalServiceDep = Annotated[RetrievalService, Depends(get_retrieval_service)]
 
 
 def get_chat_service(
     ollama_service: OllamaServiceDep,
     text_service: TextServiceDep,
     prompt_service: PromptServiceDep,
-    chat_repo: ChatRepoDep,
-    embedding_repo: EmbeddingRepoDep,
+    chat_repo: AsyncChatRepoDep,
+    chunk_repo: AsyncChunkRepoDep,
+    embedding_repo: AsyncEmbeddingRepoDep,
+    retrieval_service: RetrievalServiceDep,
+    embedding_cache: QueryEmbeddingCacheDep,
+    answer_cache: AnswerCacheDep,
+    single_flight: ChatSingleFlightDep,
+    trace_writer: TraceWriterDep,
+    fact_service: FactServiceDep,
     settings: SettingsDep,
 ) -> ChatService:
     """Get chat service instance."""
-    retrieval_service = RetrievalService(embedding_repo, settings)
     return ChatService(
         ollama_service=ollama_service,
         text_service=text_service,
@@ -112,6 +273,12 @@ def get_chat_service(
         chat_repo=chat_repo,
         embedding_repo=embedding_repo,
         settings=settings,
+        embedding_cache=embedding_cache,
+        answer_cache=answer_cache,
+        chunk_repo=chunk_repo,
+        single_flight=single_flight if settings.chat_single_flight_enabled else None,
+        trace_writer=trace_writer if settings.trace_write_behind_enabled else None,
+        fact_service=fact_service if settings.fact_answers_enabled else None,
     )
 
 
@@ -119,6 +286,7 @@ def get_seed_service(
     dish_repo: DishRepoDep,
     chunk_repo: ChunkRepoDep,
     text_service: TextServiceDep,
+    fact_repo: FactRepoDep,
     settings: SettingsDep,
 ) -> SeedService:
     """Get seed service instance."""
@@ -127,10 +295,44 @@ def get_seed_service(
         chunk_repo=chunk_repo,
         text_service=text_service,
         settings=settings,
+        fact_repo=fact_repo,
+    )
+
+
+def get_indexing_service(
+    chunk_repo: ChunkRepoDep,
+    embedding_repo: EmbeddingRepoDep,
+    ollama_service: OllamaServiceDep,
+    settings: SettingsDep,
+) -> IndexingService:
+    """Get indexing service instance."""
+    return IndexingService(
+        chunk_repo=chunk_repo,
+        embedding_repo=embedding_repo,
+        ollama_service=ollama_service,
+        settings=settings,
+    )
+
+
+def get_search_service(
+    ollama_service: OllamaServiceDep,
+    text_service: TextServiceDep,
+    retrieval_service: RetrievalServiceDep,
+    embedding_cache: QueryEmbeddingCacheDep,
+    search_cache: SearchCacheDep,
+) -> SearchService:
+    """Get search service instance."""
+    return SearchService(
+        ollama_service=ollama_service,
+        text_service=text_service,
+        retrieval_service=retrieval_service,
+        embedding_cache=embedding_cache,
+        result_cache=search_cache,
     )
 
 
 # Composite type aliases for routers
-RetrievalServiceDep = Annotated[RetrievalService, Depends(get_retrieval_service)]
 ChatServiceDep = Annotated[ChatService, Depends(get_chat_service)]
 SeedServiceDep = Annotated[SeedService, Depends(get_seed_service)]
+IndexingServiceDep = Annotated[IndexingService, Depends(get_indexing_service)]
+SearchServiceDep = Annotated[SearchService, Depends(get_search_service)]
@@ -1,52 +1,57 @@
+import asyncio
+
 from fastapi import APIRouter, HTTPException
 
 from src.schemas import SeedResponse, IndexResponse
 from src.api.dependencies import (
     SeedServiceDep,
+    DishCatalogDep,
     ChunkRepoDep,
-    EmbeddingRepoDep,
-    OllamaServiceDep,
+    IndexingServiceDep,
+    SearchCacheDep,
+    ScopeCacheDep,
 )
-from src.core.exceptions import OllamaError
+from src.core.exceptions import OllamaError, OllamaUnavailableError, OverloadedError
+from .chat import _overloaded
 
 
 router = APIRouter(tags=["admin"])
 
 
 @router.post("/seed", response_model=SeedResponse)
-def seed(seed_service: SeedServiceDep) -> SeedResponse:
+def seed(seed_service: SeedServiceDep, dish_catalog: DishCatalogDep) -> SeedResponse:
     """Seed the database with initial dish data."""
     ok, message = seed_service.seed_dishes()
+    if ok:
+        dish_catalog.invalidate()
     return SeedResponse(ok=ok, message=message)
 
 
 @router.post("/index", response_model=IndexResponse)
 async def index_embeddings(
     chunk_repo: ChunkRepoDep,
-    embedding_repo: EmbeddingRepoDep,
-    ollama_service: OllamaServiceDep,
+    indexing_service: IndexingServiceDep,
+    search_cache: SearchCacheDep,
+    scope_cache: ScopeCacheDep,
 ) -> IndexResponse:
     """Generate embeddings for chunks that don't have them yet."""
-    chunks = chunk_repo.get_unindexed()
-
-    if not chunks:
+    # Sync session: keep its queries off the event loop
+    if not await asyncio.to_thread(chunk_repo.get_unindexed_page, 0, 1):
         return IndexResponse(
             ok=True,
             message="No hay chunks pendientes de indexar.",
         )
 
     try:
-        created = 0
-        for chunk in chunks:
-            embedding = await ollama_service.generate_embedding(chunk.content)
-            embedding_repo.create(chunk_id=chunk.id, embedding=embedding)
-            created += 1
-
-        embedding_repo.commit()
-
+        result = await indexing_service.index_pending()
+        if result.embeddings_created:
+            search_cache.clear()
+            scope_cache.clear()
         return IndexResponse(
             ok=True,
-            embeddings_created=created,
+            embeddings_created=result.embeddings_created,
         )
+    except (OverloadedError, OllamaUnavailableError) as e:
+        raise _overloaded(e)
     except OllamaError as e:
         raise HTTPException(status_code=502, detail=f"{e.message}: {e.detail or ''}")
@@ -1,14 +1,38 @@
+import json
+import math
+from typing import AsyncIterator
+
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 
 from src.schemas import ChatIn, ChatOut
 from src.api.dependencies import ChatServiceDep
-from src.services.chat_service import ChatRequest
-from src.core.exceptions import OllamaError
+from src.services.chat_service import ChatRequest, ChatStreamEvent
+from src.core.exceptions import (
+    OllamaError,
+    OllamaUnavailableError,
+    OverloadedError,
+    QueueFullError,
+)
 
 
 router = APIRouter(tags=["chat"])
 
 
+def _sse(event: ChatStreamEvent) -> str:
+    """Format a stream event as a server-sent event frame."""
+    return f"event: {event.event}\ndata: {json.dumps(event.data, ensure_ascii=False)}\n\n"
+
+
+def _overloaded(e: OverloadedError | OllamaUnavailableError) -> HTTPException:
+    """Map a fast-fail rejection to 429 (queue full) or 503 (deadline, open circuit)."""
+    return HTTPException(
+        status_code=429 if isinstance(e, QueueFullError) else 503,
+        detail=f"{e.message}: {e.detail or ''}",
+        headers={"Retry-After": str(math.ceil(e.retry_after))},
+    )
+
+
 @router.post("/chat", response_model=ChatOut)
 async def chat(
     req: ChatIn,
@@ -20,7 +44,59 @@ async def chat(
             question=req.question,
             dish_id=req.dish_id,
             top_k=req.top_k,
+            ef_search=req.ef_search,
         )
         return await chat_service.process_query(request)
+    except (OverloadedError, OllamaUnavailableError) as e:
+        raise _overloaded(e)
     except OllamaError as e:
         raise HTTPException(status_code=502, detail=f"{e.message}: {e.detail or ''}")
+
+
+@router.post("/chat/stream")
+async def chat_stream(
+    req: ChatIn,
+    chat_service: ChatServiceDep,
+) -> StreamingResponse:
+    """Process a chat query, streaming sources and answer tokens as server-sent events."""
+    request = ChatRequest(
+        question=req.question,
+        dish_id=req.dish_id,
+        top_k=req.top_k,
+        ef_search=req.ef_search,
+    )
+    events = chat_service.stream_query(request)
+
+    # Run retrieval before answering so failures there still map to a 502
+    try:
+        first = await anext(events)
+    except (OverloadedError, OllamaUnavailableError) as e:
+        raise _overloaded(e)
+    except OllamaError as e:
+        raise HTTPException(status_code=502, detail=f"{e.message}: {e.detail or ''}")
+
+    async def body() -> AsyncIterator[str]:
+        yield _sse(first)
+        try:
+            async for event in events:
+                yield _sse(event)
+        except (OverloadedError, OllamaUnavailableError) as e:
+            yield _sse(
+                ChatStreamEvent(
+                    event="error",
+                    data={
+                        "detail": f"{e.message}: {e.detail or ''}",
+                        "retry_after": math.ceil(e.retry_after),
+                    },
+                )
+            )
+        except OllamaError as e:
+            yield _sse(
+                ChatStreamEvent(event="error", data={"detail": f"{e.message}: {e.detail or ''}"})
+            )
+
+    return StreamingResponse(
+        body(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
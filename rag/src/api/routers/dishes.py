@@ -1,23 +1,59 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Header, HTTPException, Query, Response
 
-from src.schemas import DishOut
-from src.api.dependencies import DishRepoDep
+from src.schemas import DishView
+from src.api.dependencies import DishCatalogDep
+from src.services.dish_catalog import DISH_FIELDS
 
 
 router = APIRouter(tags=["dishes"])
 
 
-@router.get("/dishes", response_model=list[DishOut])
-def list_dishes(dish_repo: DishRepoDep) -> list[DishOut]:
-    """List all active dishes."""
-    dishes = dish_repo.get_all_active()
-    return [
-        DishOut(
-            id=d.id,
-            name=d.name,
-            category=d.category,
-            price_cents=d.price_cents,
-            tags=d.tags or [],
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Whether an If-None-Match header (weak comparison) matches ``etag``."""
+    if not if_none_match:
+        return False
+    tags = [t.strip().removeprefix("W/") for t in if_none_match.split(",")]
+    return "*" in tags or etag in tags
+
+
+def _fields(fields: str | None) -> tuple[str, ...]:
+    """Parse a comma-separated field selection, keeping catalog order."""
+    if not fields:
+        return DISH_FIELDS
+    wanted = {f.strip() for f in fields.split(",") if f.strip()}
+    unknown = wanted - set(DISH_FIELDS)
+    if unknown:
+        raise HTTPException(
+            status_code=422,
+            detail=(
+                f"Unknown fields: {', '.join(sorted(unknown))}; "
+                f"expected {', '.join(DISH_FIELDS)}"
+            ),
         )
-        for d in dishes
-    ]
+    return tuple(f for f in DISH_FIELDS if f in wanted)
+
+
+# The body is pre-serialized and may hold only some fields, so it is not validated
+@router.get(
+    "/dishes",
+    response_model=None,
+    responses={200: {"model": list[DishView], "description": "Dishes with the selected fields"}},
+)
+async def list_dishes(
+    catalog: DishCatalogDep,
+    category: str | None = None,
+    fields: str | None = Query(default=None, description="Comma-separated DishOut fields"),
+    if_none_match: str | None = Header(default=None),
+) -> Response:
+    """List all active dishes (from the in-memory catalog; 304 if unchanged)."""
+    selected = _fields(fields)
+    snapshot = await catalog.get()
+    etag = snapshot.etag(category, selected)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(
+        content=snapshot.render(category, selected),
+        media_type="application/json",
+        headers=headers,
+    )
@@ -1,35 +1,113 @@
-from fastapi import APIRouter
+import asyncio
 
-from src.schemas import HealthResponse
+from fastapi import APIRouter, HTTPException
+
+from src.models import pool_stats
+from src.schemas import HealthResponse, LiveResponse, ReadyResponse, MetricsResponse
 from src.api.dependencies import (
     SettingsDep,
     OllamaServiceDep,
-    DishRepoDep,
-    ChunkRepoDep,
-    EmbeddingRepoDep,
+    QueryEmbeddingCacheDep,
+    AnswerCacheDep,
+    SearchCacheDep,
+    DishCatalogDep,
+    ScopeCacheDep,
+    ChatSingleFlightDep,
+    TraceWriterDep,
+    WarmupServiceDep,
+    VectorIndexDep,
+    HealthMonitorDep,
 )
 
 
 router = APIRouter(tags=["health"])
 
 
+@router.get("/livez", response_model=LiveResponse)
+def livez() -> LiveResponse:
+    """Liveness probe: the process serves requests (no dependency is checked)."""
+    return LiveResponse(ok=True)
+
+
 @router.get("/health", response_model=HealthResponse)
 async def health(
     settings: SettingsDep,
     ollama_service: OllamaServiceDep,
-    dish_repo: DishRepoDep,
-    chunk_repo: ChunkRepoDep,
-    embedding_repo: EmbeddingRepoDep,
+    monitor: HealthMonitorDep,
 ) -> HealthResponse:
-    """Check system health status."""
-    ollama_reachable = await ollama_service.is_reachable()
+    """Check system health status (cached checks, estimated row counts)."""
+    status, stats = await asyncio.gather(monitor.check(), monitor.table_stats())
 
     return HealthResponse(
         ok=True,
-        ollama_reachable=ollama_reachable,
+        ollama_reachable=status.ollama,
+        ollama_circuit=ollama_service.circuit_state().value,
         embed_model=settings.embed_model,
         chat_model=settings.chat_model,
-        dishes=dish_repo.count(),
-        chunks=chunk_repo.count(),
-        embeddings=embedding_repo.count(),
+        dishes=stats.dishes,
+        chunks=stats.chunks,
+        embeddings=stats.embeddings,
+        vector_index=stats.vector_index,
+        stats_estimated=stats.estimated,
+        stats_at=stats.collected_at,
+        checked_at=status.checked_at,
+    )
+
+
+@router.get("/ready", response_model=ReadyResponse)
+@router.get("/readyz", response_model=ReadyResponse)
+async def ready(warmup: WarmupServiceDep, monitor: HealthMonitorDep) -> ReadyResponse:
+    """
+    Readiness probe: 503 while warming up or while the database is unreachable.
+
+    Ollama reachability is reported but does not gate readiness: every
+    replica shares it, and the circuit breaker already fails chat fast.
+    """
+    if not warmup.ready:
+        raise HTTPException(
+            status_code=503,
+            detail="Warming up",
+            headers={"Retry-After": "5"},
+        )
+    status = await monitor.check()
+    if not status.database:
+        raise HTTPException(
+            status_code=503,
+            detail="Database unavailable",
+            headers={"Retry-After": "5"},
+        )
+    return ReadyResponse(
+        ready=True,
+        warmup=warmup.stats(),
+        checks={"database": status.database, "ollama": status.ollama},
+        checked_at=status.checked_at,
+    )
+
+
+@router.get("/metrics", response_model=MetricsResponse)
+def metrics(
+    embedding_cache: QueryEmbeddingCacheDep,
+    answer_cache: AnswerCacheDep,
+    search_cache: SearchCacheDep,
+    dish_catalog: DishCatalogDep,
+    scope_cache: ScopeCacheDep,
+    single_flight: ChatSingleFlightDep,
+    trace_writer: TraceWriterDep,
+    ollama_service: OllamaServiceDep,
+    vector_index: VectorIndexDep,
+) -> MetricsResponse:
+    """Report in-process cache and scheduling metrics."""
+    return MetricsResponse(
+        query_embedding_cache=embedding_cache.stats(),
+        answer_cache=answer_cache.stats(),
+        search_cache=search_cache.stats(),
+        dish_catalog=dish_catalog.stats(),
+        dish_scope_cache=scope_cache.stats(),
+        chat_single_flight=single_flight.stats(),
+        trace_writer=trace_writer.stats(),
+        llm_scheduler=ollama_service.scheduler_stats(),
+        ollama_resilience=ollama_service.resilience_stats(),
+        ollama_backends=ollama_service.backend_stats(),
+        db_pools=pool_stats(),
+        vector_index=vector_index.stats() if vector_index is not None else {},
     )
@@ -0,0 +1,41 @@
+from fastapi import APIRouter, HTTPException, Query
+
+from src.config import get_settings
+from src.schemas import SearchBatchIn, SearchBatchOut, SearchResultOut
+from src.api.dependencies import SearchServiceDep
+from src.core.exceptions import OllamaError, OllamaUnavailableError, OverloadedError
+from .chat import _overloaded
+
+
+router = APIRouter(tags=["search"])
+settings = get_settings()
+
+
+@router.get("/search", response_model=SearchResultOut)
+async def search(
+    search_service: SearchServiceDep,
+    question: str = Query(..., min_length=1),
+    dish_id: int | None = None,
+    top_k: int = Query(default=settings.top_k_default, ge=1, le=12),
+) -> SearchResultOut:
+    """Retrieve ranked chunks for a question, without generating an answer or writing."""
+    try:
+        return await search_service.search(question, dish_id, top_k)
+    except (OverloadedError, OllamaUnavailableError) as e:
+        raise _overloaded(e)
+    except OllamaError as e:
+        raise HTTPException(status_code=502, detail=f"{e.message}: {e.detail or ''}")
+
+
+@router.post("/search/batch", response_model=SearchBatchOut)
+async def search_batch(
+    req: SearchBatchIn,
+    search_service: SearchServiceDep,
+) -> SearchBatchOut:
+    """Retrieve the top-k chunks of many questions in one round trip (no answers)."""
+    try:
+        return await search_service.search_batch(req.queries, req.top_k)
+    except (OverloadedError, OllamaUnavailableError) as e:
+        raise _overloaded(e)
+    except OllamaError as e:
+        raise HTTPException(status_code=502, detail=f"{e.message}: {e.detail or ''}")
@@ -1,22 +1,41 @@
 from .constants import DecisionType, ALLERGY_TRIGGERS
+from .cache import LRUTTLCache
+from .single_flight import SingleFlight
 from .exceptions import (
     AppException,
     OllamaError,
     OllamaConnectionError,
     OllamaTimeoutError,
+    OllamaServerError,
+    OllamaUnavailableError,
     DatabaseError,
     ValidationError,
     InsufficientEvidenceError,
+    OverloadedError,
+    QueueFullError,
 )
+from .scheduler import LLMScheduler, Priority
+from .resilience import CircuitBreaker, CircuitState, LatencyTracker
 
 __all__ = [
     "DecisionType",
     "ALLERGY_TRIGGERS",
+    "LRUTTLCache",
+    "SingleFlight",
     "AppException",
     "OllamaError",
     "OllamaConnectionError",
     "OllamaTimeoutError",
+    "OllamaServerError",
+    "OllamaUnavailableError",
     "DatabaseError",
     "ValidationError",
     "InsufficientEvidenceError",
+    "OverloadedError",
+    "QueueFullError",
+    "LLMScheduler",
+    "Priority",
+    "CircuitBreaker",
+    "CircuitState",
+    "LatencyTracker",
 ]
@@ -9,6 +9,18 @@ class DecisionType(str, Enum):
     DISCLAIMER = "disclaimer"
 
 
+class SearchPath(str, Enum):
+    """How a vector search is executed (recorded in the RAG trace)."""
+
+    HNSW = "hnsw"
+    EXACT = "exact"
+    HNSW_ITERATIVE = "hnsw_iterative"
+    HNSW_FILTERED = "hnsw_filtered"
+    NUMPY = "numpy"
+    # Several queries in one LATERAL statement (HNSW unscoped, exact per dish)
+    BATCH = "batch"
+
+
 # Allergy-related trigger words for conservative mode
 ALLERGY_TRIGGERS: tuple[str, ...] = (
     "alerg",
@@ -32,3 +44,36 @@ ALLERGY_TRIGGERS: tuple[str, ...] = (
     "contiene",
     "puede contener",
 )
+
+
+# Structured fact subjects: canonical key -> regex over accent/case-folded text
+ALLERGEN_SUBJECTS: dict[str, str] = {
+    "gluten": r"\b(gluten|tacc|celiac\w*|trigo)\b",
+    "lacteos": r"\b(lacteos?|lactosa|leche|queso)\b",
+    "mani": r"\bmani\b",
+    "frutos_secos": r"\b(frutos? secos?|avellanas?|nuez|nueces|almendras?)\b",
+    "huevo": r"\bhuevos?\b",
+    "soja": r"\bsoja\b",
+    "pescado": r"\b(pescados?|anchoas?)\b",
+    "mariscos": r"\bmariscos?\b",
+    "sesamo": r"\bsesamo\b",
+}
+
+DIET_SUBJECTS: dict[str, str] = {
+    "vegano": r"\bvegan[oa]s?\b",
+    "vegetariano": r"\bvegetarian[oa]s?\b",
+}
+
+FACT_SUBJECT_LABELS: dict[str, str] = {
+    "gluten": "gluten",
+    "lacteos": "lácteos",
+    "mani": "maní",
+    "frutos_secos": "frutos secos",
+    "huevo": "huevo",
+    "soja": "soja",
+    "pescado": "pescado",
+    "mariscos": "mariscos",
+    "sesamo": "sésamo",
+    "vegano": "vegano",
+    "vegetariano": "vegetariano",
+}
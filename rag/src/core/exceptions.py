@@ -22,6 +22,19 @@ class OllamaTimeoutError(OllamaError):
     pass
 
 
+class OllamaServerError(OllamaError):
+    """Raised when Ollama answers with a 5xx status (e.g. while reloading a model)."""
+    pass
+
+
+class OllamaUnavailableError(OllamaError):
+    """Raised without calling Ollama while its circuit breaker is open."""
+
+    def __init__(self, message: str, detail: str | None = None, retry_after: float = 1.0):
+        super().__init__(message, detail)
+        self.retry_after = retry_after
+
+
 class DatabaseError(AppException):
     """Raised when database operations fail."""
     pass
@@ -35,3 +48,16 @@ class ValidationError(AppException):
 class InsufficientEvidenceError(AppException):
     """Raised when RAG retrieval has insufficient evidence."""
     pass
+
+
+class OverloadedError(AppException):
+    """Raised when a request cannot be scheduled before its deadline."""
+
+    def __init__(self, message: str, detail: str | None = None, retry_after: float = 1.0):
+        super().__init__(message, detail)
+        self.retry_after = retry_after
+
+
+class QueueFullError(OverloadedError):
+    """Raised when the scheduler's wait queue is full."""
+    pass
@@ -0,0 +1,125 @@
+import random
+import time
+from collections import deque
+from enum import Enum
+from typing import Callable
+
+
+class CircuitState(str, Enum):
+    """Circuit breaker states."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    calls fail fast. Once ``reset_timeout`` has elapsed it becomes half-open
+    and lets a single probe call through: success closes it, failure opens
+    it again.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int,
+        reset_timeout: float,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self._failure_threshold = max(1, failure_threshold)
+        self._reset_timeout = reset_timeout
+        self._clock = clock
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_started: float | None = None
+        self.times_opened = 0
+
+    @property
+    def state(self) -> CircuitState:
+        """Current state, moving from open to half-open once the reset timeout elapsed."""
+        if (
+            self._state == CircuitState.OPEN
+            and self._clock() - self._opened_at >= self._reset_timeout
+        ):
+            self._state = CircuitState.HALF_OPEN
+            self._probe_started = None
+        return self._state
+
+    def allow_request(self) -> bool:
+        """Whether a call may proceed; in half-open state only one probe at a time."""
+        state = self.state
+        if state == CircuitState.CLOSED:
+            return True
+        if state == CircuitState.OPEN:
+            return False
+
+        now = self._clock()
+        if self._probe_started is None or now - self._probe_started >= self._reset_timeout:
+            # No probe running (or the previous one never reported back)
+            self._probe_started = now
+            return True
+        return False
+
+    def retry_after(self) -> float:
+        """Seconds until the circuit will let a probe through."""
+        if self.state != CircuitState.OPEN:
+            return 0.0
+        return max(0.0, self._reset_timeout - (self._clock() - self._opened_at))
+
+    def record_success(self) -> None:
+        """Record a successful call, closing the circuit."""
+        self._failures = 0
+        self._state = CircuitState.CLOSED
+        self._probe_started = None
+
+    def record_failure(self) -> None:
+        """Record a failed call, opening the circuit when the threshold is reached."""
+        self._failures += 1
+        if self.state == CircuitState.HALF_OPEN or self._failures >= self._failure_threshold:
+            if self._state != CircuitState.OPEN:
+                self.times_opened += 1
+            self._state = CircuitState.OPEN
+            self._opened_at = self._clock()
+            self._probe_started = None
+
+    def stats(self) -> dict[str, float | str]:
+        """Return state and failure counters."""
+        return {
+            "state": self.state.value,
+            "consecutive_failures": self._failures,
+            "times_opened": self.times_opened,
+            "retry_after": self.retry_after(),
+        }
+
+
+class LatencyTracker:
+    """Sliding window of recent latencies for percentile estimates."""
+
+    def __init__(self, window: int):
+        self._samples: deque[float] = deque(maxlen=max(1, window))
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def record(self, seconds: float) -> None:
+        """Add one latency sample."""
+        self._samples.append(seconds)
+
+    def percentile(self, q: float) -> float | None:
+        """Return the q-quantile (0..1) of the window, or None without samples."""
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(q * len(ordered)))
+        return ordered[index]
+
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Exponential backoff with full jitter for the given (0-based) retry attempt."""
+    return random.uniform(0.0, min(cap, base * (2**attempt)))
@@ -0,0 +1,161 @@
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager
+from enum import IntEnum
+from typing import AsyncIterator, Callable
+
+from .exceptions import OverloadedError, QueueFullError
+
+
+class Priority(IntEnum):
+    """Scheduling priority; lower values are served first."""
+
+    HIGH = 0  # allergy-mode requests
+    NORMAL = 1
+    BACKGROUND = 2  # indexing and other offline work
+
+
+class LLMScheduler:
+    """
+    Bounded async scheduler for calls to a shared backend.
+
+    At most ``max_concurrency`` holders run at once; others wait in a
+    priority queue of at most ``max_queue`` entries. A request that cannot
+    start before its deadline is rejected with ``OverloadedError`` (right
+    away if the estimated wait already exceeds it), and a request arriving
+    to a full queue is rejected with ``QueueFullError``.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_concurrency: int,
+        max_queue: int,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.name = name
+        self._max_concurrency = max(1, max_concurrency)
+        self._max_queue = max(0, max_queue)
+        self._clock = clock
+        self._seq = itertools.count()
+        self._waiters: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._active = 0
+        self._service_ewma = 0.0
+        self.admitted = 0
+        self.rejected_full = 0
+        self.rejected_deadline = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of requests currently waiting for a slot."""
+        return sum(1 for _, _, fut in self._waiters if not fut.done())
+
+    @asynccontextmanager
+    async def slot(
+        self,
+        priority: Priority = Priority.NORMAL,
+        timeout: float | None = None,
+    ) -> AsyncIterator[None]:
+        """Hold one execution slot for the duration of the ``async with`` block."""
+        await self._acquire(priority, timeout)
+        started = self._clock()
+        try:
+            yield
+        finally:
+            self._record_service(self._clock() - started)
+            self._release()
+
+    async def _acquire(self, priority: Priority, timeout: float | None) -> None:
+        enqueued = self._clock()
+
+        if self._active < self._max_concurrency and not self.queue_depth:
+            self._active += 1
+            self._record_wait(0.0)
+            return
+
+        if self.queue_depth >= self._max_queue:
+            self.rejected_full += 1
+            raise QueueFullError(
+                message=f"{self.name} queue is full",
+                detail=f"{self.queue_depth} requests waiting",
+                retry_after=self.retry_after(),
+            )
+
+        if timeout is not None and self._estimated_wait(priority) > timeout:
+            self.rejected_deadline += 1
+            raise OverloadedError(
+                message=f"{self.name} cannot start before the deadline",
+                detail=f"estimated wait {self._estimated_wait(priority):.1f}s > {timeout:.1f}s",
+                retry_after=self.retry_after(),
+            )
+
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (int(priority), next(self._seq), future))
+
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if future.done() and not future.cancelled():
+                # The slot was granted while we were giving up: hand it back
+                self._release()
+            else:
+                future.cancel()
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            self.rejected_deadline += 1
+            raise OverloadedError(
+                message=f"{self.name} request did not start before the deadline",
+                detail=f"waited {timeout:.1f}s",
+                retry_after=self.retry_after(),
+            )
+
+        self._record_wait(self._clock() - enqueued)
+
+    def _release(self) -> None:
+        self._active -= 1
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                self._active += 1
+                future.set_result(None)
+                return
+
+    def _estimated_wait(self, priority: Priority) -> float:
+        """Estimate how long a new request of this priority would wait."""
+        ahead = sum(1 for p, _, fut in self._waiters if p <= priority and not fut.done())
+        rounds = (ahead + 1) / self._max_concurrency
+        return rounds * self._service_ewma
+
+    def retry_after(self) -> float:
+        """Suggested client back-off in seconds."""
+        return max(1.0, self._estimated_wait(Priority.BACKGROUND))
+
+    def _record_wait(self, waited: float) -> None:
+        self.admitted += 1
+        self._wait_total += waited
+        self._wait_max = max(self._wait_max, waited)
+
+    def _record_service(self, elapsed: float) -> None:
+        if self._service_ewma == 0.0:
+            self._service_ewma = elapsed
+        else:
+            self._service_ewma = 0.8 * self._service_ewma + 0.2 * elapsed
+
+    def stats(self) -> dict[str, float]:
+        """Return queue depth, concurrency and wait-time metrics."""
+        return {
+            "active": self._active,
+            "max_concurrency": self._max_concurrency,
+            "queue_depth": self.queue_depth,
+            "max_queue": self._max_queue,
+            "admitted": self.admitted,
+            "rejected_full": self.rejected_full,
+            "rejected_deadline": self.rejected_deadline,
+            "wait_avg_ms": (self._wait_total / self.admitted * 1000) if self.admitted else 0.0,
+            "wait_max_ms": self._wait_max * 1000,
+            "service_ewma_ms": self._service_ewma * 1000,
+        }
@@ -1,15 +1,29 @@
-from .entities import Base, Dish, KBChunk, KBEmbedding, ChatTurn, RagTrace
-from .database import get_db, init_db, engine, SessionLocal
+from .entities import Base, Dish, DishFact, KBChunk, KBEmbedding, ChatTurn, RagTrace
+from .database import (
+    get_db,
+    get_async_db,
+    init_db,
+    pool_stats,
+    engine,
+    async_engine,
+    SessionLocal,
+    AsyncSessionLocal,
+)
 
 __all__ = [
     "Base",
     "Dish",
+    "DishFact",
     "KBChunk",
     "KBEmbedding",
     "ChatTurn",
     "RagTrace",
     "get_db",
+    "get_async_db",
     "init_db",
+    "pool_stats",
     "engine",
+    "async_engine",
     "SessionLocal",
+    "AsyncSessionLocal",
 ]
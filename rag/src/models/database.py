@@ -1,17 +1,72 @@
-from typing import Generator
+import logging
+import re
+import time
+from typing import Any, AsyncGenerator, Generator
 
-from sqlalchemy import create_engine, text
+from sqlalchemy import Connection, create_engine, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
 
-from src.config import get_settings
+from src.config import Settings, get_settings
 from .entities import Base
+from .instrumentation import DbMetrics
+from .vector_storage import VECTOR_STORAGE, VectorStorage
 
 
+logger = logging.getLogger(__name__)
+
 settings = get_settings()
 
-engine = create_engine(settings.database_url, pool_pre_ping=True)
+
+def _engine_options(settings: Settings, metrics: DbMetrics, pool_cls: type[Pool]) -> dict[str, Any]:
+    """Pool sizing and driver options shared by the sync and async engines."""
+    options: dict[str, Any] = {
+        "poolclass": metrics.instrument_pool(pool_cls),
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+    return options
+
+
+def _connect_args(settings: Settings) -> dict[str, Any]:
+    """psycopg options of both engines."""
+    if not settings.database_url.startswith("postgresql+psycopg"):
+        return {}
+    # Hot queries become server-side prepared statements: vector search and fact
+    # lookups on the async engine, write-behind trace inserts on the sync one
+    return {"prepare_threshold": settings.db_prepare_threshold}
+
+
+sync_pool_metrics = DbMetrics("sync")
+engine = create_engine(
+    settings.database_url,
+    connect_args=_connect_args(settings),
+    **_engine_options(settings, sync_pool_metrics, QueuePool),
+)
+sync_pool_metrics.attach(engine)
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 
+# Async (psycopg) engine for the request path, so queries do not block the event loop
+async_pool_metrics = DbMetrics("async")
+async_engine = create_async_engine(
+    settings.database_url,
+    connect_args=_connect_args(settings),
+    **_engine_options(settings, async_pool_metrics, AsyncAdaptedQueuePool),
+)
+async_pool_metrics.attach(async_engine.sync_engine)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, autoflush=False, expire_on_commit=False
+)
+
+
+def pool_stats() -> dict[str, dict[str, float]]:
+    """Return pool and statement metrics of both engines."""
+    return {m.name: m.stats() for m in (sync_pool_metrics, async_pool_metrics)}
+
 
 def get_db() -> Generator[Session, None, None]:
     """Dependency that provides a database session."""
@@ -22,8 +77,36 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """Dependency that provides an async database session."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# Session-level advisory lock serializing init_db across workers starting together
+_INIT_LOCK_ID = 7_310_421
+
+
 def init_db() -> None:
-    """Initialize database: create extension, tables, and indexes."""
+    """
+    Initialize database: create extension, tables, and indexes.
+
+    Every worker calls this on startup. Workers take turns under an advisory
+    lock, and each step checks the current schema first, so only the first
+    worker after a change migrates or rebuilds anything; the rest (and every
+    plain restart) find the schema current and write nothing.
+    """
+    with engine.connect() as lock_conn:
+        lock_conn.execute(text("SELECT pg_advisory_lock(:id)"), {"id": _INIT_LOCK_ID})
+        # The lock outlives the transaction; do not sit idle in one while migrating
+        lock_conn.commit()
+        try:
+            _init_schema()
+        finally:
+            lock_conn.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": _INIT_LOCK_ID})
+
+
+def _init_schema() -> None:
     # 1) Ensure pgvector extension exists
     with engine.begin() as conn:
         conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector;"))
@@ -37,14 +120,145 @@ def init_db() -> None:
         conn.execute(
             text("CREATE INDEX IF NOT EXISTS kb_chunk_dish_idx ON kb_chunk(dish_id);")
         )
-        # HNSW index for vector similarity search
-        try:
+        # Index for fact lookups by dish and subject
+        conn.execute(
+            text(
+                "CREATE INDEX IF NOT EXISTS dish_fact_dish_subject_idx "
+                "ON dish_fact(dish_id, subject);"
+            )
+        )
+        # Columns added after the first release
+        conn.execute(
+            text("ALTER TABLE rag_trace ADD COLUMN IF NOT EXISTS meta_data JSON DEFAULT '{}';")
+        )
+        if not _has_column(conn, "kb_embedding", "dish_id"):
+            # Backfilled once; new embeddings get their dish id on insert
+            conn.execute(
+                text(
+                    "ALTER TABLE kb_embedding ADD COLUMN dish_id BIGINT "
+                    "REFERENCES dish(id) ON DELETE CASCADE;"
+                )
+            )
             conn.execute(
                 text(
-                    "CREATE INDEX IF NOT EXISTS kb_embedding_hnsw "
-                    "ON kb_embedding USING hnsw (embedding vector_cosine_ops);"
+                    "UPDATE kb_embedding e SET dish_id = c.dish_id FROM kb_chunk c "
+                    "WHERE c.id = e.chunk_id;"
                 )
             )
-        except Exception:
-            # Index might already exist or not be supported
-            pass
+        conn.execute(
+            text(
+                "ALTER TABLE kb_chunk ADD COLUMN IF NOT EXISTS content_tsv tsvector "
+                "GENERATED ALWAYS AS (to_tsvector('spanish', content)) STORED;"
+            )
+        )
+        # Full-text index for lexical retrieval
+        conn.execute(
+            text(
+                "CREATE INDEX IF NOT EXISTS kb_chunk_content_tsv_idx "
+                "ON kb_chunk USING gin (content_tsv);"
+            )
+        )
+        # Index for dish-scoped vector search
+        conn.execute(
+            text("CREATE INDEX IF NOT EXISTS kb_embedding_dish_idx ON kb_embedding(dish_id);")
+        )
+        # Embedding column follows the configured vector storage
+        _migrate_embedding_column(conn, VECTOR_STORAGE)
+
+    # 4) HNSW index, in its own transaction so a failed build leaves the rest in place
+    try:
+        with engine.begin() as conn:
+            _ensure_embedding_index(
+                conn, VECTOR_STORAGE, settings.hnsw_m, settings.hnsw_ef_construction
+            )
+    except Exception:
+        # Search still works (sequential scan); /health reports vector_index=false
+        logger.exception("Could not build the kb_embedding_hnsw index")
+
+
+def _has_column(conn: Connection, table: str, column: str) -> bool:
+    """Whether ``table`` already has ``column``."""
+    return bool(
+        conn.execute(
+            text(
+                "SELECT 1 FROM information_schema.columns "
+                "WHERE table_name = :table AND column_name = :column"
+            ),
+            {"table": table, "column": column},
+        ).scalar()
+    )
+
+
+def _migrate_embedding_column(conn: Connection, storage: VectorStorage) -> None:
+    """
+    Convert ``kb_embedding.embedding`` to the configured type and dimension.
+
+    Switching vector <-> halfvec, or truncating to fewer dimensions, is done
+    in place. Growing the dimension cannot be: the stored embeddings are
+    deleted and ``POST /index`` re-embeds every chunk.
+    """
+    current = conn.execute(
+        text(
+            "SELECT format_type(atttypid, atttypmod) FROM pg_attribute "
+            "WHERE attrelid = 'kb_embedding'::regclass AND attname = 'embedding';"
+        )
+    ).scalar()
+    if current is None or current == storage.column_sql:
+        return
+
+    # The index is tied to the old type; _ensure_embedding_index rebuilds it
+    conn.execute(text("DROP INDEX IF EXISTS kb_embedding_hnsw;"))
+    match = re.search(r"\((\d+)\)", current)
+    current_dim = int(match.group(1)) if match else 0
+    if current_dim < storage.dim:
+        deleted = conn.execute(text("DELETE FROM kb_embedding;")).rowcount
+        using = f"embedding::{storage.column_sql}"
+        logger.warning(
+            "Embedding dimension grows from %s to %d: deleted %d embeddings, "
+            "run POST /index to re-embed",
+            current_dim or "unknown",
+            storage.dim,
+            deleted,
+        )
+    else:
+        using = f"subvector(embedding, 1, {storage.dim})::{storage.column_sql}"
+
+    conn.execute(
+        text(
+            f"ALTER TABLE kb_embedding ALTER COLUMN embedding "
+            f"TYPE {storage.column_sql} USING {using};"
+        )
+    )
+    logger.info("Migrated kb_embedding.embedding from %s to %s", current, storage.column_sql)
+
+
+def _ensure_embedding_index(
+    conn: Connection,
+    storage: VectorStorage,
+    m: int,
+    ef_construction: int,
+) -> None:
+    """(Re)build the HNSW index when missing or built for another storage mode or parameters."""
+    indexdef = conn.execute(
+        text("SELECT indexdef FROM pg_indexes WHERE indexname = 'kb_embedding_hnsw';")
+    ).scalar()
+    wanted = (storage.opclass, f"m='{m}'", f"ef_construction='{ef_construction}'")
+    if indexdef is not None and all(part in indexdef for part in wanted):
+        return
+
+    started = time.monotonic()
+    conn.execute(text("DROP INDEX IF EXISTS kb_embedding_hnsw;"))
+    conn.execute(
+        text(
+            "CREATE INDEX kb_embedding_hnsw ON kb_embedding "
+            f"USING hnsw ({storage.index_expression} {storage.opclass}) "
+            f"WITH (m = {int(m)}, ef_construction = {int(ef_construction)});"
+        )
+    )
+    logger.info(
+        "Built kb_embedding_hnsw (%s, m=%d, ef_construction=%d) in %.1fs",
+        storage.opclass,
+        m,
+        ef_construction,
+        time.monotonic() - started,
+    )
@@ -13,9 +13,12 @@ from sqlalchemy import (
     JSON,
     ARRAY,
     String,
+    Computed,
 )
+from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
-from pgvector.sqlalchemy import Vector
+
+from .vector_storage import VECTOR_STORAGE
 
 
 class Base(DeclarativeBase):
@@ -39,6 +42,29 @@ class Dish(Base):
     chunks: Mapped[List["KBChunk"]] = relationship(
         back_populates="dish", cascade="all, delete-orphan"
     )
+    facts: Mapped[List["DishFact"]] = relationship(
+        back_populates="dish", cascade="all, delete-orphan"
+    )
+
+
+class DishFact(Base):
+    """Structured allergen or dietary fact from a dish's ficha."""
+
+    __tablename__ = "dish_fact"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    dish_id: Mapped[int] = mapped_column(
+        BigInteger, ForeignKey("dish.id", ondelete="CASCADE"), nullable=False
+    )
+    # Canonical subject, e.g. "gluten", "lacteos", "vegano"
+    subject: Mapped[str] = mapped_column(Text, nullable=False)
+    # "contains" / "may_contain" for allergens, "yes" / "no" / "unconfirmed" for diets
+    status: Mapped[str] = mapped_column(Text, nullable=False)
+    # Verbatim text from the ficha
+    source_text: Mapped[str] = mapped_column(Text, nullable=False)
+
+    # Relationships
+    dish: Mapped[Dish] = relationship(back_populates="facts")
 
 
 class KBChunk(Base):
@@ -53,6 +79,13 @@ class KBChunk(Base):
     chunk_index: Mapped[int] = mapped_column(Integer, nullable=False)
     content: Mapped[str] = mapped_column(Text, nullable=False)
     meta_data: Mapped[Dict[str, Any]] = mapped_column(JSON, default=dict)
+    # Spanish full-text vector for lexical (hybrid) retrieval
+    content_tsv: Mapped[Any] = mapped_column(
+        TSVECTOR,
+        Computed("to_tsvector('spanish', content)", persisted=True),
+        nullable=True,
+        deferred=True,
+    )
 
     # Relationships
     dish: Mapped[Optional[Dish]] = relationship(back_populates="chunks")
@@ -69,7 +102,12 @@ class KBEmbedding(Base):
     chunk_id: Mapped[int] = mapped_column(
         BigInteger, ForeignKey("kb_chunk.id", ondelete="CASCADE"), primary_key=True
     )
-    embedding: Mapped[List[float]] = mapped_column(Vector(768), nullable=False)
+    # Copy of kb_chunk.dish_id so dish-scoped searches do not need the join
+    dish_id: Mapped[Optional[int]] = mapped_column(
+        BigInteger, ForeignKey("dish.id", ondelete="CASCADE"), nullable=True
+    )
+    # vector(dim) or halfvec(dim) depending on the configured embedding storage
+    embedding: Mapped[List[float]] = mapped_column(VECTOR_STORAGE.column_type(), nullable=False)
 
     # Relationships
     chunk: Mapped[KBChunk] = relationship(back_populates="embedding")
@@ -104,6 +142,7 @@ class RagTrace(Base):
     scores: Mapped[List[str]] = mapped_column(ARRAY(String), nullable=False)
     confidence: Mapped[str] = mapped_column(String, nullable=False)
     decision: Mapped[str] = mapped_column(Text, nullable=False)
+    meta_data: Mapped[Dict[str, Any]] = mapped_column(JSON, default=dict)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), default=datetime.utcnow
     )
@@ -0,0 +1,110 @@
+import time
+from typing import Any
+
+from sqlalchemy import event, exc
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import Pool, QueuePool
+
+
+class DbMetrics:
+    """Connection pool and statement counters for one engine."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.checkouts = 0
+        self.connects = 0
+        self.overflow_events = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.statements = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._statement_total = 0.0
+        self._statement_max = 0.0
+        self._pool: Pool | None = None
+
+    def instrument_pool(self, pool_cls: type[Pool]) -> type[Pool]:
+        """Subclass ``pool_cls`` so that time spent waiting for a connection is recorded."""
+        metrics = self
+
+        class InstrumentedPool(pool_cls):  # type: ignore[valid-type, misc]
+            def _do_get(self) -> Any:
+                started = time.perf_counter()
+                try:
+                    return super()._do_get()
+                except exc.TimeoutError:
+                    metrics.timeouts += 1
+                    raise
+                finally:
+                    metrics._record_wait(time.perf_counter() - started)
+
+        InstrumentedPool.__name__ = f"Instrumented{pool_cls.__name__}"
+        return InstrumentedPool
+
+    def attach(self, engine: Engine) -> None:
+        """Listen to pool and statement events of a (sync) engine."""
+        self._pool = engine.pool
+        event.listen(engine, "connect", self._on_connect)
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "invalidate", self._on_invalidate)
+        event.listen(engine, "before_cursor_execute", self._before_execute)
+        event.listen(engine, "after_cursor_execute", self._after_execute)
+        event.listen(engine, "handle_error", self._on_error)
+
+    def _on_connect(self, dbapi_connection: Any, connection_record: Any) -> None:
+        self.connects += 1
+        overflow = getattr(self._pool, "overflow", None)
+        if overflow is not None and overflow() > 0:
+            self.overflow_events += 1
+
+    def _on_checkout(self, dbapi_connection: Any, connection_record: Any, proxy: Any) -> None:
+        self.checkouts += 1
+
+    def _on_invalidate(self, dbapi_connection: Any, connection_record: Any, exception: Any) -> None:
+        self.invalidations += 1
+
+    def _before_execute(
+        self, conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, *args: Any
+    ) -> None:
+        conn.info.setdefault("query_started", []).append((context, time.perf_counter()))
+
+    def _after_execute(self, conn: Any, cursor: Any, statement: str, *args: Any) -> None:
+        _, started = conn.info["query_started"].pop()
+        elapsed = time.perf_counter() - started
+        self.statements += 1
+        self._statement_total += elapsed
+        self._statement_max = max(self._statement_max, elapsed)
+
+    def _on_error(self, context: Any) -> None:
+        # A failed statement never reaches after_cursor_execute: drop its start time
+        conn = context.connection
+        started = conn.info.get("query_started") if conn is not None else None
+        if started and started[-1][0] is context.execution_context:
+            started.pop()
+
+    def _record_wait(self, waited: float) -> None:
+        self._wait_total += waited
+        self._wait_max = max(self._wait_max, waited)
+
+    def stats(self) -> dict[str, float]:
+        """Return pool occupancy, checkout wait and statement timing."""
+        pool = self._pool if isinstance(self._pool, QueuePool) else None
+        attempts = self.checkouts + self.timeouts
+        return {
+            "checked_out": pool.checkedout() if pool is not None else 0,
+            "pool_size": pool.size() if pool is not None else 0,
+            # QueuePool counts overflow from -pool_size; only connections beyond the pool matter
+            "overflow": max(0, pool.overflow()) if pool is not None else 0,
+            "checkouts": self.checkouts,
+            "connects": self.connects,
+            "overflow_events": self.overflow_events,
+            "invalidations": self.invalidations,
+            "timeouts": self.timeouts,
+            "wait_avg_ms": (self._wait_total / attempts * 1000) if attempts else 0.0,
+            "wait_max_ms": self._wait_max * 1000,
+            "statements": self.statements,
+            "statement_avg_ms": (
+                self._statement_total / self.statements * 1000 if self.statements else 0.0
+            ),
+            "statement_max_ms": self._statement_max * 1000,
+        }
@@ -0,0 +1,77 @@
+from dataclasses import dataclass
+from typing import Any, Sequence
+
+from pgvector.sqlalchemy import HALFVEC, Vector
+from sqlalchemy.types import TypeEngine
+
+from src.config import Settings, get_settings
+
+
+STORAGE_MODES = ("vector", "halfvec", "binary")
+
+
+@dataclass(frozen=True)
+class VectorStorage:
+    """
+    How chunk embeddings are stored and indexed.
+
+    ``vector`` and ``halfvec`` store float32/float16 values and index them
+    with HNSW on cosine distance. ``binary`` keeps float32 values for exact
+    re-scoring but indexes only their sign bits (``binary_quantize``), which
+    makes the index about 32x smaller; searches take Hamming-distance
+    candidates from it and re-rank them by cosine. ``dim`` may be lower than
+    the model's output: only the leading dimensions are stored.
+    """
+
+    mode: str = "vector"
+    dim: int = 768
+    rescore_factor: int = 4
+
+    def __post_init__(self) -> None:
+        if self.mode not in STORAGE_MODES:
+            raise ValueError(
+                f"Unknown embedding storage {self.mode!r}; expected one of {STORAGE_MODES}"
+            )
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "VectorStorage":
+        dim = settings.embedding_dim
+        if 0 < settings.embedding_store_dim < dim:
+            dim = settings.embedding_store_dim
+        return cls(
+            mode=settings.embedding_storage,
+            dim=dim,
+            rescore_factor=max(1, settings.binary_rescore_factor),
+        )
+
+    def column_type(self) -> TypeEngine[Any]:
+        """SQLAlchemy type of the ``kb_embedding.embedding`` column."""
+        return HALFVEC(self.dim) if self.mode == "halfvec" else Vector(self.dim)
+
+    @property
+    def column_sql(self) -> str:
+        """Column type as Postgres reports it (``format_type``)."""
+        return f"{'halfvec' if self.mode == 'halfvec' else 'vector'}({self.dim})"
+
+    @property
+    def index_expression(self) -> str:
+        """Indexed expression of the HNSW index."""
+        if self.mode == "binary":
+            return f"(binary_quantize(embedding)::bit({self.dim}))"
+        return "embedding"
+
+    @property
+    def opclass(self) -> str:
+        """Operator class of the HNSW index."""
+        return {
+            "vector": "vector_cosine_ops",
+            "halfvec": "halfvec_cosine_ops",
+            "binary": "bit_hamming_ops",
+        }[self.mode]
+
+    def truncate(self, embedding: Sequence[float]) -> list[float]:
+        """Keep the stored leading dimensions of a model embedding."""
+        return list(embedding[: self.dim])
+
+
+VECTOR_STORAGE = VectorStorage.from_settings(get_settings())
@@ -1,11 +1,21 @@
-from .dish_repository import DishRepository
-from .chunk_repository import ChunkRepository
-from .embedding_repository import EmbeddingRepository
-from .chat_repository import ChatRepository
+from .dish_repository import DishRepository, AsyncDishRepository
+from .chunk_repository import ChunkRepository, AsyncChunkRepository
+from .embedding_repository import EmbeddingRepository, AsyncEmbeddingRepository
+from .chat_repository import ChatRepository, AsyncChatRepository
+from .fact_repository import DishFactRepository, AsyncDishFactRepository
+from .maintenance_repository import MaintenanceRepository, AsyncMaintenanceRepository
 
 __all__ = [
     "DishRepository",
     "ChunkRepository",
     "EmbeddingRepository",
     "ChatRepository",
+    "DishFactRepository",
+    "AsyncDishRepository",
+    "AsyncChunkRepository",
+    "AsyncEmbeddingRepository",
+    "AsyncChatRepository",
+    "AsyncDishFactRepository",
+    "MaintenanceRepository",
+    "AsyncMaintenanceRepository",
 ]
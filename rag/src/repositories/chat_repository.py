@@ -1,9 +1,38 @@
 from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from src.models.entities import ChatTurn, RagTrace
 
 
+# Sequences are non-transactional: reserved ids never need a commit
+_ALLOCATE_IDS = text(
+    "SELECT nextval(pg_get_serial_sequence('chat_turn', 'id')), "
+    "nextval(pg_get_serial_sequence('rag_trace', 'id'))"
+)
+
+
+def _new_trace(
+    trace_id: int | None,
+    turn_id: int,
+    used_chunk_ids: list[int],
+    scores: list[float],
+    confidence: float,
+    decision: str,
+    meta_data: dict | None,
+) -> RagTrace:
+    """Build a RagTrace row in its stored (string-formatted) form."""
+    return RagTrace(
+        id=trace_id,
+        meta_data=meta_data or {},
+        turn_id=turn_id,
+        used_chunk_ids=used_chunk_ids or [0],
+        scores=[f"{s:.4f}" for s in scores] or ["0.0000"],
+        confidence=f"{confidence:.4f}",
+        decision=decision,
+    )
+
+
 class ChatRepository:
     """Repository for ChatTurn and RagTrace entity operations."""
 
@@ -38,18 +67,98 @@ class ChatRepository:
         decision: str,
     ) -> RagTrace:
         """Create a RAG trace record."""
-        trace = RagTrace(
-            turn_id=turn_id,
-            used_chunk_ids=used_chunk_ids or [0],
-            scores=[f"{s:.4f}" for s in scores] or ["0.0000"],
-            confidence=f"{confidence:.4f}",
-            decision=decision,
-        )
-        self._db.add(trace)
+        trace = self.add_trace(None, turn_id, used_chunk_ids, scores, confidence, decision)
         self._db.commit()
         self._db.refresh(trace)
         return trace
 
+    def allocate_ids(self) -> tuple[int, int]:
+        """Reserve a chat turn id and a RAG trace id in a single round trip."""
+        row = self._db.execute(_ALLOCATE_IDS).one()
+        return int(row[0]), int(row[1])
+
+    def add_turn(
+        self,
+        turn_id: int,
+        user_text: str,
+        bot_text: str | None,
+        dish_id: int | None = None,
+    ) -> ChatTurn:
+        """Stage a completed chat turn with a pre-allocated id (no commit)."""
+        turn = ChatTurn(id=turn_id, dish_id=dish_id, user_text=user_text, bot_text=bot_text)
+        self._db.add(turn)
+        return turn
+
+    def add_trace(
+        self,
+        trace_id: int | None,
+        turn_id: int,
+        used_chunk_ids: list[int],
+        scores: list[float],
+        confidence: float,
+        decision: str,
+        meta_data: dict | None = None,
+    ) -> RagTrace:
+        """Stage a RAG trace record, optionally with a pre-allocated id (no commit)."""
+        trace = _new_trace(
+            trace_id, turn_id, used_chunk_ids, scores, confidence, decision, meta_data
+        )
+        self._db.add(trace)
+        return trace
+
+    def flush(self) -> None:
+        """Flush staged rows without committing."""
+        self._db.flush()
+
     def commit(self) -> None:
         """Commit the current transaction."""
         self._db.commit()
+
+
+class AsyncChatRepository:
+    """Async (request path) variant of ChatRepository."""
+
+    def __init__(self, db: AsyncSession):
+        self._db = db
+
+    async def allocate_ids(self) -> tuple[int, int]:
+        """Reserve a chat turn id and a RAG trace id in a single round trip."""
+        row = (await self._db.execute(_ALLOCATE_IDS)).one()
+        return int(row[0]), int(row[1])
+
+    def add_turn(
+        self,
+        turn_id: int,
+        user_text: str,
+        bot_text: str | None,
+        dish_id: int | None = None,
+    ) -> ChatTurn:
+        """Stage a completed chat turn with a pre-allocated id (no commit)."""
+        turn = ChatTurn(id=turn_id, dish_id=dish_id, user_text=user_text, bot_text=bot_text)
+        self._db.add(turn)
+        return turn
+
+    def add_trace(
+        self,
+        trace_id: int | None,
+        turn_id: int,
+        used_chunk_ids: list[int],
+        scores: list[float],
+        confidence: float,
+        decision: str,
+        meta_data: dict | None = None,
+    ) -> RagTrace:
+        """Stage a RAG trace record, optionally with a pre-allocated id (no commit)."""
+        trace = _new_trace(
+            trace_id, turn_id, used_chunk_ids, scores, confidence, decision, meta_data
+        )
+        self._db.add(trace)
+        return trace
+
+    async def flush(self) -> None:
+        """Flush staged rows without committing."""
+        await self._db.flush()
+
+    async def commit(self) -> None:
+        """Commit the current transaction."""
+        await self._db.commit()
@@ -1,9 +1,17 @@
-from sqlalchemy import select, func
+from typing import Any
+
+from sqlalchemy import Select, select, func
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from src.models.entities import KBChunk, KBEmbedding
 
 
+def _fingerprints_statement(chunk_ids: list[int]) -> Select[Any]:
+    """md5 of each chunk's content, computed in Postgres."""
+    return select(KBChunk.id, func.md5(KBChunk.content)).where(KBChunk.id.in_(chunk_ids))
+
+
 class ChunkRepository:
     """Repository for KBChunk entity operations."""
 
@@ -20,6 +28,24 @@ class ChunkRepository:
         )
         return list(self._db.execute(stmt).scalars().all())
 
+    def get_unindexed_page(self, after_id: int, limit: int) -> list[tuple[int, str]]:
+        """Get (id, content) of unindexed chunks with id > after_id (keyset pagination)."""
+        stmt = (
+            select(KBChunk.id, KBChunk.content)
+            .outerjoin(KBEmbedding, KBEmbedding.chunk_id == KBChunk.id)
+            .where(KBEmbedding.chunk_id.is_(None), KBChunk.id > after_id)
+            .order_by(KBChunk.id)
+            .limit(limit)
+        )
+        return [(int(chunk_id), content) for chunk_id, content in self._db.execute(stmt).all()]
+
+    def get_fingerprints(self, chunk_ids: list[int]) -> dict[int, str]:
+        """Get the md5 fingerprint of each existing chunk's content."""
+        if not chunk_ids:
+            return {}
+        stmt = _fingerprints_statement(chunk_ids)
+        return {int(chunk_id): digest for chunk_id, digest in self._db.execute(stmt).all()}
+
     def count(self) -> int:
         """Count total chunks."""
         return self._db.scalar(select(func.count()).select_from(KBChunk)) or 0
@@ -53,3 +79,21 @@ class ChunkRepository:
     def commit(self) -> None:
         """Commit the current transaction."""
         self._db.commit()
+
+
+class AsyncChunkRepository:
+    """Async (request path) variant of ChunkRepository."""
+
+    def __init__(self, db: AsyncSession):
+        self._db = db
+
+    async def get_fingerprints(self, chunk_ids: list[int]) -> dict[int, str]:
+        """Get the md5 fingerprint of each existing chunk's content."""
+        if not chunk_ids:
+            return {}
+        result = await self._db.execute(_fingerprints_statement(chunk_ids))
+        return {int(chunk_id): digest for chunk_id, digest in result.all()}
+
+    async def count(self) -> int:
+        """Count total chunks."""
+        return await self._db.scalar(select(func.count()).select_from(KBChunk)) or 0
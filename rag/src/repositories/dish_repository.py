@@ -1,9 +1,22 @@
-from sqlalchemy import select, func
+from sqlalchemy import Select, select, func, text
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from src.models.entities import Dish
 
 
+def _active_statement() -> Select[Dish]:
+    """Active dishes ordered by id."""
+    return select(Dish).where(Dish.is_active == True).order_by(Dish.id)
+
+
+# Fingerprint of every active dish row: equal across workers, changes with any edit
+_CATALOG_VERSION = text(
+    "SELECT md5(coalesce(string_agg(d::text, E'\\n' ORDER BY d.id), '')) "
+    "FROM dish d WHERE d.is_active"
+)
+
+
 class DishRepository:
     """Repository for Dish entity operations."""
 
@@ -12,8 +25,7 @@ class DishRepository:
 
     def get_all_active(self) -> list[Dish]:
         """Get all active dishes ordered by id."""
-        stmt = select(Dish).where(Dish.is_active == True).order_by(Dish.id)
-        return list(self._db.execute(stmt).scalars().all())
+        return list(self._db.execute(_active_statement()).scalars().all())
 
     def get_by_id(self, dish_id: int) -> Dish | None:
         """Get a dish by its ID."""
@@ -23,6 +35,10 @@ class DishRepository:
         """Count total dishes."""
         return self._db.scalar(select(func.count()).select_from(Dish)) or 0
 
+    def catalog_version(self) -> str:
+        """Return a fingerprint of the active dishes."""
+        return self._db.scalar(_CATALOG_VERSION) or ""
+
     def create(self, dish: Dish) -> Dish:
         """Create a new dish."""
         self._db.add(dish)
@@ -39,3 +55,26 @@ class DishRepository:
     def commit(self) -> None:
         """Commit the current transaction."""
         self._db.commit()
+
+
+class AsyncDishRepository:
+    """Async (request path) variant of DishRepository."""
+
+    def __init__(self, db: AsyncSession):
+        self._db = db
+
+    async def get_all_active(self) -> list[Dish]:
+        """Get all active dishes ordered by id."""
+        return list((await self._db.execute(_active_statement())).scalars().all())
+
+    async def get_by_id(self, dish_id: int) -> Dish | None:
+        """Get a dish by its ID."""
+        return await self._db.get(Dish, dish_id)
+
+    async def count(self) -> int:
+        """Count total dishes."""
+        return await self._db.scalar(select(func.count()).select_from(Dish)) or 0
+
+    async def catalog_version(self) -> str:
+        """Return a fingerprint of the active dishes."""
+        return await self._db.scalar(_CATALOG_VERSION) or ""
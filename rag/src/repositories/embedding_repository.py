@@ -1,9 +1,14 @@
-from typing import NamedTuple
+from typing import Any, NamedTuple, Sequence
 
-from sqlalchemy import select, func, text
+from pgvector.sqlalchemy import BIT, Vector
+from sqlalchemy import Select, Text, TextClause, cast, literal, select, func, text, update
+from sqlalchemy.dialects.postgresql import TSQUERY, aggregate_order_by, insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
+from src.core.constants import SearchPath
 from src.models.entities import KBChunk, KBEmbedding
+from src.models.vector_storage import VECTOR_STORAGE, VectorStorage
 
 
 class SearchHit(NamedTuple):
@@ -12,6 +17,309 @@ class SearchHit(NamedTuple):
     chunk_id: int
     content: str
     score: float
+    dish_id: int | None = None
+    chunk_index: int | None = None
+
+
+class SnapshotState(NamedTuple):
+    """Fingerprint of ``kb_embedding`` as served by the in-process vector index."""
+
+    rows: int
+    max_chunk_id: int
+    # md5 over every exported row, and over the rows up to the base chunk id
+    digest: str
+    base_digest: str
+
+
+def _search_statement(
+    query_embedding: list[float],
+    top_k: int,
+    dish_id: int | None,
+    storage: VectorStorage = VECTOR_STORAGE,
+    path: SearchPath | None = None,
+) -> Select[Any]:
+    """Build the cosine-distance nearest-neighbour query (HNSW unless ``path`` is exact)."""
+    query = storage.truncate(query_embedding)
+    if path is SearchPath.EXACT and dish_id is not None:
+        return _exact_statement(query, top_k, dish_id)
+
+    stmt = (
+        select(
+            KBChunk.id,
+            KBChunk.content,
+            KBChunk.dish_id,
+            KBChunk.chunk_index,
+            KBEmbedding.embedding.cosine_distance(query).label("dist"),
+        )
+        .join(KBEmbedding, KBEmbedding.chunk_id == KBChunk.id)
+    )
+
+    if storage.mode == "binary":
+        # Hamming-distance candidates from the bit index, re-scored by exact cosine
+        candidates = _binary_candidates(query, top_k * storage.rescore_factor, dish_id, storage)
+        stmt = stmt.join(candidates, candidates.c.chunk_id == KBChunk.id)
+    elif dish_id is not None:
+        stmt = stmt.where(KBEmbedding.dish_id == dish_id)
+
+    return stmt.order_by(text("dist ASC")).limit(top_k)
+
+
+def _hybrid_statement(
+    query_embedding: list[float],
+    query_text: str,
+    top_k: int,
+    dish_id: int | None,
+    candidates: int,
+    rrf_k: int,
+    storage: VectorStorage = VECTOR_STORAGE,
+    path: SearchPath | None = None,
+) -> Select[Any]:
+    """
+    Vector and Spanish full-text candidates fused by reciprocal rank, in one query.
+
+    Each list contributes ``1 / (rrf_k + rank)`` per chunk. Every fused hit
+    still carries its cosine distance, so confidence keeps its meaning.
+    """
+    vec_hits = _search_statement(query_embedding, candidates, dish_id, storage, path).subquery(
+        "vec_hits"
+    )
+    vec = select(
+        vec_hits.c.id.label("chunk_id"),
+        func.row_number().over(order_by=vec_hits.c.dist).label("rnk"),
+    ).subquery("vec")
+
+    # Any question term may match: OR the lexemes instead of plainto_tsquery's AND
+    terms = cast(
+        func.replace(cast(func.plainto_tsquery("spanish", query_text), Text), "&", "|"),
+        TSQUERY,
+    )
+    lex_rank = func.ts_rank_cd(KBChunk.content_tsv, terms)
+    lex_stmt = select(KBChunk.id.label("chunk_id"), lex_rank.label("lex_rank")).where(
+        KBChunk.content_tsv.op("@@")(terms)
+    )
+    if dish_id is not None:
+        lex_stmt = lex_stmt.where(KBChunk.dish_id == dish_id)
+    lex_hits = lex_stmt.order_by(lex_rank.desc()).limit(candidates).subquery("lex_hits")
+    lex = select(
+        lex_hits.c.chunk_id,
+        func.row_number().over(order_by=lex_hits.c.lex_rank.desc()).label("rnk"),
+    ).subquery("lex")
+
+    rrf = func.coalesce(literal(1.0) / (rrf_k + vec.c.rnk), 0.0) + func.coalesce(
+        literal(1.0) / (rrf_k + lex.c.rnk), 0.0
+    )
+    query = storage.truncate(query_embedding)
+    return (
+        select(
+            KBChunk.id,
+            KBChunk.content,
+            KBChunk.dish_id,
+            KBChunk.chunk_index,
+            KBEmbedding.embedding.cosine_distance(query).label("dist"),
+        )
+        .select_from(vec.join(lex, vec.c.chunk_id == lex.c.chunk_id, full=True))
+        .join(KBChunk, KBChunk.id == func.coalesce(vec.c.chunk_id, lex.c.chunk_id))
+        .join(KBEmbedding, KBEmbedding.chunk_id == KBChunk.id)
+        .order_by(rrf.desc(), text("dist ASC"))
+        .limit(top_k)
+    )
+
+
+def _exact_statement(query: list[float], top_k: int, dish_id: int) -> Select[Any]:
+    """
+    Exact nearest neighbours among one dish's embeddings.
+
+    The materialized CTE keeps the planner off the HNSW index: the dish's
+    rows come from kb_embedding_dish_idx and every distance is computed.
+    """
+    scoped = (
+        select(
+            KBEmbedding.chunk_id,
+            KBEmbedding.embedding.cosine_distance(query).label("dist"),
+        )
+        .where(KBEmbedding.dish_id == dish_id)
+        .cte("scoped")
+        .prefix_with("MATERIALIZED")
+    )
+    return (
+        select(KBChunk.id, KBChunk.content, KBChunk.dish_id, KBChunk.chunk_index, scoped.c.dist)
+        .join(scoped, scoped.c.chunk_id == KBChunk.id)
+        .order_by(scoped.c.dist)
+        .limit(top_k)
+    )
+
+
+def _scan_settings_statement(
+    ef_search: int | None,
+    top_k: int,
+    iterative: bool = False,
+    storage: VectorStorage = VECTOR_STORAGE,
+) -> TextClause | None:
+    """
+    Set HNSW scan options for the current transaction only (None: keep defaults).
+
+    HNSW returns at most ef_search rows, so it is raised to the number of
+    rows the search needs (the over-fetched candidates in binary mode). An
+    iterative scan keeps walking the graph until enough rows pass the dish
+    filter.
+    """
+    options: list[str] = []
+    params: dict[str, str] = {}
+    if ef_search is not None:
+        needed = top_k * storage.rescore_factor if storage.mode == "binary" else top_k
+        options.append("set_config('hnsw.ef_search', :ef_search, true)")
+        params["ef_search"] = str(max(ef_search, needed))
+    if iterative:
+        options.append("set_config('hnsw.iterative_scan', 'strict_order', true)")
+    if not options:
+        return None
+    return text(f"SELECT {', '.join(options)}").bindparams(**params)
+
+
+def _path_settings_statement(
+    ef_search: int | None, top_k: int, path: SearchPath | None
+) -> TextClause | None:
+    """Scan options of ``path``; none for an exact scan, which never uses the HNSW index."""
+    if path is SearchPath.EXACT:
+        return None
+    return _scan_settings_statement(ef_search, top_k, path is SearchPath.HNSW_ITERATIVE)
+
+
+# dish_ids entry of a batch query without a dish scope (dish ids start at 1)
+NO_DISH = 0
+
+
+def _batch_search_statement(
+    query_embeddings: Sequence[Sequence[float]],
+    dish_ids: Sequence[int | None],
+    top_k: int,
+    storage: VectorStorage = VECTOR_STORAGE,
+) -> TextClause:
+    """
+    Nearest neighbours of several queries in one statement.
+
+    The query vectors are unnested with their position and dish scope, and
+    each query's top-k comes from a LATERAL subquery with two branches of
+    which only the one matching its scope runs: an HNSW scan (Hamming
+    candidates re-scored by cosine in binary mode) for unscoped queries, an
+    exact scan of the dish's rows for scoped ones (``OFFSET 0`` keeps that
+    branch off the index). Rows come back as (query position, id, content,
+    dish_id, chunk_index, distance), ordered by position and distance.
+    """
+    dim = storage.dim
+    candidates = top_k
+    index_order = "e.embedding <=> q.vec"
+    if storage.mode == "binary":
+        candidates = top_k * storage.rescore_factor
+        index_order = (
+            f"binary_quantize(e.embedding)::bit({dim}) <~> binary_quantize(q.vec)::bit({dim})"
+        )
+
+    vectors = [
+        "[" + ",".join(str(float(x)) for x in storage.truncate(q)) + "]" for q in query_embeddings
+    ]
+    scopes = [NO_DISH if d is None else d for d in dish_ids]
+    return text(
+        f"""
+        SELECT q.ord, c.id, c.content, c.dish_id, c.chunk_index, h.dist
+        FROM unnest(CAST(:vectors AS {storage.column_sql}[]), CAST(:dish_ids AS bigint[]))
+            WITH ORDINALITY AS q(vec, dish_id, ord)
+        CROSS JOIN LATERAL (
+            (SELECT s.chunk_id, s.dist FROM (
+                SELECT e.chunk_id, e.embedding <=> q.vec AS dist
+                FROM kb_embedding e
+                WHERE q.dish_id = {NO_DISH}
+                ORDER BY {index_order}
+                LIMIT :candidates
+            ) s ORDER BY s.dist LIMIT :top_k)
+            UNION ALL
+            (SELECT s.chunk_id, s.dist FROM (
+                SELECT e.chunk_id, e.embedding <=> q.vec AS dist
+                FROM kb_embedding e
+                WHERE e.dish_id = q.dish_id
+                OFFSET 0
+            ) s ORDER BY s.dist LIMIT :top_k)
+        ) h
+        JOIN kb_chunk c ON c.id = h.chunk_id
+        ORDER BY q.ord, h.dist
+        """
+    ).bindparams(vectors=vectors, dish_ids=scopes, candidates=candidates, top_k=top_k)
+
+
+def _scope_size_statement(dish_id: int, limit: int) -> Select[Any]:
+    """Count a dish's embeddings, stopping at ``limit``."""
+    scoped = select(KBEmbedding.chunk_id).where(KBEmbedding.dish_id == dish_id).limit(limit)
+    return select(func.count()).select_from(scoped.subquery())
+
+
+def _snapshot_state_statement(base_chunk_id: int) -> Select[int, int, str, str]:
+    """Count, highest chunk id and content digests of the exported embedding rows."""
+    row_hash = func.md5(
+        func.concat_ws(
+            "|",
+            KBEmbedding.chunk_id,
+            KBEmbedding.dish_id,
+            KBChunk.chunk_index,
+            KBChunk.content,
+            cast(KBEmbedding.embedding, Text),
+        )
+    )
+    rows = func.string_agg(row_hash, aggregate_order_by(literal(""), KBEmbedding.chunk_id))
+    return select(
+        func.count(),
+        func.coalesce(func.max(KBEmbedding.chunk_id), 0),
+        func.coalesce(func.md5(rows), ""),
+        func.coalesce(func.md5(rows.filter(KBEmbedding.chunk_id <= base_chunk_id)), ""),
+    ).join(KBChunk, KBChunk.id == KBEmbedding.chunk_id)
+
+
+def _binary_candidates(
+    query: list[float],
+    limit: int,
+    dish_id: int | None,
+    storage: VectorStorage,
+) -> Any:
+    """Subquery of the ``limit`` chunk ids nearest to ``query`` by Hamming distance."""
+    bits = BIT(storage.dim)
+    stored = cast(func.binary_quantize(KBEmbedding.embedding), bits)
+    wanted = cast(func.binary_quantize(cast(query, Vector(storage.dim))), bits)
+
+    stmt = select(KBEmbedding.chunk_id)
+    if dish_id is not None:
+        stmt = stmt.where(KBEmbedding.dish_id == dish_id)
+    return stmt.order_by(stored.hamming_distance(wanted)).limit(limit).subquery("candidates")
+
+
+_INDEX_VALID = text(
+    "SELECT coalesce(bool_and(i.indisvalid), false) FROM pg_index i "
+    "JOIN pg_class c ON c.oid = i.indexrelid WHERE c.relname = 'kb_embedding_hnsw'"
+)
+
+
+def _to_hits(rows: Sequence[Any]) -> list[SearchHit]:
+    """Convert (id, content, dish_id, chunk_index, distance) rows to hits."""
+    hits = []
+    for chunk_id, content, chunk_dish_id, chunk_index, dist in rows:
+        dist_f = float(dist) if dist is not None else 1.0
+        score = max(0.0, 1.0 - dist_f)
+        hits.append(
+            SearchHit(
+                chunk_id=int(chunk_id),
+                content=content,
+                score=score,
+                dish_id=chunk_dish_id,
+                chunk_index=chunk_index,
+            )
+        )
+    return hits
+
+
+def _group_batch_hits(rows: Sequence[Any], n_queries: int) -> list[list[SearchHit]]:
+    """Split batch search rows into one hit list per query, in query order."""
+    grouped: list[list[Any]] = [[] for _ in range(n_queries)]
+    for ord_, *row in rows:
+        grouped[int(ord_) - 1].append(row)
+    return [_to_hits(group) for group in grouped]
 
 
 class EmbeddingRepository:
@@ -26,41 +334,212 @@ class EmbeddingRepository:
 
     def create(self, chunk_id: int, embedding: list[float]) -> KBEmbedding:
         """Create a new embedding for a chunk."""
-        emb = KBEmbedding(chunk_id=chunk_id, embedding=embedding)
+        dish_id = self._db.scalar(select(KBChunk.dish_id).where(KBChunk.id == chunk_id))
+        emb = KBEmbedding(
+            chunk_id=chunk_id,
+            dish_id=dish_id,
+            embedding=VECTOR_STORAGE.truncate(embedding),
+        )
         self._db.add(emb)
         self._db.flush()
         return emb
 
+    def create_many(self, rows: list[tuple[int, list[float]]]) -> int:
+        """Bulk insert (chunk_id, embedding) rows, skipping indexed chunks; return rows inserted."""
+        if not rows:
+            return 0
+        stmt = (
+            insert(KBEmbedding)
+            .on_conflict_do_nothing(index_elements=["chunk_id"])
+            .returning(KBEmbedding.chunk_id)
+        )
+        inserted = self._db.scalars(
+            stmt,
+            [
+                {"chunk_id": chunk_id, "embedding": VECTOR_STORAGE.truncate(embedding)}
+                for chunk_id, embedding in rows
+            ],
+        ).all()
+        if not inserted:
+            return 0
+        # Denormalize the chunks' dish ids for dish-scoped search
+        self._db.execute(
+            update(KBEmbedding)
+            .where(
+                KBEmbedding.chunk_id == KBChunk.id,
+                KBEmbedding.chunk_id.in_(list(inserted)),
+            )
+            .values(dish_id=KBChunk.dish_id)
+        )
+        return len(inserted)
+
     def search_similar(
         self,
         query_embedding: list[float],
         top_k: int,
         dish_id: int | None = None,
+        ef_search: int | None = None,
+        path: SearchPath | None = None,
+    ) -> list[SearchHit]:
+        """Search for similar chunks using cosine distance (``ef_search`` is per query)."""
+        options = _path_settings_statement(ef_search, top_k, path)
+        if options is not None:
+            self._db.execute(options)
+        stmt = _search_statement(query_embedding, top_k, dish_id, path=path)
+        return _to_hits(self._db.execute(stmt).all())
+
+    def search_hybrid(
+        self,
+        query_embedding: list[float],
+        query_text: str,
+        top_k: int,
+        dish_id: int | None = None,
+        ef_search: int | None = None,
+        path: SearchPath | None = None,
+        candidates: int = 20,
+        rrf_k: int = 60,
     ) -> list[SearchHit]:
-        """Search for similar chunks using cosine distance."""
+        """Search by vector and full text, fused by reciprocal rank (one round trip)."""
+        options = _path_settings_statement(ef_search, candidates, path)
+        if options is not None:
+            self._db.execute(options)
+        stmt = _hybrid_statement(
+            query_embedding, query_text, top_k, dish_id, candidates, rrf_k, path=path
+        )
+        return _to_hits(self._db.execute(stmt).all())
+
+    def search_batch(
+        self,
+        query_embeddings: Sequence[Sequence[float]],
+        top_k: int,
+        dish_ids: Sequence[int | None] | None = None,
+        ef_search: int | None = None,
+    ) -> list[list[SearchHit]]:
+        """Search for several queries (each with an optional dish) in one statement."""
+        if not query_embeddings:
+            return []
+        if dish_ids is None:
+            dish_ids = [None] * len(query_embeddings)
+        options = _scan_settings_statement(ef_search, top_k)
+        if options is not None:
+            self._db.execute(options)
+        rows = self._db.execute(_batch_search_statement(query_embeddings, dish_ids, top_k)).all()
+        return _group_batch_hits(rows, len(query_embeddings))
+
+    def scope_size(self, dish_id: int, limit: int) -> int:
+        """Number of embeddings of a dish, counted up to ``limit``."""
+        return self._db.scalar(_scope_size_statement(dish_id, limit)) or 0
+
+    def snapshot_state(self, base_chunk_id: int = 0) -> SnapshotState:
+        """
+        Fingerprint the exported rows; the digest changes whenever any of them does.
+
+        ``base_digest`` covers only rows up to ``base_chunk_id``: when it
+        matches an older snapshot's digest, that snapshot can be extended
+        with the rows after it instead of being rebuilt.
+        """
+        rows, max_chunk_id, digest, base_digest = self._db.execute(
+            _snapshot_state_statement(base_chunk_id)
+        ).one()
+        return SnapshotState(int(rows), int(max_chunk_id), digest, base_digest)
+
+    def export_rows(self, after_chunk_id: int = 0) -> list[tuple[int, int | None, int, str, Any]]:
+        """Return (chunk_id, dish_id, chunk_index, content, embedding) rows after a chunk id."""
         stmt = (
             select(
-                KBChunk.id,
+                KBEmbedding.chunk_id,
+                KBEmbedding.dish_id,
+                KBChunk.chunk_index,
                 KBChunk.content,
-                KBEmbedding.embedding.cosine_distance(query_embedding).label("dist"),
+                # halfvec storage is read back as float32
+                cast(KBEmbedding.embedding, Vector(VECTOR_STORAGE.dim)),
             )
-            .join(KBEmbedding, KBEmbedding.chunk_id == KBChunk.id)
+            .join(KBChunk, KBChunk.id == KBEmbedding.chunk_id)
+            .where(KBEmbedding.chunk_id > after_chunk_id)
+            .order_by(KBEmbedding.chunk_id)
         )
+        return [tuple(row) for row in self._db.execute(stmt).all()]
 
-        if dish_id is not None:
-            stmt = stmt.where(KBChunk.dish_id == dish_id)
+    def commit(self) -> None:
+        """Commit the current transaction."""
+        self._db.commit()
 
-        stmt = stmt.order_by(text("dist ASC")).limit(top_k)
-        rows = self._db.execute(stmt).all()
+    def rollback(self) -> None:
+        """Roll back the current transaction."""
+        self._db.rollback()
 
-        hits = []
-        for chunk_id, content, dist in rows:
-            dist_f = float(dist) if dist is not None else 1.0
-            score = max(0.0, 1.0 - dist_f)
-            hits.append(SearchHit(chunk_id=int(chunk_id), content=content, score=score))
 
-        return hits
+class AsyncEmbeddingRepository:
+    """Async (request path) variant of EmbeddingRepository."""
 
-    def commit(self) -> None:
-        """Commit the current transaction."""
-        self._db.commit()
+    def __init__(self, db: AsyncSession):
+        self._db = db
+
+    async def count(self) -> int:
+        """Count total embeddings."""
+        return await self._db.scalar(select(func.count()).select_from(KBEmbedding)) or 0
+
+    async def index_ready(self) -> bool:
+        """Whether the HNSW index exists and is valid (built without errors)."""
+        return bool(await self._db.scalar(_INDEX_VALID))
+
+    async def search_similar(
+        self,
+        query_embedding: list[float],
+        top_k: int,
+        dish_id: int | None = None,
+        ef_search: int | None = None,
+        path: SearchPath | None = None,
+    ) -> list[SearchHit]:
+        """Search for similar chunks using cosine distance (``ef_search`` is per query)."""
+        options = _path_settings_statement(ef_search, top_k, path)
+        if options is not None:
+            await self._db.execute(options)
+        stmt = _search_statement(query_embedding, top_k, dish_id, path=path)
+        result = await self._db.execute(stmt)
+        return _to_hits(result.all())
+
+    async def search_hybrid(
+        self,
+        query_embedding: list[float],
+        query_text: str,
+        top_k: int,
+        dish_id: int | None = None,
+        ef_search: int | None = None,
+        path: SearchPath | None = None,
+        candidates: int = 20,
+        rrf_k: int = 60,
+    ) -> list[SearchHit]:
+        """Search by vector and full text, fused by reciprocal rank (one round trip)."""
+        options = _path_settings_statement(ef_search, candidates, path)
+        if options is not None:
+            await self._db.execute(options)
+        stmt = _hybrid_statement(
+            query_embedding, query_text, top_k, dish_id, candidates, rrf_k, path=path
+        )
+        result = await self._db.execute(stmt)
+        return _to_hits(result.all())
+
+    async def search_batch(
+        self,
+        query_embeddings: Sequence[Sequence[float]],
+        top_k: int,
+        dish_ids: Sequence[int | None] | None = None,
+        ef_search: int | None = None,
+    ) -> list[list[SearchHit]]:
+        """Search for several queries (each with an optional dish) in one statement."""
+        if not query_embeddings:
+            return []
+        if dish_ids is None:
+            dish_ids = [None] * len(query_embeddings)
+        options = _scan_settings_statement(ef_search, top_k)
+        if options is not None:
+            await self._db.execute(options)
+        result = await self._db.execute(
+            _batch_search_statement(query_embeddings, dish_ids, top_k)
+        )
+        return _group_batch_hits(result.all(), len(query_embeddings))
+
+    async def scope_size(self, dish_id: int, limit: int) -> int:
+        """Number of embeddings of a dish, counted up to ``limit``."""
+        return await self._db.scalar(_scope_size_statement(dish_id, limit)) or 0
@@ -0,0 +1,52 @@
+from sqlalchemy import Select, select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, joinedload
+
+from src.models.entities import DishFact
+
+
+def _find_statement(dish_id: int, subjects: list[str]) -> Select[DishFact]:
+    """Facts of one dish for the given subjects, with the dish eagerly loaded."""
+    return (
+        select(DishFact)
+        .options(joinedload(DishFact.dish))
+        .where(DishFact.dish_id == dish_id, DishFact.subject.in_(subjects))
+        .order_by(DishFact.id)
+    )
+
+
+class DishFactRepository:
+    """Repository for DishFact entity operations."""
+
+    def __init__(self, db: Session):
+        self._db = db
+
+    def find(self, dish_id: int, subjects: list[str]) -> list[DishFact]:
+        """Get a dish's facts for the given subjects, with the dish loaded."""
+        return list(self._db.execute(_find_statement(dish_id, subjects)).scalars().all())
+
+    def count(self) -> int:
+        """Count total facts."""
+        return self._db.scalar(select(func.count()).select_from(DishFact)) or 0
+
+    def create_many(self, facts: list[DishFact]) -> list[DishFact]:
+        """Create multiple facts."""
+        self._db.add_all(facts)
+        self._db.flush()
+        return facts
+
+    def commit(self) -> None:
+        """Commit the current transaction."""
+        self._db.commit()
+
+
+class AsyncDishFactRepository:
+    """Async (request path) variant of DishFactRepository."""
+
+    def __init__(self, db: AsyncSession):
+        self._db = db
+
+    async def find(self, dish_id: int, subjects: list[str]) -> list[DishFact]:
+        """Get a dish's facts for the given subjects, with the dish loaded."""
+        result = await self._db.execute(_find_statement(dish_id, subjects))
+        return list(result.scalars().all())
@@ -0,0 +1,66 @@
+from sqlalchemy import bindparam, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+
+_PING = text("SELECT 1")
+
+# Planner row estimates (maintained by ANALYZE/autovacuum; -1 = never analyzed)
+_TABLE_ESTIMATES = text(
+    "SELECT c.relname, c.reltuples::bigint FROM pg_class c "
+    "WHERE c.relkind = 'r' AND c.relname IN :relations AND pg_table_is_visible(c.oid)"
+).bindparams(bindparam("relations", expanding=True))
+
+
+class MaintenanceRepository:
+    """Repository for database-level maintenance operations."""
+
+    def __init__(self, db: Session):
+        self._db = db
+
+    def ensure_extension(self, name: str) -> bool:
+        """Create an extension if missing; return False if it is not available."""
+        try:
+            self._db.execute(text(f'CREATE EXTENSION IF NOT EXISTS "{name}"'))
+            self._db.commit()
+            return True
+        except Exception:
+            self._db.rollback()
+            return False
+
+    def prewarm(self, relation: str) -> int:
+        """Load a table or index into shared buffers; return the number of blocks read."""
+        try:
+            blocks = self._db.scalar(
+                text("SELECT pg_prewarm(CAST(:relation AS regclass))"),
+                {"relation": relation},
+            )
+            self._db.commit()
+            return int(blocks or 0)
+        except Exception:
+            # Missing relation or extension: nothing to prewarm
+            self._db.rollback()
+            return 0
+
+
+class AsyncMaintenanceRepository:
+    """Async (request path) database checks for the health endpoints."""
+
+    def __init__(self, db: AsyncSession):
+        self._db = db
+
+    async def ping(self) -> bool:
+        """Round trip to the database; False if it cannot be reached."""
+        try:
+            return bool(await self._db.scalar(_PING) == 1)
+        except Exception:
+            return False
+
+    async def table_estimates(self, relations: list[str]) -> dict[str, int]:
+        """Row estimates of tables from pg_class, without scanning them."""
+        result = await self._db.execute(_TABLE_ESTIMATES, {"relations": relations})
+        return {name: int(rows) for name, rows in result.all()}
+
+    async def exact_count(self, relation: str) -> int:
+        """Exact row count of a table (a full scan: for tables never analyzed)."""
+        return await self._db.scalar(text(f'SELECT count(*) FROM "{relation}"')) or 0
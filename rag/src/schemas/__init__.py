@@ -1,13 +1,30 @@
-from .dish import DishOut
+from .dish import DishOut, DishView
 from .chat import ChatIn, ChatOut, SourceOut
-from .common import HealthResponse, SeedResponse, IndexResponse
+from .search import SearchQueryIn, SearchBatchIn, SearchHitOut, SearchResultOut, SearchBatchOut
+from .common import (
+    HealthResponse,
+    LiveResponse,
+    ReadyResponse,
+    MetricsResponse,
+    SeedResponse,
+    IndexResponse,
+)
 
 __all__ = [
     "DishOut",
+    "DishView",
     "ChatIn",
     "ChatOut",
     "SourceOut",
+    "SearchQueryIn",
+    "SearchBatchIn",
+    "SearchHitOut",
+    "SearchResultOut",
+    "SearchBatchOut",
     "HealthResponse",
+    "LiveResponse",
+    "ReadyResponse",
+    "MetricsResponse",
     "SeedResponse",
     "IndexResponse",
 ]
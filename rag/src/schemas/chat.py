@@ -12,6 +12,8 @@ class ChatIn(BaseModel):
     question: str = Field(..., min_length=1)
     dish_id: int | None = None
     top_k: int = Field(default=settings.top_k_default, ge=1, le=12)
+    # HNSW candidate list size for this request (default depends on allergy mode)
+    ef_search: int | None = Field(default=None, ge=1, le=1000)
 
 
 class SourceOut(BaseModel):
@@ -1,3 +1,5 @@
+from datetime import datetime
+
 from pydantic import BaseModel
 
 
@@ -6,11 +8,49 @@ class HealthResponse(BaseModel):
 
     ok: bool
     ollama_reachable: bool
+    ollama_circuit: str
     embed_model: str
     chat_model: str
     dishes: int
     chunks: int
     embeddings: int
+    vector_index: bool
+    # Row counts are planner estimates (pg_class) collected at stats_at
+    stats_estimated: bool
+    stats_at: datetime
+    checked_at: datetime
+
+
+class LiveResponse(BaseModel):
+    """Response schema for liveness endpoint."""
+
+    ok: bool
+
+
+class ReadyResponse(BaseModel):
+    """Response schema for readiness endpoint."""
+
+    ready: bool
+    warmup: dict[str, float | bool]
+    checks: dict[str, bool]
+    checked_at: datetime
+
+
+class MetricsResponse(BaseModel):
+    """Response schema for in-process metrics endpoint."""
+
+    query_embedding_cache: dict[str, float]
+    answer_cache: dict[str, float]
+    search_cache: dict[str, float]
+    dish_catalog: dict[str, float | str]
+    dish_scope_cache: dict[str, float]
+    chat_single_flight: dict[str, float]
+    trace_writer: dict[str, float]
+    llm_scheduler: dict[str, dict[str, float]]
+    ollama_resilience: dict[str, float | str]
+    ollama_backends: list[dict[str, float | str]]
+    db_pools: dict[str, dict[str, float]]
+    vector_index: dict[str, float]
 
 
 class SeedResponse(BaseModel):
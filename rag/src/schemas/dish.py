@@ -1,3 +1,5 @@
+from typing import Any
+
 from pydantic import BaseModel
 
 
@@ -11,3 +13,13 @@ class DishOut(BaseModel):
     tags: list[str]
 
     model_config = {"from_attributes": True}
+
+
+def _drop_required(schema: dict[str, Any]) -> None:
+    schema.pop("required", None)
+
+
+class DishView(DishOut):
+    """A listed dish with only the requested ``fields``; every property is optional."""
+
+    model_config = {"from_attributes": True, "json_schema_extra": _drop_required}
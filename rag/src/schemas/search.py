@@ -0,0 +1,47 @@
+from pydantic import BaseModel, Field
+
+from src.config import get_settings
+
+
+settings = get_settings()
+
+
+class SearchQueryIn(BaseModel):
+    """One question of a batch search."""
+
+    question: str = Field(..., min_length=1)
+    dish_id: int | None = None
+
+
+class SearchBatchIn(BaseModel):
+    """Request schema for batch search endpoint."""
+
+    queries: list[SearchQueryIn] = Field(
+        ..., min_length=1, max_length=settings.search_batch_max_queries
+    )
+    top_k: int = Field(default=settings.top_k_default, ge=1, le=12)
+
+
+class SearchHitOut(BaseModel):
+    """Retrieved chunk in search response."""
+
+    chunk_id: int
+    dish_id: int | None
+    score: float
+    preview: str
+
+
+class SearchResultOut(BaseModel):
+    """Retrieval result of one question."""
+
+    question: str
+    dish_id: int | None
+    decision: str
+    confidence: float
+    hits: list[SearchHitOut]
+
+
+class SearchBatchOut(BaseModel):
+    """Response schema for batch search endpoint, one result per query in order."""
+
+    results: list[SearchResultOut]
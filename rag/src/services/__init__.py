@@ -1,15 +1,45 @@
 from .ollama_service import OllamaService
+from .ollama_pool import BackendPool
 from .text_service import TextService
 from .prompt_service import PromptService
 from .retrieval_service import RetrievalService
 from .chat_service import ChatService
+from .search_service import SearchService
+from .search_cache import SearchResultCache
+from .scope_cache import DishScopeCache
+from .dish_catalog import DishCatalog
+from .health_monitor import HealthMonitor
 from .seed_service import SeedService
+from .indexing_service import IndexingService
+from .embedding_cache import QueryEmbeddingCache
+from .answer_cache import SemanticAnswerCache
+from .trace_writer import TraceWriter
+from .fact_service import FactService
+from .evidence_packer import EvidencePacker
+from .warmup_service import WarmupService
+from .vector_index import NumpyVectorIndex
+from .reranker import Reranker
 
 __all__ = [
     "OllamaService",
+    "BackendPool",
     "TextService",
     "PromptService",
     "RetrievalService",
     "ChatService",
+    "SearchService",
+    "SearchResultCache",
+    "DishScopeCache",
+    "DishCatalog",
+    "HealthMonitor",
     "SeedService",
+    "IndexingService",
+    "QueryEmbeddingCache",
+    "SemanticAnswerCache",
+    "TraceWriter",
+    "FactService",
+    "EvidencePacker",
+    "WarmupService",
+    "NumpyVectorIndex",
+    "Reranker",
 ]
@@ -0,0 +1,194 @@
+import hashlib
+import itertools
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
+from typing import Callable
+
+import numpy as np
+
+from src.config import Settings
+from src.core.constants import DecisionType
+from src.repositories.embedding_repository import SearchHit
+
+
+def content_fingerprint(content: str) -> str:
+    """Fingerprint of chunk content; matches Postgres ``md5(content)``."""
+    return hashlib.md5(content.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class CachedAnswer:
+    """Previously generated answer together with the evidence it cited."""
+
+    answer: str
+    decision: DecisionType
+    confidence: float
+    hits: list[SearchHit]
+    similarity: float = 0.0
+    # Trace of the turn that generated the answer
+    trace_id: int | None = None
+
+    @property
+    def chunk_fingerprints(self) -> dict[int, str]:
+        """Fingerprints of the cited chunks at the time the answer was cached."""
+        return {h.chunk_id: content_fingerprint(h.content) for h in self.hits}
+
+
+@dataclass
+class _Entry:
+    scope: tuple[int | None, bool]
+    vector: np.ndarray
+    answer: CachedAnswer
+    expires_at: float
+
+
+@dataclass
+class _Scope:
+    ids: list[int] = field(default_factory=list)
+    matrix: np.ndarray | None = None
+
+
+class SemanticAnswerCache:
+    """
+    App-lifetime cache of answers for near-duplicate questions.
+
+    Entries are matched by cosine distance between query embeddings within
+    the same scope (``dish_id`` and allergy mode). Allergy questions use a
+    stricter distance threshold. Entries are dropped when a chunk they cited
+    is invalidated.
+    """
+
+    def __init__(self, settings: Settings, clock: Callable[[], float] = time.monotonic):
+        self._max_size = settings.answer_cache_size
+        self._ttl = settings.answer_cache_ttl
+        self._max_distance = settings.answer_cache_max_distance
+        self._allergy_max_distance = settings.answer_cache_allergy_max_distance
+        self._clock = clock
+        self._ids = itertools.count(1)
+        self._entries: OrderedDict[int, _Entry] = OrderedDict()
+        self._scopes: dict[tuple[int | None, bool], _Scope] = {}
+        self._by_chunk: dict[int, set[int]] = {}
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @property
+    def enabled(self) -> bool:
+        """Whether the cache stores anything at all."""
+        return self._max_size > 0
+
+    def lookup(
+        self,
+        query_embedding: list[float],
+        dish_id: int | None,
+        is_allergy: bool,
+    ) -> CachedAnswer | None:
+        """Return the closest cached answer within the scope's distance threshold."""
+        scope_key = (dish_id, is_allergy)
+        scope = self._scopes.get(scope_key)
+        if not self.enabled or scope is None or not scope.ids:
+            self.misses += 1
+            return None
+
+        if scope.matrix is None:
+            scope.matrix = np.vstack([self._entries[i].vector for i in scope.ids])
+
+        sims = scope.matrix @ self._unit(query_embedding)
+        best = int(np.argmax(sims))
+        entry_id = scope.ids[best]
+        entry = self._entries[entry_id]
+        max_distance = self._allergy_max_distance if is_allergy else self._max_distance
+
+        if entry.expires_at <= self._clock():
+            self._remove(entry_id)
+            self.misses += 1
+            return None
+
+        if 1.0 - float(sims[best]) > max_distance:
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(entry_id)
+        self.hits += 1
+        return replace(entry.answer, similarity=float(sims[best]))
+
+    def store(
+        self,
+        query_embedding: list[float],
+        dish_id: int | None,
+        is_allergy: bool,
+        answer: CachedAnswer,
+    ) -> None:
+        """Cache an answer; answers without cited evidence are not cached."""
+        if not self.enabled or not answer.hits:
+            return
+
+        entry_id = next(self._ids)
+        scope_key = (dish_id, is_allergy)
+        self._entries[entry_id] = _Entry(
+            scope=scope_key,
+            vector=self._unit(query_embedding),
+            answer=answer,
+            expires_at=self._clock() + self._ttl,
+        )
+        scope = self._scopes.setdefault(scope_key, _Scope())
+        scope.ids.append(entry_id)
+        scope.matrix = None
+        for hit in answer.hits:
+            self._by_chunk.setdefault(hit.chunk_id, set()).add(entry_id)
+
+        while len(self._entries) > self._max_size:
+            self._remove(next(iter(self._entries)))
+
+    def invalidate_chunks(self, chunk_ids: list[int]) -> int:
+        """Drop every cached answer citing any of the given chunks."""
+        entry_ids = set()
+        for chunk_id in chunk_ids:
+            entry_ids |= self._by_chunk.get(chunk_id, set())
+        for entry_id in entry_ids:
+            self._remove(entry_id)
+        self.invalidations += len(entry_ids)
+        return len(entry_ids)
+
+    def clear(self) -> None:
+        """Drop every cached answer."""
+        self._entries.clear()
+        self._scopes.clear()
+        self._by_chunk.clear()
+
+    def stats(self) -> dict[str, float]:
+        """Return cache size and hit/miss counters."""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self._max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "invalidations": self.invalidations,
+            "hit_ratio": (self.hits / lookups) if lookups else 0.0,
+        }
+
+    def _remove(self, entry_id: int) -> None:
+        entry = self._entries.pop(entry_id, None)
+        if entry is None:
+            return
+
+        scope = self._scopes[entry.scope]
+        scope.ids.remove(entry_id)
+        scope.matrix = None
+        if not scope.ids:
+            del self._scopes[entry.scope]
+
+        for hit in entry.answer.hits:
+            cited_by = self._by_chunk.get(hit.chunk_id)
+            if cited_by is not None:
+                cited_by.discard(entry_id)
+                if not cited_by:
+                    del self._by_chunk[hit.chunk_id]
+
+    @staticmethod
+    def _unit(vector: list[float]) -> np.ndarray:
+        v = np.asarray(vector, dtype=np.float32)
+        norm = float(np.linalg.norm(v))
+        return v / norm if norm > 0 else v
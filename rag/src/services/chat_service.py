@@ -1,13 +1,27 @@
-from dataclasses import dataclass
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable
 
 from src.config import Settings
 from src.core.constants import DecisionType
-from src.repositories import ChatRepository, EmbeddingRepository
+from src.core.scheduler import Priority
+from src.core.single_flight import SingleFlight
+from src.repositories import AsyncChatRepository, AsyncChunkRepository, AsyncEmbeddingRepository
+from src.repositories.embedding_repository import SearchHit
 from src.schemas.chat import ChatOut, SourceOut
 from .ollama_service import OllamaService
+from .embedding_cache import QueryEmbeddingCache
+from .answer_cache import CachedAnswer, SemanticAnswerCache
 from .text_service import TextService
 from .prompt_service import PromptService
-from .retrieval_service import RetrievalService
+from .retrieval_service import RetrievalService, RetrievalResult
+from .evidence_packer import EvidencePacker
+from .fact_service import FactService
+from .trace_writer import TraceRecord, TraceWriter, write_trace_records_async
+
+
+logger = logging.getLogger(__name__)
 
 
 @dataclass
@@ -17,6 +31,31 @@ class ChatRequest:
     question: str
     dish_id: int | None
     top_k: int
+    ef_search: int | None = None
+
+
+@dataclass
+class ChatStreamEvent:
+    """Event emitted by the streaming chat flow."""
+
+    event: str
+    data: dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class _PreparedQuery:
+    """Query state shared by the blocking and streaming flows."""
+
+    question: str
+    dish_id: int | None
+    is_allergy: bool
+    query_embedding: list[float]
+    retrieval: RetrievalResult
+    answer: str | None = None
+    from_cache: bool = False
+    # This request ran the LLM (not answered from a cache or by a coalesced peer)
+    generated: bool = False
+    trace_meta: dict[str, Any] = field(default_factory=dict)
 
 
 class ChatService:
@@ -28,9 +67,16 @@ class ChatService:
         text_service: TextService,
         prompt_service: PromptService,
         retrieval_service: RetrievalService,
-        chat_repo: ChatRepository,
-        embedding_repo: EmbeddingRepository,
+        chat_repo: AsyncChatRepository,
+        embedding_repo: AsyncEmbeddingRepository,
         settings: Settings,
+        embedding_cache: QueryEmbeddingCache | None = None,
+        answer_cache: SemanticAnswerCache | None = None,
+        chunk_repo: AsyncChunkRepository | None = None,
+        single_flight: SingleFlight[tuple, Any] | None = None,
+        trace_writer: TraceWriter | None = None,
+        fact_service: FactService | None = None,
+        evidence_packer: EvidencePacker | None = None,
     ):
         self._ollama = ollama_service
         self._text = text_service
@@ -39,6 +85,13 @@ class ChatService:
         self._chat_repo = chat_repo
         self._embedding_repo = embedding_repo
         self._settings = settings
+        self._embedding_cache = embedding_cache
+        self._answer_cache = answer_cache
+        self._chunk_repo = chunk_repo
+        self._single_flight = single_flight
+        self._trace_writer = trace_writer
+        self._fact_service = fact_service
+        self._packer = evidence_packer or EvidencePacker(settings)
 
     async def process_query(self, request: ChatRequest) -> ChatOut:
         """Process a chat query through the RAG pipeline."""
@@ -46,60 +99,439 @@ class ChatService:
         normalized_question = self._text.normalize(request.question)
         is_allergy = self._text.is_allergy_query(normalized_question)
 
-        # 2. Create chat turn
-        turn = self._chat_repo.create_turn(
-            user_text=normalized_question,
-            dish_id=request.dish_id,
+        # 2. Closed-form allergen/diet questions are answered from the fact table
+        prepared = await self._prepare_from_facts(
+            normalized_question, request.dish_id, is_allergy
         )
 
-        # 3. Generate query embedding
-        query_embedding = await self._ollama.generate_embedding(normalized_question)
+        # 3. Reserve turn and trace ids (one per caller) while the question is embedded
+        ids = self._reserve_ids()
+
+        # 4-6. Embed, retrieve and generate; embedding and generation are shared with
+        # identical in-flight requests, database work stays on this request's session
+        if prepared is None:
+            try:
+                prepared = await self._answer(normalized_question, request, is_allergy, ids)
+            except BaseException:
+                await self._settle(ids)
+                raise
+
+        retrieval_result = prepared.retrieval
+        answer = prepared.answer or ""
+
+        # 7. Write turn and trace (write-behind when a trace writer is configured)
+        turn_id, trace_id = await ids
+        if prepared.generated:
+            self._remember(prepared, answer, trace_id)
+        await self._persist(turn_id, trace_id, prepared, answer)
+
+        # 8. Build response
+        return ChatOut(
+            answer=answer,
+            decision=retrieval_result.decision.value,
+            confidence=retrieval_result.confidence,
+            sources=self._build_sources(retrieval_result.hits),
+            trace_id=trace_id,
+        )
+
+    async def stream_query(self, request: ChatRequest) -> AsyncIterator[ChatStreamEvent]:
+        """
+        Process a chat query, streaming the answer as it is generated.
+
+        Emits a ``sources`` event (decision, confidence and sources) first,
+        then one ``token`` event per answer delta, and finally a ``done``
+        event with the trace id once the trace and turn have been handed to
+        the writer.
+        """
+        normalized_question = self._text.normalize(request.question)
+        is_allergy = self._text.is_allergy_query(normalized_question)
+        prepared = await self._prepare_from_facts(
+            normalized_question, request.dish_id, is_allergy
+        )
+        ids = self._reserve_ids()
+
+        if prepared is None:
+            try:
+                prepared = await self._prepare(normalized_question, request, is_allergy, ids)
+            except BaseException:
+                await self._settle(ids)
+                raise
+        retrieval_result = prepared.retrieval
+        hits = retrieval_result.hits
+        decision = retrieval_result.decision
+
+        yield ChatStreamEvent(
+            event="sources",
+            data={
+                "decision": decision.value,
+                "confidence": retrieval_result.confidence,
+                "sources": [s.model_dump() for s in self._build_sources(hits)],
+            },
+        )
+
+        parts: list[str] = []
+        try:
+            if prepared.answer is not None:
+                parts.append(prepared.answer)
+                yield ChatStreamEvent(event="token", data={"text": parts[-1]})
+            elif decision == DecisionType.DISCLAIMER and not hits:
+                parts.append(self._prompt.get_no_evidence_response())
+                yield ChatStreamEvent(event="token", data={"text": parts[-1]})
+            else:
+                system_prompt, user_prompt = self._build_prompts(
+                    prepared.question, hits, prepared.is_allergy
+                )
+                async for delta in self._ollama.chat_stream(
+                    system_prompt, user_prompt, priority=self._priority(prepared.is_allergy)
+                ):
+                    parts.append(delta)
+                    yield ChatStreamEvent(event="token", data={"text": delta})
+
+                if decision == DecisionType.SOFT_DISCLAIMER:
+                    suffix = self._prompt.add_soft_disclaimer("")
+                    parts.append(suffix)
+                    yield ChatStreamEvent(event="token", data={"text": suffix})
+        except BaseException as e:
+            # Ollama failures and client disconnects still leave the turn's audit trail
+            await self._persist_interrupted(ids, prepared, "".join(parts).strip(), e)
+            raise
+
+        answer = "".join(parts).strip()
+        turn_id, trace_id = await ids
+        if not prepared.from_cache:
+            self._remember(prepared, answer, trace_id)
+        await self._persist(turn_id, trace_id, prepared, answer)
+
+        yield ChatStreamEvent(event="done", data={"trace_id": trace_id, "answer": answer})
+
+    async def _prepare_from_facts(
+        self,
+        question: str,
+        dish_id: int | None,
+        is_allergy: bool,
+    ) -> _PreparedQuery | None:
+        """Answer from structured dish facts, without embedding or the LLM, if possible."""
+        if self._fact_service is None:
+            return None
+
+        fact = await self._fact_service.answer(question, dish_id)
+        if fact is None:
+            return None
+
+        return _PreparedQuery(
+            question=question,
+            dish_id=dish_id,
+            is_allergy=is_allergy,
+            query_embedding=[],
+            retrieval=RetrievalResult(hits=[], confidence=1.0, decision=DecisionType.ANSWER),
+            answer=fact.answer,
+            from_cache=True,
+            trace_meta={
+                "path": "fact",
+                "dish_id": fact.dish_id,
+                "subject": fact.subject,
+                "fact_ids": fact.fact_ids,
+            },
+        )
+
+    async def _answer(
+        self,
+        question: str,
+        request: ChatRequest,
+        is_allergy: bool,
+        db_ready: Awaitable[Any] | None = None,
+    ) -> _PreparedQuery:
+        """Retrieve evidence and generate (or reuse) the answer."""
+        prepared = await self._prepare(question, request, is_allergy, db_ready)
+        if prepared.answer is None:
+            retrieval_result = prepared.retrieval
+
+            async def generate() -> str:
+                answer = await self._generate_answer(
+                    question=question,
+                    hits=retrieval_result.hits,
+                    decision=retrieval_result.decision,
+                    is_allergy=is_allergy,
+                )
+                # Only the caller that ran the LLM caches the answer, under its trace
+                prepared.generated = True
+                return answer
+
+            key = (
+                "generate",
+                question,
+                is_allergy,
+                retrieval_result.decision,
+                tuple(h.chunk_id for h in retrieval_result.hits),
+            )
+            prepared.answer = await self._coalesced(key, generate)
+        return prepared
+
+    async def _coalesced(self, key: tuple, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run ``fn``, sharing it with identical in-flight calls when coalescing is on.
 
-        # 4. Retrieve similar chunks
-        retrieval_result = self._retrieval.search(
+        Only Ollama calls are shared: the shared task must not use a
+        request-scoped session, which is closed when its request ends.
+        """
+        if self._single_flight is None:
+            return await fn()
+        return await self._single_flight.do(key, fn)
+
+    async def _prepare(
+        self,
+        question: str,
+        request: ChatRequest,
+        is_allergy: bool,
+        db_ready: Awaitable[Any] | None = None,
+    ) -> _PreparedQuery:
+        """
+        Embed the question and retrieve evidence (or a cached answer).
+
+        ``db_ready`` is work still using the request's database session (the
+        id reservation); it overlaps the embedding call and is awaited before
+        the session is used again.
+        """
+        # Generate query embedding
+        priority = self._priority(is_allergy)
+        query_embedding: list[float] = await self._coalesced(
+            ("embed", question), lambda: self._embed_query(question, priority)
+        )
+        if db_ready is not None:
+            await db_ready
+
+        # Reuse the answer of a near-duplicate question, if still valid
+        cached = await self._lookup_answer(query_embedding, request.dish_id, is_allergy)
+        if cached is not None:
+            return _PreparedQuery(
+                question=question,
+                dish_id=request.dish_id,
+                is_allergy=is_allergy,
+                query_embedding=query_embedding,
+                retrieval=RetrievalResult(
+                    hits=cached.hits[: request.top_k],
+                    confidence=cached.confidence,
+                    decision=cached.decision,
+                ),
+                answer=cached.answer,
+                from_cache=True,
+                trace_meta={
+                    "path": "answer_cache",
+                    "cache_hit": True,
+                    "cached_from_trace_id": cached.trace_id,
+                    "cache_similarity": round(cached.similarity, 4),
+                },
+            )
+
+        # Retrieve similar chunks
+        retrieval_result = await self._retrieval.search(
             query_embedding=query_embedding,
             top_k=request.top_k,
             dish_id=request.dish_id,
+            ef_search=self._ef_search(request, is_allergy),
+            query_text=question,
         )
 
-        # 5. Generate answer
-        answer = await self._generate_answer(
-            question=normalized_question,
-            hits=retrieval_result.hits,
-            decision=retrieval_result.decision,
+        return _PreparedQuery(
+            question=question,
+            dish_id=request.dish_id,
             is_allergy=is_allergy,
+            query_embedding=query_embedding,
+            retrieval=retrieval_result,
+            trace_meta=self._retrieval_meta(retrieval_result),
+        )
+
+    async def _lookup_answer(
+        self,
+        query_embedding: list[float],
+        dish_id: int | None,
+        is_allergy: bool,
+    ) -> CachedAnswer | None:
+        """Find a cached answer whose cited chunks are unchanged since it was cached."""
+        if self._answer_cache is None or self._chunk_repo is None:
+            return None
+
+        cached = self._answer_cache.lookup(query_embedding, dish_id, is_allergy)
+        if cached is None:
+            return None
+
+        expected = cached.chunk_fingerprints
+        current = await self._chunk_repo.get_fingerprints(list(expected))
+        changed = [cid for cid, digest in expected.items() if current.get(cid) != digest]
+        if changed:
+            self._answer_cache.invalidate_chunks(changed)
+            return None
+
+        return cached
+
+    def _remember(self, prepared: _PreparedQuery, answer: str, trace_id: int) -> None:
+        """Store a freshly generated answer, and the trace it was written under, in the cache."""
+        if self._answer_cache is None or self._chunk_repo is None:
+            return
+
+        retrieval_result = prepared.retrieval
+        self._answer_cache.store(
+            prepared.query_embedding,
+            prepared.dish_id,
+            prepared.is_allergy,
+            CachedAnswer(
+                answer=answer,
+                decision=retrieval_result.decision,
+                confidence=retrieval_result.confidence,
+                hits=list(retrieval_result.hits),
+                trace_id=trace_id,
+            ),
+        )
+
+    @staticmethod
+    def _priority(is_allergy: bool) -> Priority:
+        """Allergy-mode requests are scheduled ahead of casual ones."""
+        return Priority.HIGH if is_allergy else Priority.NORMAL
+
+    @staticmethod
+    def _retrieval_meta(result: RetrievalResult) -> dict[str, Any]:
+        """Trace metadata describing how evidence was retrieved."""
+        meta: dict[str, Any] = {}
+        if result.search_path is not None:
+            meta["search_path"] = result.search_path.value
+        if result.hybrid:
+            meta["hybrid"] = True
+        if result.rerank_scores is not None:
+            # Per-hit scores are added with the packed chunks, in _persist
+            meta["rerank_candidates"] = result.candidates
+        return meta
+
+    def _ef_search(self, request: ChatRequest, is_allergy: bool) -> int:
+        """HNSW candidate list size: the request's, else higher recall for allergy mode."""
+        if request.ef_search is not None:
+            return request.ef_search
+        if is_allergy:
+            return self._settings.hnsw_ef_search_allergy
+        return self._settings.hnsw_ef_search
+
+    async def _embed_query(self, question: str, priority: Priority) -> list[float]:
+        """Embed the question, going through the query embedding cache if present."""
+        if self._embedding_cache is None:
+            return await self._ollama.generate_embedding(question, priority=priority)
+
+        return await self._embedding_cache.get_or_embed(
+            self._text.canonicalize(question),
+            lambda: self._ollama.generate_embedding(question, priority=priority),
         )
 
-        # 6. Create trace
-        trace = self._chat_repo.create_trace(
-            turn_id=turn.id,
-            used_chunk_ids=[h.chunk_id for h in retrieval_result.hits],
-            scores=[h.score for h in retrieval_result.hits],
+    def _reserve_ids(self) -> asyncio.Future[tuple[int, int]]:
+        """Start reserving the turn and trace ids on the request's session."""
+        return asyncio.ensure_future(self._chat_repo.allocate_ids())
+
+    @staticmethod
+    async def _settle(ids: asyncio.Future[tuple[int, int]]) -> None:
+        """Wait out a reservation on a failed request so it stops using the session."""
+        await asyncio.gather(ids, return_exceptions=True)
+
+    async def _persist_interrupted(
+        self,
+        ids: asyncio.Future[tuple[int, int]],
+        prepared: _PreparedQuery,
+        answer: str,
+        error: BaseException,
+    ) -> None:
+        """
+        Write a streamed turn that did not finish, with the answer streamed so far.
+
+        Shielded so that a cancelled (disconnected) request still records it;
+        a failure to write is logged rather than masking ``error``.
+        """
+        if isinstance(error, (asyncio.CancelledError, GeneratorExit)):
+            reason = "cancelled"
+        else:
+            reason = type(error).__name__
+
+        async def persist() -> None:
+            turn_id, trace_id = await ids
+            await self._persist(turn_id, trace_id, prepared, answer, interrupted=reason)
+
+        try:
+            await asyncio.shield(persist())
+        except Exception:
+            logger.exception("Failed to record interrupted chat stream")
+
+    async def _persist(
+        self,
+        turn_id: int,
+        trace_id: int,
+        prepared: _PreparedQuery,
+        answer: str,
+        interrupted: str | None = None,
+    ) -> None:
+        """
+        Write the chat turn and its RAG trace under the reserved ids.
+
+        The trace's chunks are the ones the evidence packer put in the prompt;
+        retrieved hits it dropped (duplicates, over budget) are listed in the
+        metadata.
+        """
+        retrieval_result = prepared.retrieval
+        packed = {
+            chunk_id
+            for span in self._packer.pack(retrieval_result.hits)
+            for chunk_id in span.chunk_ids
+        }
+        used = [h for h in retrieval_result.hits if h.chunk_id in packed]
+        dropped = [h.chunk_id for h in retrieval_result.hits if h.chunk_id not in packed]
+
+        meta_data = dict(prepared.trace_meta)
+        if dropped:
+            meta_data["dropped_chunk_ids"] = dropped
+        if retrieval_result.rerank_scores is not None:
+            # Aligned with used_chunk_ids; raw cosine scores are the scores column
+            meta_data["rerank_scores"] = [
+                round(score, 4)
+                for hit, score in zip(retrieval_result.hits, retrieval_result.rerank_scores)
+                if hit.chunk_id in packed
+            ]
+        if interrupted is not None:
+            # Streamed answer cut short; bot_text holds what was sent
+            meta_data["stream_interrupted"] = interrupted
+        record = TraceRecord(
+            turn_id=turn_id,
+            trace_id=trace_id,
+            dish_id=prepared.dish_id,
+            user_text=prepared.question,
+            bot_text=answer,
+            used_chunk_ids=[h.chunk_id for h in used],
+            scores=[h.score for h in used],
             confidence=retrieval_result.confidence,
             decision=retrieval_result.decision.value,
+            meta_data=meta_data,
         )
 
-        # 7. Update turn with bot response
-        self._chat_repo.update_turn_response(turn.id, answer)
-        self._chat_repo.commit()
+        if self._trace_writer is not None:
+            await self._trace_writer.submit(record)
+        else:
+            await write_trace_records_async(self._chat_repo, [record])
 
-        # 8. Build response
-        sources = [
+    def _build_sources(self, hits: list[SearchHit]) -> list[SourceOut]:
+        """Build source previews for the response."""
+        return [
             SourceOut(
                 chunk_id=h.chunk_id,
                 score=h.score,
                 preview=self._text.truncate_for_preview(h.content),
             )
-            for h in retrieval_result.hits
+            for h in hits
         ]
 
-        return ChatOut(
-            answer=answer,
-            decision=retrieval_result.decision.value,
-            confidence=retrieval_result.confidence,
-            sources=sources,
-            trace_id=trace.id,
-        )
+    def _build_prompts(
+        self,
+        question: str,
+        hits: list[SearchHit],
+        is_allergy: bool,
+    ) -> tuple[str, str]:
+        """Build system and user prompts from the packed evidence."""
+        system_prompt = self._prompt.build_system_prompt(allergy_mode=is_allergy)
+        evidence_chunks = [(span.chunk_ids, span.content) for span in self._packer.pack(hits)]
+        user_prompt = self._prompt.build_user_prompt(question, evidence_chunks)
+        return system_prompt, user_prompt
 
     async def _generate_answer(
         self,
@@ -114,12 +546,12 @@ class ChatService:
             return self._prompt.get_no_evidence_response()
 
         # Build prompts
-        system_prompt = self._prompt.build_system_prompt(allergy_mode=is_allergy)
-        evidence_chunks = [(h.chunk_id, h.content) for h in hits]
-        user_prompt = self._prompt.build_user_prompt(question, evidence_chunks)
+        system_prompt, user_prompt = self._build_prompts(question, hits, is_allergy)
 
         # Generate answer
-        answer = await self._ollama.chat(system_prompt, user_prompt)
+        answer = await self._ollama.chat(
+            system_prompt, user_prompt, priority=self._priority(is_allergy)
+        )
 
         # Add soft disclaimer if needed
         if decision == DecisionType.SOFT_DISCLAIMER:
@@ -0,0 +1,171 @@
+import asyncio
+import hashlib
+import json
+import logging
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import Settings
+from src.repositories import AsyncDishRepository
+from src.schemas.dish import DishOut
+
+
+logger = logging.getLogger(__name__)
+
+DISH_FIELDS = tuple(DishOut.model_fields)
+
+
+@dataclass
+class CatalogSnapshot:
+    """Active dishes at one catalog version, with their serialized views."""
+
+    version: str
+    dishes: list[dict[str, Any]]
+    # (category, fields) -> JSON body; filled on first use of each view
+    _views: dict[tuple[str | None, tuple[str, ...]], bytes] = field(default_factory=dict)
+    # Case-folded categories of the dishes; only their views are cached
+    _categories: frozenset[str] = field(init=False)
+
+    def __post_init__(self) -> None:
+        self._categories = frozenset(d["category"].casefold() for d in self.dishes)
+
+    def etag(self, category: str | None = None, fields: tuple[str, ...] = DISH_FIELDS) -> str:
+        """Entity tag of one view: the catalog version, qualified by any filter."""
+        key = self._view_key(category, fields)
+        if key == (None, DISH_FIELDS):
+            return f'"{self.version}"'
+        view = hashlib.md5(repr(key).encode(), usedforsecurity=False).hexdigest()[:12]
+        return f'"{self.version}-{view}"'
+
+    def render(self, category: str | None = None, fields: tuple[str, ...] = DISH_FIELDS) -> bytes:
+        """
+        JSON body of the dishes of ``category`` (all if None) with only ``fields``.
+
+        Views are cached per known category; any other category (it comes
+        from the query string) matches no dish and is not stored.
+        """
+        key = self._view_key(category, fields)
+        if key[0] is not None and key[0] not in self._categories:
+            return b"[]"
+        body = self._views.get(key)
+        if body is None:
+            dishes = [
+                {name: d[name] for name in fields}
+                for d in self.dishes
+                if key[0] is None or d["category"].casefold() == key[0]
+            ]
+            body = json.dumps(dishes, ensure_ascii=False, separators=(",", ":")).encode()
+            self._views[key] = body
+        return body
+
+    @staticmethod
+    def _view_key(
+        category: str | None, fields: tuple[str, ...]
+    ) -> tuple[str | None, tuple[str, ...]]:
+        return (category.casefold() if category else None, fields)
+
+
+class DishCatalog:
+    """
+    App-lifetime, pre-serialized snapshot of the active dishes.
+
+    Requests are served from memory. The snapshot's version is a fingerprint
+    of the active dish rows, so every worker computes the same ETag; a
+    background task compares it every ``dish_catalog_refresh_interval``
+    seconds and reloads the dishes only when it changed. Writers in this
+    worker call ``invalidate()`` to reload on the next request.
+    """
+
+    def __init__(self, session_factory: Callable[[], AsyncSession], settings: Settings):
+        self._session_factory = session_factory
+        self._settings = settings
+        self._snapshot: CatalogSnapshot | None = None
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task[None] | None = None
+        self.loads = 0
+        self.checks = 0
+
+    def start(self) -> None:
+        """Keep the snapshot up to date in the background."""
+        if self._task is None and self._settings.dish_catalog_refresh_interval > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def aclose(self) -> None:
+        """Stop the refresh task."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await self.refresh()
+            except Exception:
+                logger.exception("Dish catalog refresh failed")
+            await asyncio.sleep(self._settings.dish_catalog_refresh_interval)
+
+    async def get(self) -> CatalogSnapshot:
+        """Return the current snapshot, loading it if there is none."""
+        snapshot = self._snapshot
+        if snapshot is not None:
+            return snapshot
+        async with self._lock:
+            if self._snapshot is None:
+                await self._load(force=True)
+            assert self._snapshot is not None
+            return self._snapshot
+
+    async def refresh(self) -> bool:
+        """Reload the dishes if their version changed; True if it did."""
+        async with self._lock:
+            return await self._load(force=False)
+
+    @property
+    def version(self) -> str:
+        """Version of the current snapshot ("" before the first load)."""
+        snapshot = self._snapshot
+        return snapshot.version if snapshot is not None else ""
+
+    def invalidate(self) -> None:
+        """Drop the snapshot; the next request reloads it."""
+        self._snapshot = None
+
+    async def _load(self, force: bool) -> bool:
+        async with self._session_factory() as session:
+            repo = AsyncDishRepository(session)
+            version = await repo.catalog_version()
+            self.checks += 1
+            current = self._snapshot
+            if not force and current is not None and current.version == version:
+                return False
+            dishes = [
+                DishOut(
+                    id=d.id,
+                    name=d.name,
+                    category=d.category,
+                    price_cents=d.price_cents,
+                    tags=d.tags or [],
+                ).model_dump()
+                for d in await repo.get_all_active()
+            ]
+        self._snapshot = CatalogSnapshot(version=version, dishes=dishes)
+        self.loads += 1
+        logger.info("Dish catalog at version %s (%d dishes)", version, len(dishes))
+        return True
+
+    def stats(self) -> dict[str, float | str]:
+        """Return the snapshot version and load counters."""
+        snapshot = self._snapshot
+        return {
+            "version": self.version,
+            "dishes": len(snapshot.dishes) if snapshot is not None else 0,
+            "loads": self.loads,
+            "checks": self.checks,
+        }
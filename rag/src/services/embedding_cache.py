@@ -0,0 +1,56 @@
+from typing import Awaitable, Callable, Sequence
+
+from src.config import Settings
+from src.core.cache import LRUTTLCache
+
+
+class QueryEmbeddingCache:
+    """App-lifetime cache of query embeddings keyed by model and canonical question."""
+
+    def __init__(self, settings: Settings):
+        self._model = settings.embed_model
+        self._cache: LRUTTLCache[tuple[str, str], list[float]] = LRUTTLCache(
+            max_size=settings.query_embedding_cache_size,
+            ttl_seconds=settings.query_embedding_cache_ttl,
+        )
+
+    async def get_or_embed(
+        self,
+        canonical_question: str,
+        embed: Callable[[], Awaitable[list[float]]],
+    ) -> list[float]:
+        """Return the cached embedding or compute, store and return it."""
+        key = (self._model, canonical_question)
+        embedding = self._cache.get(key)
+        if embedding is None:
+            embedding = await embed()
+            self._cache.set(key, embedding)
+        return embedding
+
+    async def get_or_embed_many(
+        self,
+        canonical_questions: Sequence[str],
+        embed: Callable[[list[int]], Awaitable[list[list[float]]]],
+    ) -> list[list[float]]:
+        """
+        Return the embeddings of several questions, in order.
+
+        ``embed`` receives the positions of the questions missing from the
+        cache and computes them all in one call.
+        """
+        keys = [(self._model, question) for question in canonical_questions]
+        embeddings = [self._cache.get(key) for key in keys]
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            for i, embedding in zip(missing, await embed(missing)):
+                self._cache.set(keys[i], embedding)
+                embeddings[i] = embedding
+        return embeddings  # type: ignore[return-value]
+
+    def clear(self) -> None:
+        """Drop every cached embedding."""
+        self._cache.clear()
+
+    def stats(self) -> dict[str, float]:
+        """Return cache size and hit/miss counters."""
+        return self._cache.stats()
@@ -0,0 +1,110 @@
+import math
+from dataclasses import dataclass, field
+
+from src.config import Settings
+from src.repositories.embedding_repository import SearchHit
+
+
+@dataclass
+class EvidenceSpan:
+    """Contiguous evidence text merged from one or more chunks of a dish."""
+
+    chunk_ids: list[int]
+    content: str
+    score: float
+    dish_id: int | None = None
+    last_index: int | None = field(default=None, repr=False)
+
+
+class EvidencePacker:
+    """
+    Turn retrieval hits into prompt evidence.
+
+    Adjacent chunks of the same dish are merged back into one span with the
+    overlap between them removed, exact duplicates are dropped, and spans
+    are added by score until the token budget is spent.
+    """
+
+    # Shortest suffix/prefix match accepted as chunk overlap
+    MIN_OVERLAP_CHARS = 8
+
+    def __init__(self, settings: Settings):
+        self._settings = settings
+
+    def pack(self, hits: list[SearchHit]) -> list[EvidenceSpan]:
+        """Merge, de-duplicate and budget the hits; spans come best score first."""
+        spans = self._merge(hits)
+        spans.sort(key=lambda s: s.score, reverse=True)
+        return self._fit(spans)
+
+    def estimate_tokens(self, text: str) -> int:
+        """Rough token count of ``text``."""
+        return math.ceil(len(text) / max(1.0, self._settings.evidence_chars_per_token))
+
+    def _merge(self, hits: list[SearchHit]) -> list[EvidenceSpan]:
+        seen_content: set[str] = set()
+        mergeable: list[SearchHit] = []
+        spans: list[EvidenceSpan] = []
+
+        for hit in hits:
+            if hit.content in seen_content:
+                continue
+            seen_content.add(hit.content)
+            if hit.dish_id is None or hit.chunk_index is None:
+                spans.append(EvidenceSpan([hit.chunk_id], hit.content, hit.score, hit.dish_id))
+            else:
+                mergeable.append(hit)
+
+        current: EvidenceSpan | None = None
+        for hit in sorted(mergeable, key=lambda h: (h.dish_id, h.chunk_index)):
+            if (
+                current is not None
+                and current.dish_id == hit.dish_id
+                and current.last_index is not None
+                and hit.chunk_index == current.last_index + 1
+            ):
+                current.content = self._join(current.content, hit.content)
+                current.chunk_ids.append(hit.chunk_id)
+                current.score = max(current.score, hit.score)
+                current.last_index = hit.chunk_index
+                continue
+
+            current = EvidenceSpan(
+                [hit.chunk_id], hit.content, hit.score, hit.dish_id, hit.chunk_index
+            )
+            spans.append(current)
+
+        return spans
+
+    def _join(self, left: str, right: str) -> str:
+        """Append ``right`` to ``left``, dropping the text they share."""
+        if right in left:
+            return left
+
+        longest = min(len(left), len(right), self._settings.chunk_overlap * 2)
+        for size in range(longest, self.MIN_OVERLAP_CHARS - 1, -1):
+            if left.endswith(right[:size]):
+                return left + right[size:]
+
+        return f"{left}\n{right}"
+
+    def _fit(self, spans: list[EvidenceSpan]) -> list[EvidenceSpan]:
+        budget = self._settings.evidence_token_budget
+        if budget <= 0:
+            return spans
+
+        packed: list[EvidenceSpan] = []
+        used = 0
+        for span in spans:
+            tokens = self.estimate_tokens(span.content)
+            if used + tokens <= budget:
+                packed.append(span)
+                used += tokens
+            elif not packed:
+                # Always keep (the head of) the best span
+                max_chars = int(budget * self._settings.evidence_chars_per_token)
+                span.content = span.content[:max_chars]
+                packed.append(span)
+                used = budget
+
+        return packed
@@ -0,0 +1,184 @@
+import re
+from dataclasses import dataclass
+from typing import Any
+
+from src.core.constants import ALLERGEN_SUBJECTS, DIET_SUBJECTS, FACT_SUBJECT_LABELS
+from src.models.entities import DishFact
+from src.repositories import AsyncDishFactRepository, AsyncDishRepository
+from .text_service import TextService
+
+
+# Yes/no question markers ("¿tiene gluten?", "¿es apto vegano?", "¿puede contener maní?")
+_CLOSED_FORM = re.compile(
+    r"\b(tiene|contiene|lleva|trae|apto|es vegan\w*|es vegetarian\w*|sin tacc|puede contener|trazas)\b"
+)
+# Open questions (lists, recommendations) still go through retrieval and the LLM
+_OPEN_FORM = re.compile(r"\b(que|cual|cuales|como|cuanto|recomend\w*|opciones|platos)\b")
+
+_ALLERGEN_PATTERNS = {subject: re.compile(p) for subject, p in ALLERGEN_SUBJECTS.items()}
+_DIET_PATTERNS = {subject: re.compile(p) for subject, p in DIET_SUBJECTS.items()}
+
+
+def build_dish_facts(
+    text_service: TextService,
+    dish_id: int,
+    facts: dict[str, Any],
+) -> list[DishFact]:
+    """Turn the structured fields of a seed dish into fact rows."""
+    rows: list[DishFact] = []
+    allergen_lists = (("contains", "allergens_contains"), ("may_contain", "allergens_may_contain"))
+    for status, key in allergen_lists:
+        for entry in facts.get(key, []):
+            # Classify by the allergen itself, not the note in parentheses
+            head = text_service.canonicalize(entry.split("(")[0])
+            matches = [s for s, pattern in _ALLERGEN_PATTERNS.items() if pattern.search(head)]
+            subject = matches[0] if matches else head
+            rows.append(DishFact(dish_id=dish_id, subject=subject, status=status, source_text=entry))
+
+    diet_fields = (("sin_tacc", "gluten_free"), ("vegano", "vegan"), ("vegetariano", "vegetarian"))
+    for subject, key in diet_fields:
+        value = facts.get(key)
+        if value:
+            rows.append(
+                DishFact(
+                    dish_id=dish_id,
+                    subject=subject,
+                    status=_diet_status(text_service.canonicalize(value)),
+                    source_text=value,
+                )
+            )
+    return rows
+
+
+def _diet_status(canonical: str) -> str:
+    if canonical.startswith("si"):
+        return "yes"
+    if canonical.startswith("no") and not canonical.startswith("no confirmado"):
+        return "no"
+    return "unconfirmed"
+
+
+@dataclass
+class FactAnswer:
+    """Templated answer built from structured dish facts."""
+
+    answer: str
+    dish_id: int
+    subject: str
+    fact_ids: list[int]
+
+
+class FactService:
+    """Service for the structured allergen/dietary facts of each dish."""
+
+    def __init__(
+        self,
+        fact_repo: AsyncDishFactRepository,
+        dish_repo: AsyncDishRepository,
+        text_service: TextService,
+    ):
+        self._fact_repo = fact_repo
+        self._dish_repo = dish_repo
+        self._text = text_service
+
+    async def answer(self, question: str, dish_id: int | None) -> FactAnswer | None:
+        """
+        Answer a closed-form allergen/diet question about one dish from facts.
+
+        Returns None (fall back to retrieval and the LLM) unless the question
+        is a yes/no question about exactly one subject and one dish, and the
+        ficha states something about that subject.
+        """
+        canonical = self._text.canonicalize(question)
+        if not _CLOSED_FORM.search(canonical) or _OPEN_FORM.search(canonical):
+            return None
+
+        allergens = self._match_all(canonical, _ALLERGEN_PATTERNS)
+        diets = self._match_all(canonical, _DIET_PATTERNS)
+        if len(allergens) + len(diets) != 1:
+            return None
+
+        if dish_id is None:
+            dish_id = await self._resolve_dish(canonical)
+            if dish_id is None:
+                return None
+
+        if diets:
+            return self._answer_diet(dish_id, diets[0], await self._fact_repo.find(dish_id, diets))
+
+        # Gluten questions fall back to the "Sin TACC" line; fetch both at once
+        subject = allergens[0]
+        subjects = [subject, "sin_tacc"] if subject == "gluten" else [subject]
+        found = await self._fact_repo.find(dish_id, subjects)
+        return self._answer_allergen(dish_id, subject, found)
+
+    def _answer_allergen(
+        self, dish_id: int, subject: str, found: list[DishFact]
+    ) -> FactAnswer | None:
+        facts = {f.status: f for f in found if f.subject == subject}
+        label = FACT_SUBJECT_LABELS[subject]
+
+        fact = facts.get("contains")
+        if fact is not None:
+            text = f"Según la ficha técnica, «{fact.dish.name}» contiene {fact.source_text}."
+            return self._result(text, dish_id, subject, [fact])
+
+        fact = facts.get("may_contain")
+        if fact is not None:
+            text = (
+                f"Según la ficha técnica, «{fact.dish.name}» no lleva {label} como ingrediente, "
+                f"pero puede contener {fact.source_text}. "
+                "Si tenés alergia o intolerancia, no es seguro: confirmá con el personal."
+            )
+            return self._result(text, dish_id, subject, [fact])
+
+        if subject == "gluten":
+            return self._answer_diet(dish_id, "sin_tacc", found)
+
+        # Not declared is not the same as absent: let retrieval and the LLM handle it
+        return None
+
+    def _answer_diet(
+        self, dish_id: int, subject: str, found: list[DishFact]
+    ) -> FactAnswer | None:
+        facts = [f for f in found if f.subject == subject]
+        if not facts:
+            return None
+
+        fact = facts[0]
+        name = fact.dish.name
+        label = "sin TACC" if subject == "sin_tacc" else f"apto {FACT_SUBJECT_LABELS[subject]}"
+        if fact.status == "yes":
+            text = f"Según la ficha técnica, «{name}» es {label} ({fact.source_text})."
+        elif fact.status == "no":
+            text = f"Según la ficha técnica, «{name}» no es {label} ({fact.source_text})."
+        else:
+            text = (
+                f"La ficha técnica de «{name}» no confirma que sea {label}: {fact.source_text}. "
+                "Consultá con el personal antes de pedirlo."
+            )
+        return self._result(text, dish_id, subject, [fact])
+
+    async def _resolve_dish(self, canonical_question: str) -> int | None:
+        """Find the single dish named in the question (its name or first word)."""
+        words = set(re.findall(r"\w+", canonical_question))
+        matches = []
+        for dish in await self._dish_repo.get_all_active():
+            short_name = self._text.canonicalize(re.split(r"[+(]", dish.name)[0]).strip()
+            first_word = short_name.split(" ")[0] if short_name else ""
+            if short_name in canonical_question or (len(first_word) > 3 and first_word in words):
+                matches.append(dish.id)
+        return matches[0] if len(matches) == 1 else None
+
+    @staticmethod
+    def _result(text: str, dish_id: int, subject: str, facts: list[DishFact]) -> FactAnswer:
+        return FactAnswer(
+            answer=text,
+            dish_id=dish_id,
+            subject=subject,
+            fact_ids=[f.id for f in facts],
+        )
+
+    @staticmethod
+    def _match_all(text: str, patterns: dict[str, re.Pattern[str]]) -> list[str]:
+        return [subject for subject, pattern in patterns.items() if pattern.search(text)]
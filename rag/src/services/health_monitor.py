@@ -0,0 +1,114 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Callable
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import Settings
+from src.repositories import AsyncEmbeddingRepository, AsyncMaintenanceRepository
+from .ollama_service import OllamaService
+
+
+@dataclass(frozen=True)
+class DependencyStatus:
+    """Outcome of one database and Ollama check."""
+
+    database: bool
+    ollama: bool
+    checked_at: datetime
+
+
+@dataclass(frozen=True)
+class TableStats:
+    """Row counts of the knowledge-base tables and HNSW index validity."""
+
+    dishes: int
+    chunks: int
+    embeddings: int
+    vector_index: bool
+    # Whether any count is a planner estimate rather than an exact count
+    estimated: bool
+    collected_at: datetime
+
+
+class HealthMonitor:
+    """
+    App-lifetime, rate-limited dependency checks and table stats for the probes.
+
+    However often the orchestrator probes, the database and Ollama are
+    checked at most once per ``health_check_ttl`` seconds and table stats
+    collected once per ``health_stats_ttl``; concurrent probes wait for the
+    check in flight instead of starting their own. Row counts come from the
+    planner's estimates in pg_class, with an exact count only for tables
+    that were never analyzed.
+    """
+
+    TABLES = {"dishes": "dish", "chunks": "kb_chunk", "embeddings": "kb_embedding"}
+
+    def __init__(
+        self,
+        ollama_service: OllamaService,
+        session_factory: Callable[[], AsyncSession],
+        settings: Settings,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self._ollama = ollama_service
+        self._session_factory = session_factory
+        self._settings = settings
+        self._clock = clock
+        self._check_lock = asyncio.Lock()
+        self._stats_lock = asyncio.Lock()
+        self._status: tuple[float, DependencyStatus] | None = None
+        self._stats: tuple[float, TableStats] | None = None
+        self.checks = 0
+        self.stats_refreshes = 0
+
+    async def check(self) -> DependencyStatus:
+        """Return the latest dependency check, re-checking once it is stale."""
+        async with self._check_lock:
+            ttl = self._settings.health_check_ttl
+            if self._status is None or self._stale(self._status[0], ttl):
+                async with self._session_factory() as session:
+                    database, ollama = await asyncio.gather(
+                        AsyncMaintenanceRepository(session).ping(),
+                        self._ollama.is_reachable(),
+                    )
+                status = DependencyStatus(database, ollama, datetime.now(timezone.utc))
+                self._status = (self._clock(), status)
+                self.checks += 1
+            return self._status[1]
+
+    async def table_stats(self) -> TableStats:
+        """Return the latest table stats, collecting them once they are stale."""
+        async with self._stats_lock:
+            ttl = self._settings.health_stats_ttl
+            if self._stats is None or self._stale(self._stats[0], ttl):
+                self._stats = (self._clock(), await self._collect())
+                self.stats_refreshes += 1
+            return self._stats[1]
+
+    async def _collect(self) -> TableStats:
+        async with self._session_factory() as session:
+            maintenance = AsyncMaintenanceRepository(session)
+            estimates = await maintenance.table_estimates(list(self.TABLES.values()))
+            counts: dict[str, int] = {}
+            estimated = False
+            for key, table in self.TABLES.items():
+                rows = estimates.get(table, -1)
+                if rows < 0:
+                    rows = await maintenance.exact_count(table)
+                else:
+                    estimated = True
+                counts[key] = rows
+            vector_index = await AsyncEmbeddingRepository(session).index_ready()
+        return TableStats(
+            **counts,
+            vector_index=vector_index,
+            estimated=estimated,
+            collected_at=datetime.now(timezone.utc),
+        )
+
+    def _stale(self, at: float, ttl: float) -> bool:
+        return self._clock() - at >= ttl
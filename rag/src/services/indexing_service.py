@@ -0,0 +1,124 @@
+import asyncio
+from dataclasses import dataclass
+from typing import AsyncIterator
+
+from src.config import Settings
+from src.repositories import ChunkRepository, EmbeddingRepository
+from .ollama_service import OllamaService
+
+
+@dataclass
+class IndexingResult:
+    """Result from an indexing run."""
+
+    embeddings_created: int
+    batches: int
+
+
+@dataclass
+class _Progress:
+    """Counters of an indexing run in progress."""
+
+    created: int = 0
+    batches: int = 0
+    uncommitted: int = 0
+    error: BaseException | None = None
+
+
+class IndexingService:
+    """Service for embedding unindexed chunks in batches."""
+
+    def __init__(
+        self,
+        chunk_repo: ChunkRepository,
+        embedding_repo: EmbeddingRepository,
+        ollama_service: OllamaService,
+        settings: Settings,
+    ):
+        self._chunk_repo = chunk_repo
+        self._embedding_repo = embedding_repo
+        self._ollama = ollama_service
+        self._settings = settings
+
+    async def index_pending(self) -> IndexingResult:
+        """
+        Embed every unindexed chunk.
+
+        Chunks are streamed in keyset-paginated pages and split into batches
+        for Ollama's multi-input embed API. Up to ``index_max_concurrency``
+        batches stay in flight across page boundaries: the next page is read
+        as soon as a slot frees up, while finished batches are bulk-inserted
+        with periodic commits. If a batch fails to embed, no new batches are
+        started, the batches in flight are stored and committed, and the
+        error is raised. A database error rolls back and is raised as is.
+
+        The repositories are synchronous: their calls run in a worker thread
+        so a long run does not block the event loop.
+        """
+        max_in_flight = max(1, self._settings.index_max_concurrency)
+        in_flight: dict[asyncio.Task[list[list[float]]], list[tuple[int, str]]] = {}
+        progress = _Progress()
+
+        try:
+            async for batch in self._pending_batches():
+                if len(in_flight) >= max_in_flight:
+                    await self._store_finished(in_flight, progress)
+                if progress.error is not None:
+                    break
+                task = asyncio.ensure_future(self._embed_batch(batch))
+                in_flight[task] = batch
+            while in_flight:
+                await self._store_finished(in_flight, progress)
+            if progress.uncommitted:
+                await asyncio.to_thread(self._embedding_repo.commit)
+        except BaseException:
+            for task in in_flight:
+                task.cancel()
+            await asyncio.gather(*in_flight, return_exceptions=True)
+            await asyncio.to_thread(self._embedding_repo.rollback)
+            raise
+
+        if progress.error is not None:
+            raise progress.error
+        return IndexingResult(embeddings_created=progress.created, batches=progress.batches)
+
+    async def _pending_batches(self) -> AsyncIterator[list[tuple[int, str]]]:
+        """Yield batches of unindexed chunks, reading each page only when needed."""
+        page_size = max(1, self._settings.index_page_size)
+        batch_size = max(1, self._settings.index_batch_size)
+        after_id = 0
+        while True:
+            page = await asyncio.to_thread(
+                self._chunk_repo.get_unindexed_page, after_id, page_size
+            )
+            if not page:
+                return
+            after_id = page[-1][0]
+            for i in range(0, len(page), batch_size):
+                yield page[i : i + batch_size]
+
+    async def _store_finished(
+        self,
+        in_flight: dict[asyncio.Task[list[list[float]]], list[tuple[int, str]]],
+        progress: _Progress,
+    ) -> None:
+        """Wait for at least one batch, insert finished ones and commit periodically."""
+        done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            batch = in_flight.pop(task)
+            error = task.exception()
+            if error is not None:
+                progress.error = progress.error or error
+                continue
+            rows = [(chunk_id, emb) for (chunk_id, _), emb in zip(batch, task.result())]
+            progress.created += await asyncio.to_thread(self._embedding_repo.create_many, rows)
+            progress.uncommitted += len(rows)
+            progress.batches += 1
+
+        if progress.uncommitted >= self._settings.index_commit_every:
+            await asyncio.to_thread(self._embedding_repo.commit)
+            progress.uncommitted = 0
+
+    async def _embed_batch(self, batch: list[tuple[int, str]]) -> list[list[float]]:
+        """Embed one batch."""
+        return await self._ollama.generate_embeddings([content for _, content in batch])
@@ -0,0 +1,148 @@
+import itertools
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Iterator
+
+from src.config import Settings
+from src.core.exceptions import OllamaUnavailableError
+from src.core.resilience import CircuitBreaker, CircuitState
+
+
+EMBED = "embed"
+CHAT = "chat"
+
+
+@dataclass
+class OllamaBackend:
+    """One Ollama server with its passive health state."""
+
+    url: str
+    roles: frozenset[str]
+    breaker: CircuitBreaker
+    outstanding: int = 0
+    requests: int = 0
+    failures: int = 0
+    _order: int = field(default=0, repr=False)
+
+    def stats(self) -> dict[str, float | str]:
+        """Return load and health counters."""
+        return {
+            "url": self.url,
+            "roles": ",".join(sorted(self.roles)),
+            "state": self.breaker.state.value,
+            "outstanding": self.outstanding,
+            "requests": self.requests,
+            "failures": self.failures,
+        }
+
+
+def _split_urls(value: str) -> list[str]:
+    return [u.strip().rstrip("/") for u in value.split(",") if u.strip()]
+
+
+class BackendPool:
+    """
+    Set of Ollama backends with least-outstanding-requests selection.
+
+    Each backend has its own circuit breaker, so a backend that keeps
+    failing is ejected (open circuit) and re-admitted through a half-open
+    probe. Backends can be pinned to the embed or chat role.
+    """
+
+    def __init__(self, backends: list[OllamaBackend]):
+        if not backends:
+            raise ValueError("BackendPool needs at least one backend")
+        self._backends = backends
+        self._tiebreak = itertools.count()
+
+    @classmethod
+    def from_settings(cls, settings: Settings) -> "BackendPool":
+        """
+        Build the pool from ``OLLAMA_URLS`` (both roles), ``OLLAMA_EMBED_URLS``
+        and ``OLLAMA_CHAT_URLS`` (pinned roles), falling back to ``OLLAMA_URL``.
+        """
+        roles: dict[str, set[str]] = {}
+        for url in _split_urls(settings.ollama_urls):
+            roles.setdefault(url, set()).update({EMBED, CHAT})
+        for url in _split_urls(settings.ollama_embed_urls):
+            roles.setdefault(url, set()).add(EMBED)
+        for url in _split_urls(settings.ollama_chat_urls):
+            roles.setdefault(url, set()).add(CHAT)
+        if not roles:
+            roles[settings.ollama_url.rstrip("/")] = {EMBED, CHAT}
+
+        # A role nobody is pinned to is served by every backend
+        for role in (EMBED, CHAT):
+            if not any(role in r for r in roles.values()):
+                for r in roles.values():
+                    r.add(role)
+
+        return cls(
+            [
+                OllamaBackend(
+                    url=url,
+                    roles=frozenset(r),
+                    breaker=CircuitBreaker(
+                        f"ollama:{url}",
+                        failure_threshold=settings.ollama_breaker_failure_threshold,
+                        reset_timeout=settings.ollama_breaker_reset_timeout,
+                    ),
+                )
+                for url, r in roles.items()
+            ]
+        )
+
+    @property
+    def backends(self) -> list[OllamaBackend]:
+        """All configured backends."""
+        return list(self._backends)
+
+    def pick(self, role: str) -> OllamaBackend:
+        """Choose the healthy backend for ``role`` with the fewest outstanding requests."""
+        candidates = sorted(
+            (b for b in self._backends if role in b.roles),
+            key=lambda b: (b.outstanding, b._order),
+        )
+        for backend in candidates:
+            if backend.breaker.allow_request():
+                backend._order = next(self._tiebreak)
+                return backend
+
+        retry_after = min((b.breaker.retry_after() for b in candidates), default=1.0)
+        raise OllamaUnavailableError(
+            message="No healthy Ollama backend available",
+            detail=f"all {role} backends are ejected (circuit open)",
+            retry_after=max(1.0, retry_after),
+        )
+
+    @contextmanager
+    def track(self, backend: OllamaBackend) -> Iterator[OllamaBackend]:
+        """Count a request as outstanding on ``backend`` while the block runs."""
+        backend.outstanding += 1
+        backend.requests += 1
+        try:
+            yield backend
+        finally:
+            backend.outstanding -= 1
+
+    def record_success(self, backend: OllamaBackend) -> None:
+        """Passive health: the backend answered."""
+        backend.breaker.record_success()
+
+    def record_failure(self, backend: OllamaBackend) -> None:
+        """Passive health: the backend failed (connect error, timeout, 5xx)."""
+        backend.failures += 1
+        backend.breaker.record_failure()
+
+    def state(self) -> CircuitState:
+        """Aggregate state: closed if any backend is closed, open if all are open."""
+        states = {b.breaker.state for b in self._backends}
+        if CircuitState.CLOSED in states:
+            return CircuitState.CLOSED
+        if states == {CircuitState.OPEN}:
+            return CircuitState.OPEN
+        return CircuitState.HALF_OPEN
+
+    def stats(self) -> list[dict[str, float | str]]:
+        """Return per-backend load and health counters."""
+        return [b.stats() for b in self._backends]
@@ -1,96 +1,460 @@
+import asyncio
+import json
+import time
+from contextlib import nullcontext
+from typing import Any, AsyncContextManager, AsyncIterator, Awaitable, Callable, TypeVar
+
 import httpx
 
 from src.config import Settings
-from src.core.exceptions import OllamaError, OllamaConnectionError, OllamaTimeoutError
+from src.core.exceptions import (
+    OllamaError,
+    OllamaConnectionError,
+    OllamaTimeoutError,
+    OllamaServerError,
+    OllamaUnavailableError,
+)
+from src.core.resilience import CircuitState, LatencyTracker, backoff_delay
+from src.core.scheduler import LLMScheduler, Priority
+from .ollama_pool import BackendPool, OllamaBackend, EMBED, CHAT
+
+
+T = TypeVar("T")
 
 
 class OllamaService:
     """Service for interacting with Ollama API."""
 
-    def __init__(self, settings: Settings):
+    def __init__(
+        self,
+        settings: Settings,
+        client: httpx.AsyncClient | None = None,
+        chat_scheduler: LLMScheduler | None = None,
+        embed_scheduler: LLMScheduler | None = None,
+        pool: BackendPool | None = None,
+    ):
         self._settings = settings
-        self._base_url = settings.ollama_url
+        self._pool = pool or BackendPool.from_settings(settings)
+        self._client = client or self.build_client(settings)
+        self._chat_scheduler = chat_scheduler
+        self._embed_scheduler = embed_scheduler
+        self._embed_latency = LatencyTracker(window=settings.ollama_hedge_window)
+        self.retries = 0
+        self.hedges = 0
 
-    async def generate_embedding(self, text: str) -> list[float]:
-        """Generate embedding for text using Ollama."""
-        try:
-            async with httpx.AsyncClient(timeout=self._settings.ollama_embed_timeout) as client:
-                response = await client.post(
-                    f"{self._base_url}/api/embeddings",
-                    json={"model": self._settings.embed_model, "prompt": text},
+    @staticmethod
+    def build_client(settings: Settings) -> httpx.AsyncClient:
+        """Build the shared keep-alive HTTP client used for all Ollama calls."""
+        limits = httpx.Limits(
+            max_connections=settings.ollama_max_connections,
+            max_keepalive_connections=settings.ollama_max_keepalive_connections,
+            keepalive_expiry=settings.ollama_keepalive_expiry,
+        )
+        return httpx.AsyncClient(
+            limits=limits,
+            timeout=httpx.Timeout(
+                settings.ollama_chat_timeout,
+                connect=settings.ollama_connect_timeout,
+            ),
+        )
+
+    def _timeout(self, seconds: float) -> httpx.Timeout:
+        """Per-operation timeout sharing the configured connect timeout."""
+        return httpx.Timeout(seconds, connect=min(seconds, self._settings.ollama_connect_timeout))
+
+    def _slot(
+        self,
+        scheduler: LLMScheduler | None,
+        priority: Priority,
+    ) -> AsyncContextManager[None]:
+        """Scheduler slot for one call; background work waits without a deadline."""
+        if scheduler is None:
+            return nullcontext()
+        timeout = None if priority == Priority.BACKGROUND else self._settings.llm_queue_timeout
+        return scheduler.slot(priority, timeout)
+
+    def scheduler_stats(self) -> dict[str, dict[str, float]]:
+        """Return queue metrics of the chat and embed schedulers."""
+        return {
+            s.name: s.stats()
+            for s in (self._chat_scheduler, self._embed_scheduler)
+            if s is not None
+        }
+
+    @property
+    def pool(self) -> BackendPool:
+        """Ollama backends with their passive health state."""
+        return self._pool
+
+    def circuit_state(self) -> CircuitState:
+        """Aggregate circuit state across backends."""
+        return self._pool.state()
+
+    def resilience_stats(self) -> dict[str, float | str]:
+        """Return aggregate circuit state plus retry and hedge counters."""
+        return {
+            "state": self.circuit_state().value,
+            "retries": self.retries,
+            "hedges": self.hedges,
+        }
+
+    def backend_stats(self) -> list[dict[str, float | str]]:
+        """Return per-backend load and health counters."""
+        return self._pool.stats()
+
+    async def aclose(self) -> None:
+        """Close the underlying connection pool."""
+        await self._client.aclose()
+
+    def _check_status(
+        self,
+        backend: OllamaBackend,
+        status_code: int,
+        what: str,
+        body: str,
+    ) -> None:
+        """Record the outcome on the backend's breaker and raise on non-200 responses."""
+        if status_code >= 500:
+            self._pool.record_failure(backend)
+            raise OllamaServerError(message=f"Ollama {what} error", detail=body)
+
+        # The backend answered: it is up, even if it rejected this request
+        self._pool.record_success(backend)
+        if status_code != 200:
+            raise OllamaError(message=f"Ollama {what} error", detail=body)
+
+    async def _post_json(
+        self,
+        role: str,
+        path: str,
+        payload: dict[str, Any],
+        timeout: float,
+        what: str,
+    ) -> dict[str, Any]:
+        """POST to the least-loaded healthy backend for ``role`` and return the JSON body."""
+        backend = self._pool.pick(role)
+        with self._pool.track(backend):
+            try:
+                response = await self._client.post(
+                    f"{backend.url}{path}",
+                    json=payload,
+                    timeout=self._timeout(timeout),
+                )
+            except httpx.ConnectError as e:
+                self._pool.record_failure(backend)
+                raise OllamaConnectionError(
+                    message="Cannot connect to Ollama",
+                    detail=f"{backend.url}: {e}",
+                )
+            except httpx.TimeoutException as e:
+                self._pool.record_failure(backend)
+                raise OllamaTimeoutError(
+                    message=f"Ollama {what} request timed out",
+                    detail=f"{backend.url}: {e}",
                 )
 
-                if response.status_code != 200:
-                    raise OllamaError(
-                        message="Ollama embeddings error",
-                        detail=response.text,
-                    )
+        self._check_status(backend, response.status_code, what, response.text)
+        data: dict[str, Any] = response.json()
+        return data
 
-                data = response.json()
-                embedding = data.get("embedding")
+    async def _idempotent(self, call: Callable[[], Awaitable[T]], hedge: bool = False) -> T:
+        """
+        Run an idempotent call with bounded, jittered retries.
 
-                if not embedding:
-                    raise OllamaError(
-                        message="Ollama embeddings: missing 'embedding' in response",
+        With ``hedge`` the call is also hedged. Only single-query embeddings
+        are: their latency alone sets the hedge delay, and duplicating a bulk
+        batch would double its load for little gain.
+        """
+        attempts = 1 + max(0, self._settings.ollama_retry_attempts)
+        for attempt in range(attempts):
+            try:
+                if hedge:
+                    return await self._hedged(call)
+                return await call()
+            except OllamaUnavailableError:
+                raise
+            except (OllamaConnectionError, OllamaTimeoutError, OllamaServerError):
+                if attempt == attempts - 1:
+                    raise
+                self.retries += 1
+                await asyncio.sleep(
+                    backoff_delay(
+                        attempt,
+                        self._settings.ollama_retry_backoff_base,
+                        self._settings.ollama_retry_backoff_max,
                     )
+                )
+        raise AssertionError("unreachable")
+
+    async def _timed(self, call: Callable[[], Awaitable[T]]) -> T:
+        """Run a call, recording its latency when it succeeds."""
+        started = time.monotonic()
+        result = await call()
+        self._embed_latency.record(time.monotonic() - started)
+        return result
+
+    async def _hedged(self, call: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run a call; if it has not finished after the recent p95 latency, send a
+        duplicate and return whichever succeeds first.
+        """
+        if not self._settings.ollama_hedge_enabled:
+            return await self._timed(call)
+
+        delay = max(
+            self._settings.ollama_hedge_min_delay,
+            self._embed_latency.percentile(self._settings.ollama_hedge_quantile) or 0.0,
+        )
+        first = asyncio.ensure_future(self._timed(call))
+        done, _ = await asyncio.wait({first}, timeout=delay)
+        if done:
+            return first.result()
+
+        self.hedges += 1
+        pending = {first, asyncio.ensure_future(self._timed(call))}
+        error: BaseException | None = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = error or task.exception()
+            assert error is not None
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def generate_embedding(
+        self,
+        text: str,
+        priority: Priority = Priority.NORMAL,
+    ) -> list[float]:
+        """Generate embedding for text using Ollama."""
+        async with self._slot(self._embed_scheduler, priority):
+            data = await self._idempotent(
+                lambda: self._post_json(
+                    EMBED,
+                    "/api/embeddings",
+                    {
+                        "model": self._settings.embed_model,
+                        "prompt": text,
+                        "keep_alive": self._settings.ollama_keep_alive,
+                    },
+                    self._settings.ollama_embed_timeout,
+                    "embeddings",
+                ),
+                hedge=True,
+            )
+
+        embedding = data.get("embedding")
+
+        if not embedding:
+            raise OllamaError(
+                message="Ollama embeddings: missing 'embedding' in response",
+            )
+
+        return embedding
 
-                return embedding
+    async def generate_embeddings(
+        self,
+        texts: list[str],
+        priority: Priority = Priority.BACKGROUND,
+    ) -> list[list[float]]:
+        """Generate embeddings for several texts in one call (Ollama /api/embed, not hedged)."""
+        if not texts:
+            return []
 
-        except httpx.ConnectError as e:
-            raise OllamaConnectionError(
-                message="Cannot connect to Ollama",
-                detail=str(e),
+        async with self._slot(self._embed_scheduler, priority):
+            data = await self._idempotent(
+                lambda: self._post_json(
+                    EMBED,
+                    "/api/embed",
+                    {
+                        "model": self._settings.embed_model,
+                        "input": texts,
+                        "keep_alive": self._settings.ollama_keep_alive,
+                    },
+                    self._settings.ollama_embed_timeout,
+                    "embed",
+                )
             )
-        except httpx.TimeoutException as e:
-            raise OllamaTimeoutError(
-                message="Ollama embedding request timed out",
-                detail=str(e),
+
+        embeddings = data.get("embeddings") or []
+
+        if len(embeddings) != len(texts):
+            raise OllamaError(
+                message="Ollama embed: unexpected number of embeddings in response",
+                detail=f"expected {len(texts)}, got {len(embeddings)}",
             )
 
-    async def chat(self, system_prompt: str, user_prompt: str) -> str:
-        """Generate chat response using Ollama."""
-        payload = {
+        return embeddings
+
+    def _chat_payload(self, system_prompt: str, user_prompt: str, stream: bool) -> dict:
+        """Build the /api/chat request body."""
+        return {
             "model": self._settings.chat_model,
             "messages": [
                 {"role": "system", "content": system_prompt},
                 {"role": "user", "content": user_prompt},
             ],
-            "stream": False,
+            "stream": stream,
+            "keep_alive": self._settings.ollama_keep_alive,
         }
 
-        try:
-            async with httpx.AsyncClient(timeout=self._settings.ollama_chat_timeout) as client:
-                response = await client.post(
-                    f"{self._base_url}/api/chat",
-                    json=payload,
-                )
+    async def chat(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        priority: Priority = Priority.NORMAL,
+    ) -> str:
+        """Generate chat response using Ollama (not retried: generation is expensive)."""
+        payload = self._chat_payload(system_prompt, user_prompt, stream=False)
+
+        async with self._slot(self._chat_scheduler, priority):
+            data = await self._post_json(
+                CHAT,
+                "/api/chat",
+                payload,
+                self._settings.ollama_chat_timeout,
+                "chat",
+            )
+
+        content = data.get("message", {}).get("content", "") or ""
+        return content.strip()
+
+    async def chat_stream(
+        self,
+        system_prompt: str,
+        user_prompt: str,
+        priority: Priority = Priority.NORMAL,
+    ) -> AsyncIterator[str]:
+        """Generate chat response using Ollama, yielding content deltas as they arrive."""
+        payload = self._chat_payload(system_prompt, user_prompt, stream=True)
+
+        async with self._slot(self._chat_scheduler, priority):
+            backend = self._pool.pick(CHAT)
+            with self._pool.track(backend):
+                try:
+                    async with self._client.stream(
+                        "POST",
+                        f"{backend.url}/api/chat",
+                        json=payload,
+                        timeout=self._timeout(self._settings.ollama_chat_timeout),
+                    ) as response:
+                        if response.status_code != 200:
+                            body = await response.aread()
+                        else:
+                            body = b""
+                        self._check_status(
+                            backend,
+                            response.status_code,
+                            "chat",
+                            body.decode("utf-8", errors="replace"),
+                        )
+
+                        async for line in response.aiter_lines():
+                            if not line.strip():
+                                continue
+
+                            try:
+                                data = json.loads(line)
+                            except json.JSONDecodeError as e:
+                                raise OllamaError(
+                                    message="Ollama chat stream: invalid response line",
+                                    detail=f"{backend.url}: {e}",
+                                )
+                            if data.get("error"):
+                                raise OllamaError(
+                                    message="Ollama chat error",
+                                    detail=str(data["error"]),
+                                )
+
+                            delta = data.get("message", {}).get("content", "") or ""
+                            if delta:
+                                yield delta
 
-                if response.status_code != 200:
-                    raise OllamaError(
-                        message="Ollama chat error",
-                        detail=response.text,
+                            if data.get("done"):
+                                break
+
+                except httpx.ConnectError as e:
+                    self._pool.record_failure(backend)
+                    raise OllamaConnectionError(
+                        message="Cannot connect to Ollama",
+                        detail=f"{backend.url}: {e}",
+                    )
+                except httpx.TimeoutException as e:
+                    self._pool.record_failure(backend)
+                    raise OllamaTimeoutError(
+                        message="Ollama chat request timed out",
+                        detail=f"{backend.url}: {e}",
+                    )
+                except httpx.TransportError as e:
+                    # Connection dropped mid-stream (ReadError, RemoteProtocolError, ...)
+                    self._pool.record_failure(backend)
+                    raise OllamaConnectionError(
+                        message="Ollama chat stream interrupted",
+                        detail=f"{backend.url}: {e}",
                     )
 
-                data = response.json()
-                content = data.get("message", {}).get("content", "") or ""
-                return content.strip()
+    async def preload(self) -> dict[str, bool]:
+        """
+        Load the embed and chat models on every backend serving them, with the
+        configured keep_alive; return whether each ``"<url> <model>"`` loaded.
 
-        except httpx.ConnectError as e:
-            raise OllamaConnectionError(
-                message="Cannot connect to Ollama",
-                detail=str(e),
-            )
-        except httpx.TimeoutException as e:
-            raise OllamaTimeoutError(
-                message="Ollama chat request timed out",
-                detail=str(e),
-            )
+        Warm-up traffic bypasses the schedulers and does not count toward the
+        circuit breakers.
+        """
+
+        async def load(backend: OllamaBackend, path: str, payload: dict[str, Any]) -> bool:
+            try:
+                with self._pool.track(backend):
+                    response = await self._client.post(
+                        f"{backend.url}{path}",
+                        json=payload,
+                        timeout=self._timeout(self._settings.ollama_chat_timeout),
+                    )
+                return response.status_code == 200
+            except httpx.HTTPError:
+                return False
+
+        keep_alive = self._settings.ollama_keep_alive
+        jobs: dict[str, Awaitable[bool]] = {}
+        for backend in self._pool.backends:
+            if EMBED in backend.roles:
+                model = self._settings.embed_model
+                jobs[f"{backend.url} {model}"] = load(
+                    backend,
+                    "/api/embed",
+                    {"model": model, "input": "warm-up", "keep_alive": keep_alive},
+                )
+            if CHAT in backend.roles:
+                # An empty generate request only loads the model
+                model = self._settings.chat_model
+                jobs[f"{backend.url} {model}"] = load(
+                    backend,
+                    "/api/generate",
+                    {"model": model, "keep_alive": keep_alive},
+                )
+
+        results = await asyncio.gather(*jobs.values())
+        return dict(zip(jobs, results))
 
     async def is_reachable(self) -> bool:
-        """Check if Ollama service is reachable."""
-        try:
-            async with httpx.AsyncClient(timeout=self._settings.ollama_health_timeout) as client:
-                response = await client.get(f"{self._base_url}/api/tags")
+        """Check that every role (embed, chat) has at least one reachable backend."""
+
+        async def probe(backend: OllamaBackend) -> bool:
+            try:
+                response = await self._client.get(
+                    f"{backend.url}/api/tags",
+                    timeout=self._timeout(self._settings.ollama_health_timeout),
+                )
                 return response.status_code == 200
-        except Exception:
-            return False
+            except Exception:
+                return False
+
+        backends = self._pool.backends
+        results = await asyncio.gather(*(probe(b) for b in backends))
+        reachable = {role for b, ok in zip(backends, results) if ok for role in b.roles}
+        return {EMBED, CHAT} <= reachable
@@ -1,3 +1,6 @@
+from typing import Sequence
+
+
 class PromptService:
     """Service for building LLM prompts."""
 
@@ -51,13 +54,18 @@ class PromptService:
     def build_user_prompt(
         self,
         question: str,
-        evidence_chunks: list[tuple[int, str]],
+        evidence_chunks: Sequence[tuple[int | Sequence[int], str]],
     ) -> str:
-        """Build the user prompt with question and evidence."""
+        """
+        Build the user prompt with question and evidence.
+
+        Each evidence item is cited by one chunk id, or by several when it is
+        a span merged from adjacent chunks.
+        """
         if evidence_chunks:
             evidence_block = "\n\n".join(
-                f"[chunk:{chunk_id}] {content}"
-                for chunk_id, content in evidence_chunks
+                f"{self._citations(chunk_ids)} {content}"
+                for chunk_ids, content in evidence_chunks
             )
         else:
             evidence_block = "SIN_EVIDENCIA"
@@ -67,6 +75,13 @@ class PromptService:
             evidence=evidence_block,
         )
 
+    @staticmethod
+    def _citations(chunk_ids: int | Sequence[int]) -> str:
+        """Format ``[chunk:ID]`` citations for one chunk or a merged span."""
+        if isinstance(chunk_ids, int):
+            chunk_ids = [chunk_ids]
+        return " ".join(f"[chunk:{chunk_id}]" for chunk_id in chunk_ids)
+
     def get_no_evidence_response(self) -> str:
         """Get the response for when there's no evidence."""
         return self.NO_EVIDENCE_RESPONSE
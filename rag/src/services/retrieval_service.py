@@ -1,8 +1,12 @@
 from dataclasses import dataclass
+from typing import Sequence
 
 from src.config import Settings
-from src.core.constants import DecisionType
-from src.repositories.embedding_repository import EmbeddingRepository, SearchHit
+from src.core.constants import DecisionType, SearchPath
+from src.repositories.embedding_repository import AsyncEmbeddingRepository, SearchHit
+from .reranker import Reranker
+from .scope_cache import DishScopeCache
+from .vector_index import NumpyVectorIndex
 
 
 @dataclass
@@ -12,6 +16,11 @@ class RetrievalResult:
     hits: list[SearchHit]
     confidence: float
     decision: DecisionType
+    search_path: SearchPath | None = None
+    hybrid: bool = False
+    # Re-ranking scores of the hits (hit.score stays the raw cosine score)
+    rerank_scores: list[float] | None = None
+    candidates: int = 0
 
 
 class RetrievalService:
@@ -19,24 +28,133 @@ class RetrievalService:
 
     def __init__(
         self,
-        embedding_repo: EmbeddingRepository,
+        embedding_repo: AsyncEmbeddingRepository,
         settings: Settings,
+        vector_index: NumpyVectorIndex | None = None,
+        reranker: Reranker | None = None,
+        scope_cache: DishScopeCache | None = None,
     ):
         self._embedding_repo = embedding_repo
         self._settings = settings
+        self._vector_index = vector_index
+        self._reranker = reranker
+        self._scope_cache = scope_cache
 
-    def search(
+    async def search(
         self,
         query_embedding: list[float],
         top_k: int,
         dish_id: int | None = None,
+        ef_search: int | None = None,
+        query_text: str | None = None,
     ) -> RetrievalResult:
-        """Search for similar chunks and calculate confidence."""
-        hits = self._embedding_repo.search_similar(
-            query_embedding=query_embedding,
-            top_k=top_k,
-            dish_id=dish_id,
-        )
+        """
+        Search for similar chunks and calculate confidence.
+
+        In hybrid mode ``query_text`` is also matched against the full-text
+        index (in SQL, so the in-process vector index is not used). With a
+        re-ranker, ``rerank_fetch_factor`` x ``top_k`` candidates are fetched
+        and re-ranked down to ``top_k``.
+        """
+        fetch_k = self._fetch_k(top_k)
+
+        hybrid = self._settings.retrieval_mode == "hybrid" and bool(query_text)
+        if hybrid:
+            path = await self._plan(dish_id)
+            hits = await self._embedding_repo.search_hybrid(
+                query_embedding=query_embedding,
+                query_text=query_text or "",
+                top_k=fetch_k,
+                dish_id=dish_id,
+                ef_search=ef_search,
+                path=path,
+                candidates=max(fetch_k, self._settings.hybrid_candidates),
+                rrf_k=self._settings.rrf_k,
+            )
+        elif self._vector_index is not None and self._vector_index.ready:
+            # In-process index; pgvector stays the fallback until it has loaded
+            path = SearchPath.NUMPY
+            hits = self._vector_index.search(query_embedding, fetch_k, dish_id)
+        else:
+            path = await self._plan(dish_id)
+            hits = await self._embedding_repo.search_similar(
+                query_embedding=query_embedding,
+                top_k=fetch_k,
+                dish_id=dish_id,
+                ef_search=ef_search,
+                path=path,
+            )
+
+        return self._result(hits, top_k, path, query_text, hybrid=hybrid)
+
+    async def search_batch(
+        self,
+        query_embeddings: list[list[float]],
+        top_k: int,
+        dish_ids: list[int | None] | None = None,
+        query_texts: Sequence[str | None] | None = None,
+    ) -> list[RetrievalResult]:
+        """
+        Search for several queries at once, one result per query in order.
+
+        With the in-process index, the queries of each dish are scored in
+        one matrix product; otherwise all of them go to Postgres in a single
+        statement. Retrieval is vector-only (no hybrid fusion); ``query_texts``
+        feed the re-ranker.
+        """
+        if not query_embeddings:
+            return []
+        if dish_ids is None:
+            dish_ids = [None] * len(query_embeddings)
+        fetch_k = self._fetch_k(top_k)
+
+        if self._vector_index is not None and self._vector_index.ready:
+            path = SearchPath.NUMPY
+            hits: list[list[SearchHit]] = [[] for _ in query_embeddings]
+            by_dish: dict[int | None, list[int]] = {}
+            for position, dish_id in enumerate(dish_ids):
+                by_dish.setdefault(dish_id, []).append(position)
+            for dish_id, positions in by_dish.items():
+                found = self._vector_index.search_many(
+                    [query_embeddings[p] for p in positions], fetch_k, dish_id
+                )
+                for position, query_hits in zip(positions, found):
+                    hits[position] = query_hits
+        else:
+            path = SearchPath.BATCH
+            hits = await self._embedding_repo.search_batch(
+                query_embeddings,
+                fetch_k,
+                dish_ids=dish_ids,
+                ef_search=self._settings.hnsw_ef_search,
+            )
+
+        texts: Sequence[str | None] = query_texts or [None] * len(query_embeddings)
+        return [
+            self._result(query_hits, top_k, path, text)
+            for query_hits, text in zip(hits, texts)
+        ]
+
+    def _fetch_k(self, top_k: int) -> int:
+        """Candidates to fetch: over-fetched when a re-ranker narrows them down."""
+        if self._reranker is None:
+            return top_k
+        return top_k * max(1, self._settings.rerank_fetch_factor)
+
+    def _result(
+        self,
+        hits: list[SearchHit],
+        top_k: int,
+        path: SearchPath,
+        query_text: str | None,
+        hybrid: bool = False,
+    ) -> RetrievalResult:
+        """Re-rank the candidates (if enabled) and decide on confidence."""
+        candidates = len(hits)
+        rerank_scores = None
+        if self._reranker is not None:
+            reranked = self._reranker.rerank(query_text or "", hits, top_k)
+            hits, rerank_scores = reranked.hits, reranked.scores
 
         confidence = max([h.score for h in hits], default=0.0)
         decision = self._calculate_decision(confidence, has_hits=bool(hits))
@@ -45,8 +163,44 @@ class RetrievalService:
             hits=hits,
             confidence=confidence,
             decision=decision,
+            search_path=path,
+            hybrid=hybrid,
+            rerank_scores=rerank_scores,
+            candidates=candidates,
         )
 
+    async def _plan(self, dish_id: int | None) -> SearchPath:
+        """
+        Choose how to search for the selectivity of the scope.
+
+        A dish has a handful of chunks: scanning them exactly is both faster
+        and exact, where a filtered HNSW scan would discard most of its
+        candidates. Only dishes above ``dish_exact_scan_max_rows`` go through
+        the index, with an iterative scan so the filter cannot starve it. The
+        dish's size comes from the scope cache when there is one, so only
+        its first search pays for the count.
+        """
+        if dish_id is None:
+            return SearchPath.HNSW
+
+        limit = self._settings.dish_exact_scan_max_rows
+        if await self._scope_size(dish_id, limit + 1) <= limit:
+            return SearchPath.EXACT
+        if self._settings.hnsw_iterative_scan:
+            return SearchPath.HNSW_ITERATIVE
+        return SearchPath.HNSW_FILTERED
+
+    async def _scope_size(self, dish_id: int, limit: int) -> int:
+        """Embedding count of a dish up to ``limit``, cached when possible."""
+        if self._scope_cache is None:
+            return await self._embedding_repo.scope_size(dish_id, limit)
+
+        size = self._scope_cache.get(dish_id)
+        if size is None:
+            size = await self._embedding_repo.scope_size(dish_id, limit)
+            self._scope_cache.set(dish_id, size)
+        return size
+
     def _calculate_decision(self, confidence: float, has_hits: bool) -> DecisionType:
         """Calculate decision based on confidence and hits."""
         if not has_hits:
@@ -0,0 +1,39 @@
+from src.config import Settings
+from src.core.cache import LRUTTLCache
+from .dish_catalog import DishCatalog
+
+
+class DishScopeCache:
+    """
+    App-lifetime cache of each dish's embedding count, used to plan dish-scoped search.
+
+    Entries are keyed by the dish catalog version, so any change to the dishes
+    makes them unreachable. They also expire after ``dish_scope_cache_ttl``
+    and are cleared when this worker indexes new chunks.
+    """
+
+    def __init__(self, settings: Settings, catalog: DishCatalog | None = None):
+        self._catalog = catalog
+        self._cache: LRUTTLCache[tuple[str, int], int] = LRUTTLCache(
+            max_size=settings.dish_scope_cache_size,
+            ttl_seconds=settings.dish_scope_cache_ttl,
+        )
+
+    def get(self, dish_id: int) -> int | None:
+        """Return the cached (capped) embedding count of a dish, or None."""
+        return self._cache.get((self._version(), dish_id))
+
+    def set(self, dish_id: int, size: int) -> None:
+        """Store the (capped) embedding count of a dish."""
+        self._cache.set((self._version(), dish_id), size)
+
+    def _version(self) -> str:
+        return self._catalog.version if self._catalog is not None else ""
+
+    def clear(self) -> None:
+        """Drop every cached count."""
+        self._cache.clear()
+
+    def stats(self) -> dict[str, float]:
+        """Return cache size and hit/miss counters."""
+        return self._cache.stats()
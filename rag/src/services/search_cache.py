@@ -0,0 +1,38 @@
+from src.config import Settings
+from src.core.cache import LRUTTLCache
+from src.schemas.search import SearchResultOut
+
+
+class SearchResultCache:
+    """
+    App-lifetime cache of /search results keyed by canonical question, dish and top_k.
+
+    Entries are not tied to the index contents: they expire after
+    ``search_cache_ttl`` and are dropped when this worker indexes new chunks.
+    """
+
+    def __init__(self, settings: Settings):
+        self._cache: LRUTTLCache[tuple[str, int | None, int], SearchResultOut] = LRUTTLCache(
+            max_size=settings.search_cache_size,
+            ttl_seconds=settings.search_cache_ttl,
+        )
+
+    def get(
+        self, canonical_question: str, dish_id: int | None, top_k: int
+    ) -> SearchResultOut | None:
+        """Return the cached result or None."""
+        return self._cache.get((canonical_question, dish_id, top_k))
+
+    def set(
+        self, canonical_question: str, dish_id: int | None, top_k: int, result: SearchResultOut
+    ) -> None:
+        """Store a result."""
+        self._cache.set((canonical_question, dish_id, top_k), result)
+
+    def clear(self) -> None:
+        """Drop every cached result."""
+        self._cache.clear()
+
+    def stats(self) -> dict[str, float]:
+        """Return cache size and hit/miss counters."""
+        return self._cache.stats()
@@ -0,0 +1,113 @@
+from src.core.scheduler import Priority
+from src.schemas.search import SearchBatchOut, SearchHitOut, SearchQueryIn, SearchResultOut
+from .ollama_service import OllamaService
+from .embedding_cache import QueryEmbeddingCache
+from .retrieval_service import RetrievalResult, RetrievalService
+from .search_cache import SearchResultCache
+from .text_service import TextService
+
+
+class SearchService:
+    """Service for retrieval without answer generation (evaluation, kiosk panels)."""
+
+    def __init__(
+        self,
+        ollama_service: OllamaService,
+        text_service: TextService,
+        retrieval_service: RetrievalService,
+        embedding_cache: QueryEmbeddingCache | None = None,
+        result_cache: SearchResultCache | None = None,
+    ):
+        self._ollama = ollama_service
+        self._text = text_service
+        self._retrieval = retrieval_service
+        self._embedding_cache = embedding_cache
+        self._result_cache = result_cache
+
+    async def search(self, question: str, dish_id: int | None, top_k: int) -> SearchResultOut:
+        """
+        Retrieve the top-k chunks of one question (read-only, no generation).
+
+        A result cache hit answers without embedding or touching the
+        database; so does a miss whose embedding is cached when the
+        in-process vector index serves the search.
+        """
+        normalized_question = self._text.normalize(question)
+        canonical_question = self._text.canonicalize(normalized_question)
+        if self._result_cache is not None:
+            cached = self._result_cache.get(canonical_question, dish_id, top_k)
+            if cached is not None:
+                return cached.model_copy(update={"question": question})
+
+        query_embedding = await self._embed(normalized_question, canonical_question)
+        result = await self._retrieval.search(
+            query_embedding, top_k, dish_id=dish_id, query_text=normalized_question
+        )
+        response = self._build_result(SearchQueryIn(question=question, dish_id=dish_id), result)
+        if self._result_cache is not None:
+            self._result_cache.set(canonical_question, dish_id, top_k, response)
+        return response
+
+    async def search_batch(self, queries: list[SearchQueryIn], top_k: int) -> SearchBatchOut:
+        """
+        Retrieve the top-k chunks of every question.
+
+        Questions missing from the query embedding cache are embedded in one
+        Ollama call, and all of them are searched in one retrieval call.
+        """
+        questions = [self._text.normalize(q.question) for q in queries]
+        embeddings = await self._embed_many(questions)
+        results = await self._retrieval.search_batch(
+            embeddings,
+            top_k,
+            dish_ids=[q.dish_id for q in queries],
+            query_texts=questions,
+        )
+        return SearchBatchOut(
+            results=[
+                self._build_result(query, result) for query, result in zip(queries, results)
+            ]
+        )
+
+    async def _embed(self, question: str, canonical_question: str) -> list[float]:
+        """Embed one question, going through the query embedding cache if present."""
+        if self._embedding_cache is None:
+            return await self._ollama.generate_embedding(question, priority=Priority.NORMAL)
+
+        return await self._embedding_cache.get_or_embed(
+            canonical_question,
+            lambda: self._ollama.generate_embedding(question, priority=Priority.NORMAL),
+        )
+
+    async def _embed_many(self, questions: list[str]) -> list[list[float]]:
+        """Embed the questions, going through the query embedding cache if present."""
+
+        async def embed(positions: list[int]) -> list[list[float]]:
+            return await self._ollama.generate_embeddings(
+                [questions[i] for i in positions], priority=Priority.NORMAL
+            )
+
+        if self._embedding_cache is None:
+            return await embed(list(range(len(questions))))
+
+        return await self._embedding_cache.get_or_embed_many(
+            [self._text.canonicalize(q) for q in questions], embed
+        )
+
+    def _build_result(self, query: SearchQueryIn, result: RetrievalResult) -> SearchResultOut:
+        """Build the response entry of one question."""
+        return SearchResultOut(
+            question=query.question,
+            dish_id=query.dish_id,
+            decision=result.decision.value,
+            confidence=result.confidence,
+            hits=[
+                SearchHitOut(
+                    chunk_id=h.chunk_id,
+                    dish_id=h.dish_id,
+                    score=h.score,
+                    preview=self._text.truncate_for_preview(h.content),
+                )
+                for h in result.hits
+            ],
+        )
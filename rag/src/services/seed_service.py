@@ -1,7 +1,8 @@
 from src.config import Settings
-from src.repositories import DishRepository, ChunkRepository
+from src.repositories import DishRepository, ChunkRepository, DishFactRepository
 from src.models.entities import Dish
 from .text_service import TextService
+from .fact_service import build_dish_facts
 from data.seed_dishes import build_seed_dishes
 
 
@@ -14,11 +15,13 @@ class SeedService:
         chunk_repo: ChunkRepository,
         text_service: TextService,
         settings: Settings,
+        fact_repo: DishFactRepository | None = None,
     ):
         self._dish_repo = dish_repo
         self._chunk_repo = chunk_repo
         self._text_service = text_service
         self._settings = settings
+        self._fact_repo = fact_repo
 
     def seed_dishes(self) -> tuple[bool, str]:
         """
@@ -30,6 +33,9 @@ class SeedService:
         # Check if data already exists
         existing_count = self._dish_repo.count()
         if existing_count > 0:
+            backfilled = self._backfill_facts()
+            if backfilled:
+                return True, f"Ya hay datos. Se cargaron {backfilled} hechos estructurados de las fichas."
             return True, "Ya hay datos. Si querés reiniciar, borrá tablas o limpiá manualmente."
 
         # Get seed data
@@ -55,5 +61,31 @@ class SeedService:
                 chunks_content=chunks_content,
             )
 
+            # Store allergen/diet facts in queryable form
+            if self._fact_repo is not None:
+                self._store_facts(dish.id, dish_data["facts"])
+
         self._dish_repo.commit()
         return True, "Seed OK: 10 platos + fichas cargadas."
+
+    def _backfill_facts(self) -> int:
+        """Load structured facts for seed dishes created before the fact table existed."""
+        if self._fact_repo is None or self._fact_repo.count() > 0:
+            return 0
+
+        seed_by_name = {d["name"]: d for d in build_seed_dishes()}
+        created = 0
+        for dish in self._dish_repo.get_all_active():
+            dish_data = seed_by_name.get(dish.name)
+            if dish_data is not None:
+                created += self._store_facts(dish.id, dish_data["facts"])
+
+        self._dish_repo.commit()
+        return created
+
+    def _store_facts(self, dish_id: int, facts: dict) -> int:
+        """Insert the structured allergen/diet facts of one dish."""
+        if self._fact_repo is None:
+            return 0
+        rows = build_dish_facts(self._text_service, dish_id, facts)
+        return len(self._fact_repo.create_many(rows))
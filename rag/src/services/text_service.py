@@ -1,4 +1,5 @@
 import re
+import unicodedata
 
 from src.config import Settings
 from src.core.constants import ALLERGY_TRIGGERS
@@ -17,6 +18,13 @@ class TextService:
         text = re.sub(r"\n{3,}", "\n\n", text)
         return text.strip()
 
+    def canonicalize(self, text: str) -> str:
+        """Canonical form of a query for cache keys: normalized, accent- and case-folded."""
+        text = self.normalize(text)
+        decomposed = unicodedata.normalize("NFKD", text)
+        folded = "".join(c for c in decomposed if not unicodedata.combining(c))
+        return re.sub(r"\s+", " ", folded.casefold())
+
     def chunk(self, text: str) -> list[str]:
         """Split text into overlapping chunks."""
         text = self.normalize(text)
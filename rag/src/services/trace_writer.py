@@ -0,0 +1,194 @@
+import asyncio
+import logging
+from dataclasses import dataclass, field, replace
+from typing import Any, Callable
+
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from src.config import Settings
+from src.repositories import AsyncChatRepository, ChatRepository
+
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TraceRecord:
+    """A finished chat turn and its RAG trace, with pre-allocated ids."""
+
+    turn_id: int
+    trace_id: int
+    dish_id: int | None
+    user_text: str
+    bot_text: str
+    used_chunk_ids: list[int]
+    scores: list[float]
+    confidence: float
+    decision: str
+    meta_data: dict[str, Any] = field(default_factory=dict)
+
+
+def write_trace_records(repo: ChatRepository, records: list[TraceRecord]) -> None:
+    """Insert turns and their traces in one transaction."""
+    for r in records:
+        repo.add_turn(r.turn_id, r.user_text, r.bot_text, dish_id=r.dish_id)
+    # Turns first: traces reference them
+    repo.flush()
+    for r in records:
+        repo.add_trace(
+            r.trace_id,
+            r.turn_id,
+            used_chunk_ids=r.used_chunk_ids,
+            scores=r.scores,
+            confidence=r.confidence,
+            decision=r.decision,
+            meta_data=r.meta_data,
+        )
+    repo.commit()
+
+
+async def write_trace_records_async(
+    repo: AsyncChatRepository,
+    records: list[TraceRecord],
+) -> None:
+    """Insert turns and their traces in one transaction on an async session."""
+    for r in records:
+        repo.add_turn(r.turn_id, r.user_text, r.bot_text, dish_id=r.dish_id)
+    await repo.flush()
+    for r in records:
+        repo.add_trace(
+            r.trace_id,
+            r.turn_id,
+            used_chunk_ids=r.used_chunk_ids,
+            scores=r.scores,
+            confidence=r.confidence,
+            decision=r.decision,
+            meta_data=r.meta_data,
+        )
+    await repo.commit()
+
+
+def _without_dish(record: TraceRecord) -> TraceRecord:
+    """Copy of ``record`` whose turn has no dish; the rejected id stays in the metadata."""
+    return replace(
+        record,
+        dish_id=None,
+        meta_data={**record.meta_data, "unknown_dish_id": record.dish_id},
+    )
+
+
+class TraceWriter:
+    """
+    Write-behind persistence for chat turns and RAG traces.
+
+    Records are queued and written in batches by a background task on its
+    own database session, so the writes are off the request's critical path.
+    When the queue is full (or the writer is not running) a record is
+    written by the submitting request instead (in a worker thread), which
+    applies backpressure rather than dropping audit data. A batch that fails
+    is retried record by record, so one bad record loses only itself.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], settings: Settings):
+        self._session_factory = session_factory
+        self._batch_size = max(1, settings.trace_writer_batch_size)
+        self._queue: asyncio.Queue[TraceRecord] = asyncio.Queue(
+            maxsize=max(1, settings.trace_writer_max_queue)
+        )
+        self._task: asyncio.Task[None] | None = None
+        self.written = 0
+        self.written_inline = 0
+        self.failed = 0
+
+    def start(self) -> None:
+        """Start the background writer task."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def aclose(self) -> None:
+        """Flush queued records and stop the background task."""
+        if self._task is None:
+            return
+        await self._queue.join()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def submit(self, record: TraceRecord) -> None:
+        """Queue a record for writing, or write it now when the queue is full."""
+        if self._task is not None:
+            try:
+                self._queue.put_nowait(record)
+                return
+            except asyncio.QueueFull:
+                pass
+
+        await asyncio.to_thread(self._write_one, record)
+        self.written_inline += 1
+
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            while len(batch) < self._batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            try:
+                await asyncio.to_thread(self._write_batch, batch)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write_batch(self, batch: list[TraceRecord]) -> None:
+        """Write a batch in one transaction, falling back to one per record."""
+        if len(batch) > 1:
+            try:
+                self._write(batch)
+                return
+            except Exception:
+                logger.warning(
+                    "Failed to write %d chat traces; retrying one by one",
+                    len(batch),
+                    exc_info=True,
+                )
+
+        for record in batch:
+            try:
+                self._write_one(record)
+            except Exception:
+                self.failed += 1
+                logger.exception("Failed to write chat turn %d", record.turn_id)
+
+    def _write_one(self, record: TraceRecord) -> None:
+        """
+        Write one record; one rejected for its dish is written without it.
+
+        The request's ``dish_id`` is not checked on the request path (that
+        would cost a round trip), so an unknown dish surfaces here as the
+        turn's foreign-key violation.
+        """
+        try:
+            self._write([record])
+        except IntegrityError:
+            if record.dish_id is None:
+                raise
+            self._write([_without_dish(record)])
+
+    def _write(self, records: list[TraceRecord]) -> None:
+        session = self._session_factory()
+        try:
+            write_trace_records(ChatRepository(session), records)
+            self.written += len(records)
+        finally:
+            session.close()
+
+    def stats(self) -> dict[str, float]:
+        """Return queue depth and write counters."""
+        return {
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "written_inline": self.written_inline,
+            "failed": self.failed,
+        }
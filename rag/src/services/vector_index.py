@@ -0,0 +1,301 @@
+import asyncio
+import json
+import logging
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Sequence
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from src.config import Settings
+from src.models.vector_storage import VECTOR_STORAGE
+from src.repositories import EmbeddingRepository
+from src.repositories.embedding_repository import SearchHit
+
+
+logger = logging.getLogger(__name__)
+
+# (chunk_id, dish_id, chunk_index, content, embedding)
+IndexRow = tuple[int, int | None, int, str, Any]
+
+# dish_id stored for chunks without a dish
+_NO_DISH = -1
+
+
+@dataclass(frozen=True)
+class _Snapshot:
+    """Immutable index contents; rows are grouped by dish."""
+
+    key: str
+    vectors: np.ndarray
+    chunk_ids: np.ndarray
+    dish_ids: np.ndarray
+    chunk_indexes: list[int]
+    contents: list[str]
+    dish_offsets: dict[int, tuple[int, int]]
+    max_chunk_id: int
+    digest: str
+
+    @property
+    def size(self) -> int:
+        return len(self.chunk_ids)
+
+    def rows(self) -> list[IndexRow]:
+        """Rows of the snapshot, for extending it."""
+        return [
+            (
+                int(self.chunk_ids[i]),
+                None if self.dish_ids[i] == _NO_DISH else int(self.dish_ids[i]),
+                self.chunk_indexes[i],
+                self.contents[i],
+                self.vectors[i],
+            )
+            for i in range(self.size)
+        ]
+
+
+def _offsets(dish_ids: np.ndarray) -> dict[int, tuple[int, int]]:
+    """[start, end) row range of each dish in a dish-sorted id array."""
+    dishes, starts = np.unique(dish_ids, return_index=True)
+    ends = list(starts[1:]) + [len(dish_ids)]
+    return {int(d): (int(s), int(e)) for d, s, e in zip(dishes, starts, ends)}
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1.0, norms)
+
+
+def top_k_indices(scores: np.ndarray, k: int) -> np.ndarray:
+    """Column indices of the ``k`` highest scores of each row, best first."""
+    k = min(k, scores.shape[1])
+    if k <= 0:
+        return np.empty((scores.shape[0], 0), dtype=np.int64)
+    part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(scores, part, axis=1), axis=1, kind="stable")
+    return np.take_along_axis(part, order, axis=1)
+
+
+class NumpyVectorIndex:
+    """
+    In-process brute-force vector index over a memory-mapped snapshot.
+
+    Embeddings are held L2-normalized in one contiguous float32 matrix,
+    grouped by dish so a dish-scoped search is a slice. Top-k is a matrix
+    product plus ``argpartition``, which for menu-sized catalogs is faster
+    than a round trip to pgvector.
+
+    Snapshots are written to ``vector_snapshot_dir`` under a key derived from
+    a digest of the rows of ``kb_embedding`` and opened with ``mmap_mode="r"``, so all
+    uvicorn workers share the same pages; a worker that finds the snapshot
+    already written just maps it. On refresh only rows with a chunk id past
+    the snapshot's are read from the database, unless rows were updated or
+    deleted, in which case the snapshot is rebuilt.
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], settings: Settings):
+        self._session_factory = session_factory
+        self._settings = settings
+        self._dir = Path(settings.vector_snapshot_dir)
+        self._snapshot: _Snapshot | None = None
+        self._task: asyncio.Task[None] | None = None
+        self.searches = 0
+        self.incremental_refreshes = 0
+        self.full_rebuilds = 0
+
+    @property
+    def ready(self) -> bool:
+        """Whether a snapshot is loaded."""
+        return self._snapshot is not None
+
+    def start(self) -> None:
+        """Load the index and keep refreshing it in the background."""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def aclose(self) -> None:
+        """Stop the refresh task."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.to_thread(self.refresh)
+            except Exception:
+                logger.exception("Vector index refresh failed")
+            interval = self._settings.vector_snapshot_refresh_interval
+            if interval <= 0:
+                return
+            await asyncio.sleep(interval)
+
+    def refresh(self) -> bool:
+        """Bring the index up to date with ``kb_embedding``; True if it changed."""
+        session = self._session_factory()
+        try:
+            repo = EmbeddingRepository(session)
+            current = self._snapshot
+            state = repo.snapshot_state(current.max_chunk_id if current is not None else 0)
+            key = f"{VECTOR_STORAGE.dim}-{state.rows}-{state.max_chunk_id}-{state.digest[:16]}"
+            if current is not None and current.key == key:
+                return False
+
+            snapshot = self._load(key)
+            if snapshot is None:
+                rows: list[IndexRow] = []
+                # Extend only if none of the snapshot's rows were updated or deleted
+                if current is not None and current.digest == state.base_digest:
+                    added = repo.export_rows(current.max_chunk_id)
+                    if current.size + len(added) == state.rows:
+                        rows = current.rows() + added
+                        self.incremental_refreshes += 1
+                if not rows and state.rows:
+                    rows = repo.export_rows()
+                    self.full_rebuilds += 1
+                snapshot = self._write(key, rows, state.digest)
+        finally:
+            session.close()
+
+        self._snapshot = snapshot
+        self._cleanup(keep=key)
+        logger.info("Vector index at %s (%d rows)", key, snapshot.size)
+        return True
+
+    def install(self, rows: Sequence[IndexRow], key: str = "local") -> None:
+        """Build the index from in-memory rows (no database), e.g. for tests and benchmarks."""
+        self._snapshot = self._write(key, list(rows))
+
+    def search(
+        self,
+        query_embedding: Sequence[float],
+        top_k: int,
+        dish_id: int | None = None,
+    ) -> list[SearchHit]:
+        """Nearest chunks to one query by cosine similarity."""
+        return self.search_many([query_embedding], top_k, dish_id)[0]
+
+    def search_many(
+        self,
+        query_embeddings: Sequence[Sequence[float]],
+        top_k: int,
+        dish_id: int | None = None,
+    ) -> list[list[SearchHit]]:
+        """Nearest chunks to each query, scored in one matrix product."""
+        snapshot = self._snapshot
+        if snapshot is None or not query_embeddings:
+            return [[] for _ in query_embeddings]
+
+        start, end = 0, snapshot.size
+        if dish_id is not None:
+            start, end = snapshot.dish_offsets.get(dish_id, (0, 0))
+
+        queries = _normalize(
+            np.asarray([VECTOR_STORAGE.truncate(q) for q in query_embeddings], dtype=np.float32)
+        )
+        scores = queries @ snapshot.vectors[start:end].T
+        self.searches += len(query_embeddings)
+
+        results = []
+        for row_scores, indices in zip(scores, top_k_indices(scores, top_k)):
+            results.append(
+                [
+                    SearchHit(
+                        chunk_id=int(snapshot.chunk_ids[start + i]),
+                        content=snapshot.contents[start + i],
+                        score=max(0.0, float(row_scores[i])),
+                        dish_id=dish_id if dish_id is not None else self._dish(snapshot, start + i),
+                        chunk_index=snapshot.chunk_indexes[start + i],
+                    )
+                    for i in indices
+                ]
+            )
+        return results
+
+    @staticmethod
+    def _dish(snapshot: _Snapshot, row: int) -> int | None:
+        dish_id = int(snapshot.dish_ids[row])
+        return None if dish_id == _NO_DISH else dish_id
+
+    def _paths(self, key: str) -> tuple[Path, Path]:
+        return self._dir / f"{key}.npy", self._dir / f"{key}.json"
+
+    def _write(self, key: str, rows: list[IndexRow], digest: str = "") -> _Snapshot:
+        """Write rows as a snapshot (atomically) and map it back."""
+        rows = sorted(rows, key=lambda r: (_NO_DISH if r[1] is None else r[1], r[0]))
+        dim = VECTOR_STORAGE.dim
+        vectors = np.asarray([r[4] for r in rows], dtype=np.float32).reshape(len(rows), dim)
+        meta = {
+            "chunk_ids": [int(r[0]) for r in rows],
+            "dish_ids": [_NO_DISH if r[1] is None else int(r[1]) for r in rows],
+            "chunk_indexes": [int(r[2]) for r in rows],
+            "contents": [r[3] for r in rows],
+            "max_chunk_id": max((int(r[0]) for r in rows), default=0),
+            "digest": digest,
+        }
+
+        self._dir.mkdir(parents=True, exist_ok=True)
+        vectors_path, meta_path = self._paths(key)
+        pid = os.getpid()
+        # Metadata first: a snapshot counts as written once its matrix exists
+        tmp_meta = meta_path.with_suffix(f".{pid}.tmp")
+        tmp_meta.write_text(json.dumps(meta), encoding="utf-8")
+        os.replace(tmp_meta, meta_path)
+        tmp_vectors = vectors_path.with_suffix(f".{pid}.tmp")
+        with open(tmp_vectors, "wb") as f:
+            np.save(f, _normalize(vectors))
+        os.replace(tmp_vectors, vectors_path)
+
+        snapshot = self._load(key)
+        assert snapshot is not None
+        return snapshot
+
+    def _load(self, key: str) -> _Snapshot | None:
+        """Map a snapshot written by this or another worker, if present."""
+        vectors_path, meta_path = self._paths(key)
+        if not vectors_path.exists() or not meta_path.exists():
+            return None
+
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        dish_ids = np.asarray(meta["dish_ids"], dtype=np.int64)
+        return _Snapshot(
+            key=key,
+            vectors=np.load(vectors_path, mmap_mode="r"),
+            chunk_ids=np.asarray(meta["chunk_ids"], dtype=np.int64),
+            dish_ids=dish_ids,
+            chunk_indexes=meta["chunk_indexes"],
+            contents=meta["contents"],
+            dish_offsets=_offsets(dish_ids),
+            max_chunk_id=meta["max_chunk_id"],
+            digest=meta["digest"],
+        )
+
+    def _cleanup(self, keep: str) -> None:
+        """Remove older snapshots (still-mapped files may refuse on some platforms)."""
+        for path in self._dir.glob("*.npy"):
+            if path.stem == keep:
+                continue
+            for stale in (path, path.with_suffix(".json")):
+                try:
+                    stale.unlink()
+                except OSError:
+                    pass
+
+    def stats(self) -> dict[str, float]:
+        """Return index size and refresh counters."""
+        snapshot = self._snapshot
+        return {
+            "ready": self.ready,
+            "rows": snapshot.size if snapshot is not None else 0,
+            "dishes": len(snapshot.dish_offsets) if snapshot is not None else 0,
+            "searches": self.searches,
+            "incremental_refreshes": self.incremental_refreshes,
+            "full_rebuilds": self.full_rebuilds,
+        }
@@ -0,0 +1,132 @@
+import asyncio
+import logging
+import time
+from typing import Callable
+
+from sqlalchemy.orm import Session
+
+from src.config import Settings
+from src.repositories import MaintenanceRepository
+from .ollama_service import OllamaService
+
+
+logger = logging.getLogger(__name__)
+
+
+class WarmupService:
+    """
+    Startup warm-up for Ollama models and hot Postgres relations.
+
+    On start it preloads the embed and chat models (with the configured
+    keep_alive) and prewarms the vector index and hot tables with
+    ``pg_prewarm``, then marks the app ready. Afterwards it re-sends the
+    preload periodically so idle models are not unloaded. Warm-up that
+    fails or exceeds ``warmup_timeout`` still ends in the ready state:
+    a cold start is better than never serving.
+    """
+
+    # Relations read on every chat request, hottest first
+    PREWARM_RELATIONS: tuple[str, ...] = (
+        "kb_embedding_hnsw",
+        "kb_embedding",
+        "kb_chunk",
+        "dish_fact",
+    )
+
+    def __init__(
+        self,
+        ollama_service: OllamaService,
+        session_factory: Callable[[], Session],
+        settings: Settings,
+    ):
+        self._ollama = ollama_service
+        self._session_factory = session_factory
+        self._settings = settings
+        self._ready = asyncio.Event()
+        self._task: asyncio.Task[None] | None = None
+        self.duration = 0.0
+        self.models: dict[str, bool] = {}
+        self.prewarmed_blocks: dict[str, int] = {}
+        self.pings = 0
+
+    @property
+    def ready(self) -> bool:
+        """Whether warm-up has finished (or is disabled)."""
+        return self._ready.is_set()
+
+    def start(self) -> None:
+        """Start warm-up and keep-alive pings in the background."""
+        if not self._settings.warmup_enabled:
+            self._ready.set()
+            return
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def wait_ready(self) -> None:
+        """Wait until warm-up has finished."""
+        await self._ready.wait()
+
+    async def aclose(self) -> None:
+        """Stop the background task."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self) -> None:
+        try:
+            await asyncio.wait_for(self.warm_up(), self._settings.warmup_timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Warm-up did not finish in %.0fs", self._settings.warmup_timeout)
+        except Exception:
+            logger.exception("Warm-up failed")
+        finally:
+            self._ready.set()
+
+        interval = self._settings.warmup_ping_interval
+        while interval > 0:
+            await asyncio.sleep(interval)
+            try:
+                self.models = await self._ollama.preload()
+                self.pings += 1
+            except Exception:
+                logger.exception("Model keep-alive ping failed")
+
+    async def warm_up(self) -> None:
+        """Preload models and prewarm Postgres pages concurrently."""
+        started = time.monotonic()
+        models, blocks = await asyncio.gather(
+            self._ollama.preload(),
+            asyncio.to_thread(self._prewarm_db),
+        )
+        self.models = models
+        self.prewarmed_blocks = blocks
+        self.duration = time.monotonic() - started
+
+    def _prewarm_db(self) -> dict[str, int]:
+        if not self._settings.warmup_pg_prewarm:
+            return {}
+
+        session = self._session_factory()
+        try:
+            repo = MaintenanceRepository(session)
+            if not repo.ensure_extension("pg_prewarm"):
+                return {}
+            return {relation: repo.prewarm(relation) for relation in self.PREWARM_RELATIONS}
+        finally:
+            session.close()
+
+    def stats(self) -> dict[str, float | bool]:
+        """Return readiness, warm-up duration and what was loaded."""
+        return {
+            "ready": self.ready,
+            "duration_ms": self.duration * 1000,
+            "models_loaded": sum(self.models.values()),
+            "models_failed": sum(not ok for ok in self.models.values()),
+            "prewarmed_blocks": sum(self.prewarmed_blocks.values()),
+            "pings": self.pings,
+        }
@@ -0,0 +1,150 @@
+"""Tests for LRUTTLCache, QueryEmbeddingCache and SemanticAnswerCache."""
+
+from unittest.mock import AsyncMock
+
+from src.config import Settings
+from src.core.cache import LRUTTLCache
+from src.core.constants import DecisionType
+from src.repositories.embedding_repository import SearchHit
+from src.services import QueryEmbeddingCache, SemanticAnswerCache
+from src.services.answer_cache import CachedAnswer
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestLRUTTLCache:
+    """Tests for LRU and TTL eviction."""
+
+    def test_evicts_least_recently_used(self):
+        """Should evict the least recently used entry when full."""
+        cache: LRUTTLCache[str, int] = LRUTTLCache(max_size=2, ttl_seconds=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        assert cache.get("a") == 1  # "b" becomes least recently used
+        cache.set("c", 3)
+
+        assert cache.get("b") is None
+        assert cache.get("a") == 1
+        assert cache.get("c") == 3
+        assert cache.evictions == 1
+
+    def test_expires_after_ttl(self):
+        """Should treat entries older than the TTL as misses."""
+        clock = FakeClock()
+        cache: LRUTTLCache[str, int] = LRUTTLCache(max_size=10, ttl_seconds=5, clock=clock)
+        cache.set("a", 1)
+
+        clock.now = 4.9
+        assert cache.get("a") == 1
+        clock.now = 5.0
+        assert cache.get("a") is None
+        assert len(cache) == 0
+
+    def test_counts_hits_and_misses(self):
+        """Should expose hit/miss counters and ratio."""
+        cache: LRUTTLCache[str, int] = LRUTTLCache(max_size=10, ttl_seconds=60)
+        cache.get("a")
+        cache.set("a", 1)
+        cache.get("a")
+
+        stats = cache.stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_ratio"] == 0.5
+
+    def test_zero_size_disables_cache(self):
+        """Should not store anything when max_size is 0."""
+        cache: LRUTTLCache[str, int] = LRUTTLCache(max_size=0, ttl_seconds=60)
+        cache.set("a", 1)
+        assert cache.get("a") is None
+
+
+class TestQueryEmbeddingCache:
+    """Tests for the query embedding cache."""
+
+    async def test_embeds_once_per_canonical_question(self, test_settings: Settings):
+        """Should only call the embedder on a miss."""
+        cache = QueryEmbeddingCache(test_settings)
+        embed = AsyncMock(return_value=[0.1, 0.2])
+
+        first = await cache.get_or_embed("tiene gluten?", embed)
+        second = await cache.get_or_embed("tiene gluten?", embed)
+
+        assert first == second == [0.1, 0.2]
+        embed.assert_awaited_once()
+        assert cache.stats()["hits"] == 1
+
+    async def test_embeds_only_missing_questions_in_one_call(self, test_settings: Settings):
+        """Should embed the cache misses of a batch together, keeping order."""
+        cache = QueryEmbeddingCache(test_settings)
+        await cache.get_or_embed("tiene gluten?", AsyncMock(return_value=[0.1]))
+        embed = AsyncMock(return_value=[[0.2], [0.3]])
+
+        questions = ["es vegano?", "tiene gluten?", "tiene mani?"]
+
+        result = await cache.get_or_embed_many(questions, embed)
+
+        assert result == [[0.2], [0.1], [0.3]]
+        embed.assert_awaited_once_with([0, 2])
+
+
+class TestSemanticAnswerCache:
+    """Tests for the semantic answer cache."""
+
+    @staticmethod
+    def _answer(*chunk_ids: int) -> CachedAnswer:
+        return CachedAnswer(
+            answer="Contiene gluten.",
+            decision=DecisionType.ANSWER,
+            confidence=0.9,
+            hits=[SearchHit(chunk_id=c, content=f"chunk {c}", score=0.9) for c in chunk_ids],
+        )
+
+    def test_matches_near_duplicate_in_same_scope(self, test_settings: Settings):
+        """Should return the cached answer for a close embedding in the same scope."""
+        cache = SemanticAnswerCache(test_settings)
+        cache.store([1.0, 0.0], dish_id=3, is_allergy=False, answer=self._answer(1))
+
+        hit = cache.lookup([0.999, 0.01], dish_id=3, is_allergy=False)
+
+        assert hit is not None
+        assert hit.answer == "Contiene gluten."
+        assert cache.lookup([0.999, 0.01], dish_id=4, is_allergy=False) is None
+        assert cache.lookup([0.999, 0.01], dish_id=3, is_allergy=True) is None
+
+    def test_allergy_threshold_is_stricter(self, test_settings: Settings):
+        """Should require a closer match in allergy mode."""
+        test_settings.answer_cache_max_distance = 0.05
+        test_settings.answer_cache_allergy_max_distance = 0.01
+        cache = SemanticAnswerCache(test_settings)
+        cache.store([1.0, 0.0], dish_id=None, is_allergy=False, answer=self._answer(1))
+        cache.store([1.0, 0.0], dish_id=None, is_allergy=True, answer=self._answer(1))
+
+        query = [1.0, 0.25]  # cosine distance ~0.03
+        assert cache.lookup(query, dish_id=None, is_allergy=False) is not None
+        assert cache.lookup(query, dish_id=None, is_allergy=True) is None
+
+    def test_invalidates_answers_citing_changed_chunks(self, test_settings: Settings):
+        """Should drop every answer that cited an invalidated chunk."""
+        cache = SemanticAnswerCache(test_settings)
+        cache.store([1.0, 0.0], dish_id=None, is_allergy=False, answer=self._answer(1, 2))
+        cache.store([0.0, 1.0], dish_id=None, is_allergy=False, answer=self._answer(3))
+
+        assert cache.invalidate_chunks([2]) == 1
+        assert cache.lookup([1.0, 0.0], dish_id=None, is_allergy=False) is None
+        assert cache.lookup([0.0, 1.0], dish_id=None, is_allergy=False) is not None
+
+    def test_does_not_cache_answers_without_evidence(self, test_settings: Settings):
+        """Should skip answers that cite no chunks."""
+        cache = SemanticAnswerCache(test_settings)
+        cache.store([1.0, 0.0], dish_id=None, is_allergy=False, answer=self._answer())
+
+        assert cache.stats()["size"] == 0
@@ -0,0 +1,537 @@
+"""Tests for ChatService."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.api.dependencies import get_retrieval_service
+from src.config import Settings
+from src.core.constants import DecisionType
+from src.core.exceptions import OllamaConnectionError
+from src.core.single_flight import SingleFlight
+from src.repositories import AsyncChatRepository, AsyncChunkRepository, AsyncEmbeddingRepository
+from src.repositories.embedding_repository import SearchHit
+from src.services import (
+    ChatService,
+    DishScopeCache,
+    FactService,
+    OllamaService,
+    PromptService,
+    Reranker,
+    SemanticAnswerCache,
+    TextService,
+)
+from src.services.answer_cache import content_fingerprint
+from src.services.chat_service import ChatRequest
+from src.services.fact_service import FactAnswer
+from src.services.trace_writer import TraceWriter
+from src.services.retrieval_service import RetrievalResult, RetrievalService
+from src.services.vector_index import NumpyVectorIndex
+
+
+@pytest.fixture
+def chat_repo() -> MagicMock:
+    """Chat repository mock reserving fixed ids."""
+    repo = MagicMock(spec=AsyncChatRepository)
+    repo.allocate_ids.return_value = (10, 99)
+    return repo
+
+
+def _chat_service(
+    settings: Settings,
+    ollama: OllamaService,
+    chat_repo: MagicMock,
+    result: RetrievalResult,
+    **kwargs,
+) -> ChatService:
+    retrieval = MagicMock(spec=RetrievalService)
+    retrieval.search.return_value = result
+    return ChatService(
+        ollama_service=ollama,
+        text_service=TextService(settings),
+        prompt_service=PromptService(),
+        retrieval_service=retrieval,
+        chat_repo=chat_repo,
+        embedding_repo=MagicMock(spec=AsyncEmbeddingRepository),
+        settings=settings,
+        **kwargs,
+    )
+
+
+@pytest.fixture
+def answer_result() -> RetrievalResult:
+    """Retrieval result with one confident hit."""
+    return RetrievalResult(
+        hits=[SearchHit(chunk_id=1, content="Alérgenos: gluten", score=0.9)],
+        confidence=0.9,
+        decision=DecisionType.ANSWER,
+    )
+
+
+class TestChatServiceStream:
+    """Tests for ChatService.stream_query method."""
+
+    async def test_emits_sources_tokens_then_done(
+        self,
+        test_settings: Settings,
+        mock_ollama_service: OllamaService,
+        chat_repo: MagicMock,
+    ):
+        """Should emit sources first, then tokens, then persist and emit done."""
+
+        async def fake_stream(system_prompt: str, user_prompt: str, **kwargs):
+            for delta in ["Contiene ", "gluten."]:
+                yield delta
+
+        mock_ollama_service.chat_stream = fake_stream
+        result = RetrievalResult(
+            hits=[SearchHit(chunk_id=1, content="Alérgenos: gluten", score=0.9)],
+            confidence=0.9,
+            decision=DecisionType.ANSWER,
+        )
+        service = _chat_service(test_settings, mock_ollama_service, chat_repo, result)
+
+        events = [e async for e in service.stream_query(ChatRequest("Tiene gluten?", None, 3))]
+
+        assert [e.event for e in events] == ["sources", "token", "token", "done"]
+        assert events[0].data["decision"] == "answer"
+        assert events[0].data["sources"][0]["chunk_id"] == 1
+        assert events[-1].data == {"trace_id": 99, "answer": "Contiene gluten."}
+        chat_repo.add_turn.assert_called_once_with(
+            10, "Tiene gluten?", "Contiene gluten.", dish_id=None
+        )
+
+    async def test_no_evidence_skips_llm(
+        self,
+        test_settings: Settings,
+        mock_ollama_service: OllamaService,
+        chat_repo: MagicMock,
+    ):
+        """Should stream the fixed no-evidence response without calling the LLM."""
+        mock_ollama_service.chat_stream = MagicMock()
+        result = RetrievalResult(hits=[], confidence=0.0, decision=DecisionType.DISCLAIMER)
+        service = _chat_service(test_settings, mock_ollama_service, chat_repo, result)
+
+        events = [e async for e in service.stream_query(ChatRequest("Tiene gluten?", None, 3))]
+
+        assert [e.event for e in events] == ["sources", "token", "done"]
+        mock_ollama_service.chat_stream.assert_not_called()
+
+    async def test_failed_stream_persists_partial_turn(
+        self,
+        test_settings: Settings,
+        mock_ollama_service: OllamaService,
+        chat_repo: MagicMock,
+        answer_result: RetrievalResult,
+    ):
+        """Should record the answer streamed so far when Ollama fails mid-stream."""
+
+        async def fake_stream(system_prompt: str, user_prompt: str, **kwargs):
+            yield "Contiene "
+            raise OllamaConnectionError(message="Ollama chat stream interrupted")
+
+        mock_ollama_service.chat_stream = fake_stream
+        service = _chat_service(test_settings, mock_ollama_service, chat_repo, answer_result)
+
+        with pytest.raises(OllamaConnectionError):
+            [e async for e in service.stream_query(ChatRequest("Tiene gluten?", None, 3))]
+
+        chat_repo.add_turn.assert_called_once_with(10, "Tiene gluten?", "Contiene", dish_id=None)
+        meta = chat_repo.add_trace.call_args.kwargs["meta_data"]
+        assert meta["stream_interrupted"] == "OllamaConnectionError"
+
+    async def test_client_disconnect_persists_partial_turn(
+        self,
+        test_settings: Settings,
+        mock_ollama_service: OllamaService,
+        chat_repo: MagicMock,
+        answer_result: RetrievalResult,
+    ):
+        """Should record the turn when the client goes away before the end."""
+
+        async def fake_stream(system_prompt: str, user_prompt: str, **kwargs):
+            for delta in ["Contiene ", "gluten."]:
+                yield delta
+
+        mock_ollama_service.chat_stream = fake_stream
+        service = _chat_service(test_settings, mock_ollama_service, chat_repo, answer_result)
+
+        events = service.stream_query(ChatRequest("Tiene gluten?", None, 3))
+        assert (await anext(events)).event == "sources"
+        assert (await anext(events)).event == "token"
+        await events.aclose()
+
+        chat_repo.add_turn.assert_called_once_with(10, "Tiene gluten?", "Contiene", dish_id=None)
+        meta = chat_repo.add_trace.call_args.kwargs["meta_data"]
+        assert meta["stream_interrupted"] == "cancelled"
+
+
+class TestChatServiceAnswerCache:
+    """Tests for the semantic answer cache path of ChatService.process_query."""
+
+    async def test_repeated_question_skips_retrieval_and_llm(
+        self,
+        test_settings: Settings,
+        mock_ollama_service: OllamaService,
+        chat_repo: MagicMock,
+        answer_result: RetrievalResult,
+    ):
+        """Should answer a repeated question from the cache but still write a trace."""
+        chunk_repo = MagicMock(spec=AsyncChunkRepository)
+        chunk_repo.get_fingerprints.return_value = {1: content_fingerprint("Alérgenos: gluten")}
+        service = _chat_service(
+            test_settings,
+            mock_ollama_service,
+            chat_repo,
+            answer_result,
+            answer_cache=SemanticAnswerCache(test_settings),
+            chunk_repo=chunk_repo,
+        )
+
+        first = await service.process_query(ChatRequest("Tiene gluten?", 1, 3))
+        second = await service.process_query(ChatRequest("Tiene gluten?", 1, 3))
+
+        assert second.answer == first.answer
+        assert second.sources[0].chunk_id == 1
+        mock_ollama_service.chat.assert_awaited_once()
+        assert chat_repo.add_trace.call_count == 2
+        fresh, cached = (c.kwargs["meta_data"] for c in chat_repo.add_trace.call_args_list)
+        assert "cache_hit" not in fresh
+        assert cached["cache_hit"] is True
+        assert cached["cached_from_trace_id"] == first.trace_id
+
+    async def test_changed_chunk_invalidates_cached_answer(
+        self,
+        test_settings: Settings,
+        mock_ollama_service: OllamaService,
+        chat_repo: MagicMock,
+        answer_result: RetrievalResult,
+    ):
+        """Should regenerate when a cited chunk's content changed."""
+        chunk_repo = MagicMock(spec=AsyncChunkRepository)
+        chunk_repo.get_fingerprints.return_value = {1: content_fingerprint("Sin gluten")}
+        service = _chat_service(
+            test_settings,
+            mock_ollama_service,
+            chat_repo,
+            answer_result,
+            answer_cache=SemanticAnswerCache(test_settings),
+            chunk_repo=chunk_repo,
+        )
+
+        await service.process_query(ChatRequest("Tiene gluten?", 1, 3))
+        await service.process_query(ChatRequest("Tiene gluten?", 1, 3))
+
+        assert mock_ollama_service.chat.await_count == 2
+
+
+class TestChatServiceSingleFlight:
+    """Tests for coalescing identical concurrent chat requests."""
+
+    async def test_identical_requests_share_generation(
+        self,
+        test_settings: Settings,
+        mock_ollama_service: OllamaService,
+        chat_repo: MagicMock,
+        answer_result: RetrievalResult,
+    ):
+        """Should call the LLM once but write one turn and trace per caller."""
+        release = asyncio.Event()
+
+        async def slow_chat(system_prompt: str, user_prompt: str, **kwargs) -> str:
+            await release.wait()
+            return "Contiene gluten."
+
+        mock_ollama_service.chat = AsyncMock(side_effect=slow_chat)
+        service = _chat_service(
+            test_settings,
+            mock_ollama_service,
+            chat_repo,
+            answer_result,
+            single_flight=SingleFlight(),
+        )
+
+        tasks = [
+            asyncio.create_task(service.process_query(ChatRequest("Tiene gluten?", 1, 3)))
+            for _ in range(3)
+        ]
+        await asyncio.sleep(0.01)
+        release.set()
+        results = await asyncio.gather(*tasks)
+
+        assert all(r.answer == "Contiene gluten." for r in results)
+        mock_ollama_service.chat.assert_awaited_once()
+        assert chat_repo.allocate_ids.call_count == 3
+        assert chat_repo.add_turn.call_count == 3
+        assert chat_repo.add_trace.call_count == 3
+
+    async def test_database_work_stays_per_request(
+        self,
+        test_settings: Settings,
+        mock_ollama_service: OllamaService,
+        chat_repo: MagicMock,
+        answer_result: RetrievalResult,
+    ):
+        """Should retrieve on each caller's session and survive the leader's cancellation."""
+        release = asyncio.Event()
+
+        async def slow_chat(system_prompt: str, user_prompt: str, **kwargs) -> str:
+            await release.wait()
+            return "Contiene gluten."
+
+        mock_ollama_service.chat = AsyncMock(side_effect=slow_chat)
+        service = _chat_service(
+            test_settings,
+            mock_ollama_service,
+            chat_repo,
+            answer_result,
+            single_flight=SingleFlight(),
+        )
+
+        tasks = [
+            asyncio.create_task(service.process_query(ChatRequest("Tiene gluten?", 1, 3)))
+            for _ in range(3)
+        ]
+        await asyncio.sleep(0.01)
+        tasks[0].cancel()
+        release.set()
+        results = await asyncio.gather(*tasks[1:])
+
+        assert all(r.answer == "Contiene gluten." for r in results)
+        assert service._retrieval.search.await_count == 3
+        mock_ollama_service.chat.assert_awaited_once()
+
+
+class TestChatServicePersistence:
+    """Tests for id reservation and write-behind persistence."""
+
+    async def test_reserves_ids_while_embedding(
+        self,
+        test_settings: Settings,
+        mock_ollama_service: OllamaService,
+        chat_repo: MagicMock,
+        answer_result: RetrievalResult,
+    ):
+        """Should reserve ids concurrently with the embedding call."""
+        reserved = asyncio.Event()
+
+        def allocate_ids() -> tuple[int, int]:
+            reserved.set()
+            return 10, 99
+
+        async def embed(text: str, **kwargs) -> list[float]:
+            await asyncio.wait_for(reserved.wait(), 1)
+            return [0.1] * 768
+
+        chat_repo.allocate_ids.side_effect = allocate_ids
+        mock_ollama_service.generate_embedding = AsyncMock(side_effect=embed)
+        service = _chat_service(test_settings, mock_ollama_service, chat_repo, answer_result)
+
+        result = await service.process_query(ChatRequest("Tiene gluten?", None, 3))
+
+        assert result.trace_id == 99
+        chat_repo.add_trace.assert_called_once()
+        assert chat_repo.add_trace.call_args.args[:2] == (99, 10)
+
+    async def test_hands_records_to_trace_writer(
+        self,
+        test_settings: Settings,
+        mock_ollama_service: OllamaService,
+        chat_repo: MagicMock,
+        answer_result: RetrievalResult,
+    ):
+        """Should queue the turn and trace instead of writing them inline."""
+        writer = MagicMock(spec=TraceWriter)
+        service = _chat_service(
+            test_settings,
+            mock_ollama_service,
+            chat_repo,
+            answer_result,
+            trace_writer=writer,
+        )
+
+        result = await service.process_query(ChatRequest("Tiene gluten?", 1, 3))
+
+        record = writer.submit.call_args.args[0]
+        assert (record.turn_id, record.trace_id) == (10, 99)
+        assert record.bot_text == result.answer
+        assert record.used_chunk_ids == [1]
+        chat_repo.add_turn.assert_not_called()
+        chat_repo.commit.assert_not_called()
+
+    async def test_traces_only_the_evidence_in_the_prompt(
+        self,
+        test_settings: Settings,
+        mock_ollama_service: OllamaService,
+        chat_repo: MagicMock,
+    ):
+        """Should record packed chunks as used and the packer's drops separately."""
+        result = RetrievalResult(
+            hits=[
+                SearchHit(chunk_id=1, content="Alérgenos: gluten", score=0.9),
+                SearchHit(chunk_id=2, content="Alérgenos: gluten", score=0.8),
+                SearchHit(chunk_id=3, content="Sin lácteos", score=0.7),
+            ],
+            confidence=0.9,
+            decision=DecisionType.ANSWER,
+        )
+        writer = MagicMock(spec=TraceWriter)
+        service = _chat_service(
+            test_settings, mock_ollama_service, chat_repo, result, trace_writer=writer
+        )
+
+        await service.process_query(ChatRequest("Tiene gluten?", None, 3))
+
+        record = writer.submit.call_args.args[0]
+        assert record.used_chunk_ids == [1, 3]
+        assert record.scores == [0.9, 0.7]
+        assert record.meta_data["dropped_chunk_ids"] == [2]
+
+
+class TestChatServiceFacts:
+    """Tests for the LLM-free fact answer path."""
+
+    async def test_fact_answer_skips_embedding_and_llm(
+        self,
+        test_settings: Settings,
+        mock_ollama_service: OllamaService,
+        chat_repo: MagicMock,
+        answer_result: RetrievalResult,
+    ):
+        """Should answer from facts and write a trace tagged with the fact path."""
+        fact_service = MagicMock(spec=FactService)
+        fact_service.answer.return_value = FactAnswer(
+            answer="Según la ficha técnica, «Milanesa» contiene gluten.",
+            dish_id=3,
+            subject="gluten",
+            fact_ids=[7],
+        )
+        service = _chat_service(
+            test_settings,
+            mock_ollama_service,
+            chat_repo,
+            answer_result,
+            fact_service=fact_service,
+        )
+
+        result = await service.process_query(ChatRequest("La milanesa tiene gluten?", None, 3))
+
+        assert result.answer.endswith("contiene gluten.")
+        assert result.trace_id == 99
+        assert result.sources == []
+        mock_ollama_service.generate_embedding.assert_not_awaited()
+        mock_ollama_service.chat.assert_not_awaited()
+        meta = chat_repo.add_trace.call_args.kwargs["meta_data"]
+        assert meta == {"path": "fact", "dish_id": 3, "subject": "gluten", "fact_ids": [7]}
+
+
+class TestChatServiceEfSearch:
+    """Tests for the per-request HNSW ef_search passed to retrieval."""
+
+    @pytest.mark.parametrize(
+        "question, ef_search, expected",
+        [
+            ("Tiene gluten?", None, "hnsw_ef_search_allergy"),
+            ("Qué me recomendás?", None, "hnsw_ef_search"),
+            ("Tiene gluten?", 300, None),
+        ],
+    )
+    async def test_chooses_ef_search(
+        self,
+        test_settings: Settings,
+        mock_ollama_service: OllamaService,
+        chat_repo: MagicMock,
+        answer_result: RetrievalResult,
+        question: str,
+        ef_search: int | None,
+        expected: str | None,
+    ):
+        """Should use the request's ef_search, else the allergy or casual default."""
+        service = _chat_service(test_settings, mock_ollama_service, chat_repo, answer_result)
+
+        await service.process_query(ChatRequest(question, 1, 3, ef_search=ef_search))
+
+        wanted = ef_search if expected is None else getattr(test_settings, expected)
+        assert service._retrieval.search.call_args.kwargs["ef_search"] == wanted
+
+
+class TestChatServiceRetrieval:
+    """Tests for the retrieval service the chat dependency builds."""
+
+    async def test_searches_the_in_process_vector_index(
+        self,
+        test_settings: Settings,
+        mock_ollama_service: OllamaService,
+        chat_repo: MagicMock,
+    ):
+        """Should retrieve from the loaded NumPy index instead of pgvector."""
+        embedding_repo = MagicMock(spec=AsyncEmbeddingRepository)
+        index = MagicMock(spec=NumpyVectorIndex)
+        index.ready = True
+        index.search.return_value = [SearchHit(chunk_id=7, content="Sin gluten", score=0.9)]
+        service = ChatService(
+            ollama_service=mock_ollama_service,
+            text_service=TextService(test_settings),
+            prompt_service=PromptService(),
+            retrieval_service=get_retrieval_service(
+                embedding_repo, test_settings, index, None, DishScopeCache(test_settings)
+            ),
+            chat_repo=chat_repo,
+            embedding_repo=embedding_repo,
+            settings=test_settings,
+        )
+
+        result = await service.process_query(ChatRequest("Tiene gluten?", None, 3))
+
+        index.search.assert_called_once()
+        embedding_repo.search_similar.assert_not_called()
+        assert [s.chunk_id for s in result.sources] == [7]
+        assert chat_repo.add_trace.call_args.kwargs["meta_data"]["search_path"] == "numpy"
+
+    async def test_reranks_the_retrieved_candidates(
+        self,
+        test_settings: Settings,
+        mock_ollama_service: OllamaService,
+        chat_repo: MagicMock,
+    ):
+        """Should over-fetch, re-rank down to top_k and trace the re-ranking."""
+        test_settings.rerank_fetch_factor = 3
+        # Relevance only, so a duplicate survives re-ranking and reaches the packer
+        test_settings.rerank_mmr_lambda = 1.0
+        embedding_repo = MagicMock(spec=AsyncEmbeddingRepository)
+        embedding_repo.search_similar.return_value = [
+            SearchHit(1, "Milanesa con papas fritas y ensalada", 0.82, 10, 0),
+            SearchHit(2, "Alérgenos: puede contener trazas de maní", 0.78, 10, 1),
+            SearchHit(3, "Postre de la casa con frutas", 0.60, 11, 0),
+            SearchHit(4, "Alérgenos: puede contener trazas de maní", 0.77, 12, 0),
+        ]
+        text_service = TextService(test_settings)
+        retrieval = get_retrieval_service(
+            embedding_repo,
+            test_settings,
+            None,
+            Reranker(text_service, test_settings),
+            DishScopeCache(test_settings),
+        )
+        service = ChatService(
+            ollama_service=mock_ollama_service,
+            text_service=text_service,
+            prompt_service=PromptService(),
+            retrieval_service=retrieval,
+            chat_repo=chat_repo,
+            embedding_repo=embedding_repo,
+            settings=test_settings,
+        )
+
+        result = await service.process_query(ChatRequest("¿La milanesa tiene maní?", None, 2))
+
+        assert embedding_repo.search_similar.call_args.kwargs["top_k"] == 6
+        assert [s.chunk_id for s in result.sources] == [2, 4]
+        trace = chat_repo.add_trace.call_args.kwargs
+        meta = trace["meta_data"]
+        assert meta["rerank_candidates"] == 4
+        # The duplicate hit is dropped by the packer, and from the scores with it
+        assert trace["used_chunk_ids"] == [2]
+        assert meta["dropped_chunk_ids"] == [4]
+        assert len(meta["rerank_scores"]) == len(trace["scores"]) == 1
@@ -0,0 +1,81 @@
+"""Tests for connection pool and statement instrumentation."""
+
+import pytest
+from sqlalchemy import create_engine, exc, text
+from sqlalchemy.pool import QueuePool
+
+from src.models.instrumentation import DbMetrics
+
+
+def make_engine(metrics: DbMetrics, pool_size: int = 1, max_overflow: int = 1):
+    engine = create_engine(
+        "sqlite://",
+        poolclass=metrics.instrument_pool(QueuePool),
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=0.05,
+    )
+    metrics.attach(engine)
+    return engine
+
+
+class TestDbMetrics:
+    """Tests for DbMetrics."""
+
+    def test_counts_checkouts_and_statements(self):
+        """Should count checkouts, connects and executed statements."""
+        metrics = DbMetrics("test")
+        engine = make_engine(metrics)
+
+        for _ in range(3):
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+
+        stats = metrics.stats()
+        assert stats["checkouts"] == 3
+        assert stats["connects"] == 1
+        assert stats["statements"] == 3
+        assert stats["checked_out"] == 0
+        assert stats["pool_size"] == 1
+
+    def test_reports_overflow(self):
+        """Should record connections opened beyond the pool size."""
+        metrics = DbMetrics("test")
+        engine = make_engine(metrics)
+
+        first = engine.connect()
+        second = engine.connect()
+        stats = metrics.stats()
+        first.close()
+        second.close()
+
+        assert stats["checked_out"] == 2
+        assert stats["overflow"] == 1
+        assert metrics.overflow_events == 1
+
+    def test_counts_pool_timeouts(self):
+        """Should count checkouts that time out waiting for a connection."""
+        metrics = DbMetrics("test")
+        engine = make_engine(metrics, max_overflow=0)
+
+        held = engine.connect()
+        with pytest.raises(exc.TimeoutError):
+            engine.connect()
+        held.close()
+
+        stats = metrics.stats()
+        assert stats["timeouts"] == 1
+        assert stats["wait_max_ms"] >= 50
+
+    def test_failed_statement_leaves_no_timing_behind(self):
+        """Should discard the start time of a statement that raises."""
+        metrics = DbMetrics("test")
+        engine = make_engine(metrics)
+
+        with engine.connect() as conn:
+            with pytest.raises(exc.OperationalError):
+                conn.execute(text("SELECT * FROM missing_table"))
+            conn.execute(text("SELECT 1"))
+
+            assert conn.info["query_started"] == []
+        assert metrics.stats()["statements"] == 1
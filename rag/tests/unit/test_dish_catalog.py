@@ -0,0 +1,130 @@
+"""Tests for the dish catalog snapshot."""
+
+import json
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.api.routers.dishes import _etag_matches
+from src.config import Settings
+from src.services import dish_catalog as dish_catalog_module
+from src.services.dish_catalog import CatalogSnapshot, DishCatalog
+
+
+DISHES = [
+    SimpleNamespace(id=1, name="Milanesa", category="Principal", price_cents=9500, tags=None),
+    SimpleNamespace(id=2, name="Flan", category="Postre", price_cents=4000, tags=["casero"]),
+]
+
+
+class _Session:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+@pytest.fixture
+def repo(monkeypatch) -> MagicMock:
+    """Dish repository mock used by the catalog."""
+    repo = MagicMock()
+    repo.catalog_version = AsyncMock(return_value="v1")
+    repo.get_all_active = AsyncMock(return_value=DISHES)
+    monkeypatch.setattr(dish_catalog_module, "AsyncDishRepository", lambda session: repo)
+    return repo
+
+
+@pytest.fixture
+def catalog(repo: MagicMock) -> DishCatalog:
+    """Catalog without a background refresh task."""
+    return DishCatalog(_Session, Settings(dish_catalog_refresh_interval=0))
+
+
+class TestCatalogSnapshot:
+    """Tests for rendering catalog views."""
+
+    def test_filters_category_and_fields(self):
+        """Should keep only the requested category (case-insensitive) and fields."""
+        snapshot = CatalogSnapshot(
+            version="v1",
+            dishes=[
+                {"id": 1, "name": "Milanesa", "category": "Principal"},
+                {"id": 2, "name": "Flan", "category": "Postre"},
+            ],
+        )
+
+        body = snapshot.render("postre", ("id", "name"))
+
+        assert json.loads(body) == [{"id": 2, "name": "Flan"}]
+        assert snapshot.render("POSTRE", ("id", "name")) is body
+
+    def test_unknown_categories_are_not_cached(self):
+        """Should render an empty list for a category no dish has, without storing it."""
+        snapshot = CatalogSnapshot(
+            version="v1", dishes=[{"id": 1, "name": "Flan", "category": "Postre"}]
+        )
+
+        bodies = [snapshot.render(f"categoria-{n}", ("id",)) for n in range(100)]
+
+        assert all(json.loads(body) == [] for body in bodies)
+        assert snapshot._views == {}
+
+    def test_views_have_distinct_etags(self):
+        """Should qualify the version's ETag with the view's category and fields."""
+        snapshot = CatalogSnapshot(version="v1", dishes=[])
+
+        etags = {
+            snapshot.etag(),
+            snapshot.etag("postre"),
+            snapshot.etag(None, ("id", "name")),
+            snapshot.etag("postre", ("id", "name")),
+        }
+
+        assert snapshot.etag() == '"v1"'
+        assert len(etags) == 4
+        assert all(etag.startswith('"v1') for etag in etags)
+        assert snapshot.etag("POSTRE", ("id",)) == snapshot.etag("postre", ("id",))
+
+    def test_etag_matching(self):
+        """Should match listed, weak and wildcard entity tags."""
+        assert _etag_matches('"a", W/"v1"', '"v1"')
+        assert _etag_matches("*", '"v1"')
+        assert not _etag_matches('"v0"', '"v1"')
+        assert not _etag_matches(None, '"v1"')
+
+
+class TestDishCatalog:
+    """Tests for loading and refreshing the catalog."""
+
+    async def test_loads_once_and_serves_from_memory(self, catalog: DishCatalog, repo: MagicMock):
+        """Should query Postgres only for the first request."""
+        first = await catalog.get()
+        second = await catalog.get()
+
+        assert first is second
+        assert first.etag() == '"v1"'
+        assert json.loads(first.render())[0]["tags"] == []
+        repo.get_all_active.assert_awaited_once()
+
+    async def test_refresh_reloads_only_on_version_change(
+        self, catalog: DishCatalog, repo: MagicMock
+    ):
+        """Should compare versions and reload the dishes only when they differ."""
+        await catalog.get()
+
+        assert await catalog.refresh() is False
+        repo.catalog_version.return_value = "v2"
+        assert await catalog.refresh() is True
+
+        assert (await catalog.get()).version == "v2"
+        assert repo.get_all_active.await_count == 2
+
+    async def test_invalidate_reloads_on_next_request(self, catalog: DishCatalog, repo: MagicMock):
+        """Should rebuild the snapshot after an in-process invalidation."""
+        await catalog.get()
+        catalog.invalidate()
+        await catalog.get()
+
+        assert repo.get_all_active.await_count == 2
@@ -0,0 +1,85 @@
+"""Tests for EvidencePacker."""
+
+from src.config import Settings
+from src.repositories.embedding_repository import SearchHit
+from src.services import EvidencePacker, TextService
+
+
+FICHA = (
+    "FICHA TÉCNICA (fuente de verdad)\n"
+    "Plato: Risotto de hongos + parmesano\n"
+    "Ingredientes principales: arroz, hongos, caldo, manteca, parmesano\n"
+    "Alérgenos (contiene): lácteos\n"
+    "Alérgenos (puede contener / trazas): gluten (según caldo/rallados)\n"
+    "Sin TACC / gluten: No confirmado\n"
+)
+
+
+def _chunks(settings: Settings) -> list[str]:
+    settings.chunk_size = 90
+    settings.chunk_overlap = 30
+    return TextService(settings).chunk(FICHA)
+
+
+class TestEvidencePacker:
+    """Tests for merging, de-duplicating and budgeting evidence."""
+
+    def test_merges_adjacent_chunks_without_repeating_overlap(self, test_settings: Settings):
+        """Should rebuild one contiguous span citing every merged chunk."""
+        chunks = _chunks(test_settings)
+        hits = [
+            SearchHit(chunk_id=10 + i, content=c, score=0.5 + i / 100, dish_id=4, chunk_index=i)
+            for i, c in enumerate(chunks, start=1)
+        ]
+
+        spans = EvidencePacker(test_settings).pack(hits)
+
+        assert len(spans) == 1
+        assert spans[0].chunk_ids == [h.chunk_id for h in hits]
+        assert spans[0].content == TextService(test_settings).normalize(FICHA)
+        assert spans[0].score == max(h.score for h in hits)
+
+    def test_keeps_gaps_and_dishes_apart(self, test_settings: Settings):
+        """Should not merge non-adjacent chunks or chunks of different dishes."""
+        hits = [
+            SearchHit(chunk_id=1, content="uno", score=0.9, dish_id=1, chunk_index=1),
+            SearchHit(chunk_id=3, content="tres", score=0.8, dish_id=1, chunk_index=3),
+            SearchHit(chunk_id=7, content="dos", score=0.7, dish_id=2, chunk_index=2),
+        ]
+
+        spans = EvidencePacker(test_settings).pack(hits)
+
+        assert [s.chunk_ids for s in spans] == [[1], [3], [7]]
+
+    def test_drops_duplicate_text(self, test_settings: Settings):
+        """Should keep only the first hit with a given text."""
+        hits = [
+            SearchHit(chunk_id=1, content="Alérgenos: lácteos", score=0.9),
+            SearchHit(chunk_id=2, content="Alérgenos: lácteos", score=0.8),
+        ]
+
+        spans = EvidencePacker(test_settings).pack(hits)
+
+        assert [s.chunk_ids for s in spans] == [[1]]
+
+    def test_fits_token_budget_by_score(self, test_settings: Settings):
+        """Should add spans best score first and skip those over budget."""
+        test_settings.evidence_token_budget = 10
+        hits = [
+            SearchHit(chunk_id=1, content="a" * 24, score=0.6),
+            SearchHit(chunk_id=2, content="b" * 32, score=0.9),
+            SearchHit(chunk_id=3, content="c" * 8, score=0.5),
+        ]
+
+        spans = EvidencePacker(test_settings).pack(hits)
+
+        assert [s.chunk_ids for s in spans] == [[2], [3]]
+
+    def test_truncates_single_oversized_span(self, test_settings: Settings):
+        """Should keep the head of the best span when it alone exceeds the budget."""
+        test_settings.evidence_token_budget = 5
+        hits = [SearchHit(chunk_id=1, content="x" * 100, score=0.9)]
+
+        spans = EvidencePacker(test_settings).pack(hits)
+
+        assert spans[0].content == "x" * 20
@@ -0,0 +1,109 @@
+"""Tests for FactService."""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from data.seed_dishes import build_seed_dishes
+from src.models.entities import Dish, DishFact
+from src.repositories import AsyncDishFactRepository, AsyncDishRepository
+from src.services import FactService, TextService
+from src.services.fact_service import build_dish_facts
+
+
+def _seed_dish(name_prefix: str) -> dict:
+    return next(d for d in build_seed_dishes() if d["name"].startswith(name_prefix))
+
+
+@pytest.fixture
+def dishes() -> list[Dish]:
+    """Seed dishes with ids."""
+    return [
+        Dish(id=i, name=d["name"], category=d["category"], price_cents=d["price_cents"])
+        for i, d in enumerate(build_seed_dishes(), start=1)
+    ]
+
+
+@pytest.fixture
+def fact_service(text_service: TextService, dishes: list[Dish]) -> FactService:
+    """Fact service over in-memory facts built from the seed data."""
+    fact_repo = MagicMock(spec=AsyncDishFactRepository)
+    dish_repo = MagicMock(spec=AsyncDishRepository)
+    dish_repo.get_all_active.return_value = dishes
+    service = FactService(fact_repo, dish_repo, text_service)
+
+    facts: list[DishFact] = []
+    for dish, data in zip(dishes, build_seed_dishes()):
+        for fact in build_dish_facts(text_service, dish.id, data["facts"]):
+            fact.id = len(facts) + 1
+            fact.dish = dish
+            facts.append(fact)
+
+    fact_repo.find.side_effect = lambda dish_id, subjects: [
+        f for f in facts if f.dish_id == dish_id and f.subject in subjects
+    ]
+    return service
+
+
+class TestFactServiceBuild:
+    """Tests for turning seed fields into fact rows."""
+
+    def test_classifies_allergens_by_head(self, text_service: TextService):
+        """Should key allergens by canonical subject, ignoring the note in parentheses."""
+        facts = build_dish_facts(text_service, 1, _seed_dish("Burrata")["facts"])
+        by_subject = {(f.subject, f.status) for f in facts}
+
+        assert ("frutos_secos", "contains") in by_subject
+        assert ("mani", "contains") in by_subject
+        assert ("gluten", "may_contain") in by_subject
+        assert ("sin_tacc", "unconfirmed") in by_subject
+        assert ("vegetariano", "yes") in by_subject
+        assert ("vegano", "no") in by_subject
+
+
+class TestFactServiceAnswer:
+    """Tests for answering closed-form questions from facts."""
+
+    async def test_contains(self, fact_service: FactService):
+        """Should state a declared allergen with the ficha's wording."""
+        result = await fact_service.answer("¿La milanesa tiene gluten?", None)
+
+        assert result is not None
+        assert result.dish_id == 3
+        assert "contiene gluten" in result.answer
+
+    async def test_may_contain(self, fact_service: FactService):
+        """Should warn about traces when the allergen is only a possible contaminant."""
+        result = await fact_service.answer("Tiene gluten?", 1)
+
+        assert result is not None
+        assert "puede contener gluten (trazas por manipulación)" in result.answer
+
+    async def test_gluten_uses_sin_tacc_line(self, fact_service: FactService):
+        """Should fall back to the Sin TACC line when gluten is not listed."""
+        result = await fact_service.answer("Es apto para celíacos la trucha?", None)
+
+        assert result is not None
+        assert result.subject == "sin_tacc"
+        assert "es sin TACC" in result.answer
+
+    async def test_diet(self, fact_service: FactService):
+        """Should answer vegan/vegetarian questions from the diet facts."""
+        result = await fact_service.answer("El risotto es vegetariano?", None)
+
+        assert result is not None
+        assert "es apto vegetariano" in result.answer
+
+    @pytest.mark.parametrize(
+        "question,dish_id",
+        [
+            ("¿Qué platos no tienen gluten?", None),
+            ("¿Tiene gluten y lácteos?", 1),
+            ("¿Tiene gluten?", None),
+            ("¿La trucha tiene maní?", None),
+            ("Contame del risotto", None),
+        ],
+    )
+    async def test_falls_back(self, fact_service: FactService, question: str, dish_id: int | None):
+        """Should leave open, multi-subject, dish-less and undeclared cases to the LLM."""
+        assert await fact_service.answer(question, dish_id) is None
@@ -0,0 +1,95 @@
+"""Tests for HealthMonitor."""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.config import Settings
+from src.services import OllamaService
+from src.services import health_monitor as health_monitor_module
+from src.services.health_monitor import HealthMonitor
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class _Session:
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+@pytest.fixture
+def maintenance(monkeypatch) -> MagicMock:
+    """Maintenance repository mock with estimates for every table but dish."""
+    repo = MagicMock()
+    repo.ping = AsyncMock(return_value=True)
+    repo.table_estimates = AsyncMock(return_value={"kb_chunk": 120, "kb_embedding": 118})
+    repo.exact_count = AsyncMock(return_value=10)
+    monkeypatch.setattr(health_monitor_module, "AsyncMaintenanceRepository", lambda s: repo)
+    embedding_repo = MagicMock()
+    embedding_repo.index_ready = AsyncMock(return_value=True)
+    monkeypatch.setattr(
+        health_monitor_module, "AsyncEmbeddingRepository", lambda s: embedding_repo
+    )
+    return repo
+
+
+@pytest.fixture
+def ollama() -> MagicMock:
+    """Reachable Ollama service mock."""
+    ollama = MagicMock(spec=OllamaService)
+    ollama.is_reachable.return_value = True
+    return ollama
+
+
+class TestHealthMonitor:
+    """Tests for cached dependency checks and table stats."""
+
+    async def test_checks_are_rate_limited(self, maintenance: MagicMock, ollama: MagicMock):
+        """Should reuse a check until health_check_ttl has passed."""
+        clock = FakeClock()
+        monitor = HealthMonitor(ollama, _Session, Settings(health_check_ttl=5), clock=clock)
+
+        first = await monitor.check()
+        clock.now = 4.0
+        assert await monitor.check() is first
+        clock.now = 5.0
+        await monitor.check()
+
+        assert first.database and first.ollama
+        assert maintenance.ping.await_count == 2
+        assert ollama.is_reachable.await_count == 2
+
+    async def test_stats_use_estimates_and_count_unanalyzed_tables(
+        self, maintenance: MagicMock, ollama: MagicMock
+    ):
+        """Should read planner estimates and count exactly only never-analyzed tables."""
+        monitor = HealthMonitor(ollama, _Session, Settings())
+
+        stats = await monitor.table_stats()
+
+        assert (stats.dishes, stats.chunks, stats.embeddings) == (10, 120, 118)
+        assert stats.estimated is True and stats.vector_index is True
+        maintenance.exact_count.assert_awaited_once_with("dish")
+
+    async def test_stats_are_cached(self, maintenance: MagicMock, ollama: MagicMock):
+        """Should collect stats once per health_stats_ttl."""
+        clock = FakeClock()
+        monitor = HealthMonitor(ollama, _Session, Settings(health_stats_ttl=60), clock=clock)
+
+        await monitor.table_stats()
+        clock.now = 30.0
+        await monitor.table_stats()
+
+        assert monitor.stats_refreshes == 1
+        maintenance.table_estimates.assert_awaited_once()
@@ -0,0 +1,161 @@
+"""Tests for IndexingService."""
+
+import asyncio
+import time
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.config import Settings
+from src.core.exceptions import OllamaError
+from src.repositories import ChunkRepository, EmbeddingRepository
+from src.services import IndexingService
+
+
+def _paged_repo(chunks: list[tuple[int, str]]) -> MagicMock:
+    """Chunk repository mock that serves keyset pages from a list."""
+    repo = MagicMock(spec=ChunkRepository)
+
+    def get_page(after_id: int, limit: int) -> list[tuple[int, str]]:
+        return [c for c in chunks if c[0] > after_id][:limit]
+
+    repo.get_unindexed_page.side_effect = get_page
+    return repo
+
+
+class TestIndexingService:
+    """Tests for the batched indexing pipeline."""
+
+    @pytest.fixture
+    def settings(self, test_settings: Settings) -> Settings:
+        test_settings.index_page_size = 5
+        test_settings.index_batch_size = 2
+        test_settings.index_max_concurrency = 2
+        test_settings.index_commit_every = 4
+        return test_settings
+
+    async def test_embeds_all_chunks_in_batches(self, settings: Settings):
+        """Should embed every chunk using multi-input batches."""
+        chunks = [(i, f"chunk {i}") for i in range(1, 12)]
+        chunk_repo = _paged_repo(chunks)
+        embedding_repo = MagicMock(spec=EmbeddingRepository)
+        embedding_repo.create_many.side_effect = lambda rows: len(rows)
+        ollama = MagicMock()
+        ollama.generate_embeddings = AsyncMock(side_effect=lambda texts: [[0.0]] * len(texts))
+
+        service = IndexingService(chunk_repo, embedding_repo, ollama, settings)
+        result = await service.index_pending()
+
+        assert result.embeddings_created == 11
+        assert all(len(c.args[0]) <= 2 for c in ollama.generate_embeddings.call_args_list)
+        inserted = [row[0] for c in embedding_repo.create_many.call_args_list for row in c.args[0]]
+        assert sorted(inserted) == list(range(1, 12))
+        assert embedding_repo.commit.called
+
+    async def test_commits_partial_progress_on_failure(self, settings: Settings):
+        """Should keep successful batches when a later batch fails."""
+        chunks = [(i, f"chunk {i}") for i in range(1, 8)]
+        chunk_repo = _paged_repo(chunks)
+        embedding_repo = MagicMock(spec=EmbeddingRepository)
+        embedding_repo.create_many.side_effect = lambda rows: len(rows)
+
+        async def embed(texts: list[str]) -> list[list[float]]:
+            if "chunk 7" in texts:
+                raise OllamaError(message="down")
+            return [[0.0]] * len(texts)
+
+        ollama = MagicMock()
+        ollama.generate_embeddings = AsyncMock(side_effect=embed)
+
+        service = IndexingService(chunk_repo, embedding_repo, ollama, settings)
+        with pytest.raises(OllamaError):
+            await service.index_pending()
+
+        inserted = [row[0] for c in embedding_repo.create_many.call_args_list for row in c.args[0]]
+        assert sorted(inserted) == [1, 2, 3, 4, 5]
+        embedding_repo.commit.assert_called()
+
+    async def test_keeps_batches_in_flight_across_pages(self, settings: Settings):
+        """Should read the next page while an earlier page's batch is still embedding."""
+        chunks = [(i, f"chunk {i}") for i in range(1, 8)]
+        chunk_repo = _paged_repo(chunks)
+        next_page_read = asyncio.Event()
+        get_page = chunk_repo.get_unindexed_page.side_effect
+
+        def track_pages(after_id: int, limit: int) -> list[tuple[int, str]]:
+            if after_id >= 5:
+                next_page_read.set()
+            return get_page(after_id, limit)
+
+        chunk_repo.get_unindexed_page.side_effect = track_pages
+        embedding_repo = MagicMock(spec=EmbeddingRepository)
+        embedding_repo.create_many.side_effect = lambda rows: len(rows)
+
+        async def embed(texts: list[str]) -> list[list[float]]:
+            if "chunk 5" in texts:
+                # The last batch of page 1 only finishes once page 2 has been read
+                await next_page_read.wait()
+            return [[0.0]] * len(texts)
+
+        ollama = MagicMock()
+        ollama.generate_embeddings = AsyncMock(side_effect=embed)
+
+        service = IndexingService(chunk_repo, embedding_repo, ollama, settings)
+        result = await asyncio.wait_for(service.index_pending(), timeout=2)
+
+        assert result.embeddings_created == 7
+
+    async def test_reports_rows_actually_inserted(self, settings: Settings):
+        """Should count only the rows the repository inserted."""
+        chunk_repo = _paged_repo([(i, f"chunk {i}") for i in range(1, 5)])
+        embedding_repo = MagicMock(spec=EmbeddingRepository)
+        embedding_repo.create_many.side_effect = lambda rows: len(rows) - 1
+        ollama = MagicMock()
+        ollama.generate_embeddings = AsyncMock(side_effect=lambda texts: [[0.0]] * len(texts))
+
+        service = IndexingService(chunk_repo, embedding_repo, ollama, settings)
+        result = await service.index_pending()
+
+        assert result.embeddings_created == 2
+
+    async def test_database_error_rolls_back(self, settings: Settings):
+        """Should roll back instead of committing after a failed insert."""
+        chunk_repo = _paged_repo([(i, f"chunk {i}") for i in range(1, 5)])
+        embedding_repo = MagicMock(spec=EmbeddingRepository)
+        embedding_repo.create_many.side_effect = RuntimeError("insert failed")
+        ollama = MagicMock()
+        ollama.generate_embeddings = AsyncMock(side_effect=lambda texts: [[0.0]] * len(texts))
+
+        service = IndexingService(chunk_repo, embedding_repo, ollama, settings)
+        with pytest.raises(RuntimeError, match="insert failed"):
+            await service.index_pending()
+
+        embedding_repo.rollback.assert_called_once()
+        embedding_repo.commit.assert_not_called()
+
+    async def test_database_work_does_not_block_the_event_loop(self, settings: Settings):
+        """Should run the synchronous repository calls in a worker thread."""
+        chunk_repo = _paged_repo([(i, f"chunk {i}") for i in range(1, 5)])
+        embedding_repo = MagicMock(spec=EmbeddingRepository)
+
+        def slow_insert(rows: list) -> int:
+            time.sleep(0.05)
+            return len(rows)
+
+        embedding_repo.create_many.side_effect = slow_insert
+        ollama = MagicMock()
+        ollama.generate_embeddings = AsyncMock(side_effect=lambda texts: [[0.0]] * len(texts))
+        ticks = 0
+
+        async def ticker() -> None:
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.005)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        service = IndexingService(chunk_repo, embedding_repo, ollama, settings)
+        await service.index_pending()
+        task.cancel()
+
+        assert ticks >= 5
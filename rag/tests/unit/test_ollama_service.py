@@ -0,0 +1,298 @@
+"""Tests for OllamaService."""
+
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from src.config import Settings
+from src.core.exceptions import OllamaConnectionError, OllamaError, OllamaUnavailableError
+from src.core.resilience import CircuitState
+from src.services import OllamaService
+
+
+def _service(settings: Settings, handler) -> OllamaService:
+    """Build a service whose shared client is backed by a mock transport."""
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return OllamaService(settings, client=client)
+
+
+class TestOllamaServiceClient:
+    """Tests for the shared HTTP client."""
+
+    async def test_reuses_shared_client(self, test_settings: Settings):
+        """Should send every call through the same client instance."""
+        seen: list[str] = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            seen.append(request.url.path)
+            if request.url.path == "/api/embeddings":
+                return httpx.Response(200, json={"embedding": [0.1, 0.2]})
+            if request.url.path == "/api/chat":
+                return httpx.Response(200, json={"message": {"content": " hola "}})
+            return httpx.Response(200, json={"models": []})
+
+        service = _service(test_settings, handler)
+
+        assert await service.generate_embedding("hola") == [0.1, 0.2]
+        assert await service.chat("sys", "user") == "hola"
+        assert await service.is_reachable() is True
+        assert seen == ["/api/embeddings", "/api/chat", "/api/tags"]
+
+        await service.aclose()
+
+    async def test_preload_loads_both_models_with_keep_alive(self, test_settings: Settings):
+        """Should load the embed and chat models, passing keep_alive."""
+        bodies: dict[str, dict] = {}
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            bodies[request.url.path] = json.loads(request.content)
+            return httpx.Response(200, json={})
+
+        service = _service(test_settings, handler)
+
+        loaded = await service.preload()
+
+        assert all(loaded.values()) and len(loaded) == 2
+        assert bodies["/api/embed"]["model"] == test_settings.embed_model
+        assert bodies["/api/generate"] == {
+            "model": test_settings.chat_model,
+            "keep_alive": test_settings.ollama_keep_alive,
+        }
+
+    async def test_non_200_raises_ollama_error(self, test_settings: Settings):
+        """Should raise OllamaError on non-200 responses."""
+        service = _service(test_settings, lambda r: httpx.Response(500, text="boom"))
+
+        with pytest.raises(OllamaError):
+            await service.generate_embedding("hola")
+
+    async def test_connect_error_is_wrapped(self, test_settings: Settings):
+        """Should wrap connection failures in OllamaConnectionError."""
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            raise httpx.ConnectError("refused", request=request)
+
+        service = _service(test_settings, handler)
+
+        with pytest.raises(OllamaConnectionError):
+            await service.chat("sys", "user")
+        assert await service.is_reachable() is False
+
+
+class TestOllamaServiceChatStream:
+    """Tests for OllamaService.chat_stream method."""
+
+    async def test_yields_content_deltas(self, test_settings: Settings):
+        """Should yield each streamed content delta until done."""
+        lines = [
+            {"message": {"content": "Sí, "}, "done": False},
+            {"message": {"content": "contiene gluten."}, "done": False},
+            {"message": {"content": ""}, "done": True},
+        ]
+        body = "\n".join(json.dumps(line) for line in lines)
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            assert json.loads(request.content)["stream"] is True
+            return httpx.Response(200, text=body)
+
+        service = _service(test_settings, handler)
+
+        deltas = [d async for d in service.chat_stream("sys", "user")]
+
+        assert deltas == ["Sí, ", "contiene gluten."]
+
+    async def test_stream_error_line_raises(self, test_settings: Settings):
+        """Should raise OllamaError when the stream reports an error."""
+        service = _service(
+            test_settings, lambda r: httpx.Response(200, text='{"error": "model not found"}')
+        )
+
+        with pytest.raises(OllamaError):
+            [d async for d in service.chat_stream("sys", "user")]
+
+    async def test_dropped_stream_raises_ollama_error(self, test_settings: Settings):
+        """Should map a connection dropped mid-stream to OllamaConnectionError."""
+
+        class DroppedStream(httpx.AsyncByteStream):
+            async def __aiter__(self):
+                yield '{"message": {"content": "Sí, "}, "done": false}\n'.encode()
+                raise httpx.ReadError("connection reset")
+
+        service = _service(test_settings, lambda r: httpx.Response(200, stream=DroppedStream()))
+        deltas: list[str] = []
+
+        with pytest.raises(OllamaConnectionError):
+            async for delta in service.chat_stream("sys", "user"):
+                deltas.append(delta)
+        assert deltas == ["Sí, "]
+
+    async def test_invalid_stream_line_raises_ollama_error(self, test_settings: Settings):
+        """Should map an undecodable stream line to OllamaError."""
+        service = _service(test_settings, lambda r: httpx.Response(200, text='{"message": '))
+
+        with pytest.raises(OllamaError):
+            [d async for d in service.chat_stream("sys", "user")]
+
+
+class TestOllamaServiceResilience:
+    """Tests for retries, circuit breaking and hedging."""
+
+    @pytest.fixture
+    def settings(self, test_settings: Settings) -> Settings:
+        test_settings.ollama_retry_backoff_base = 0.0
+        test_settings.ollama_retry_backoff_max = 0.0
+        return test_settings
+
+    async def test_embedding_retried_on_server_error(self, settings: Settings):
+        """Should retry idempotent embedding calls on 5xx responses."""
+        statuses = iter([503, 200])
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            status = next(statuses)
+            return httpx.Response(status, json={"embedding": [0.5]})
+
+        service = _service(settings, handler)
+
+        assert await service.generate_embedding("hola") == [0.5]
+        assert service.retries == 1
+
+    async def test_chat_not_retried(self, settings: Settings):
+        """Should not retry non-idempotent generation calls."""
+        calls = 0
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            nonlocal calls
+            calls += 1
+            return httpx.Response(503, text="loading model")
+
+        service = _service(settings, handler)
+
+        with pytest.raises(OllamaError):
+            await service.chat("sys", "user")
+        assert calls == 1
+
+    async def test_open_circuit_fails_fast(self, settings: Settings):
+        """Should stop calling Ollama once the breaker opens."""
+        settings.ollama_breaker_failure_threshold = 2
+        settings.ollama_retry_attempts = 0
+        calls = 0
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            nonlocal calls
+            calls += 1
+            raise httpx.ConnectError("refused", request=request)
+
+        service = _service(settings, handler)
+
+        for _ in range(2):
+            with pytest.raises(OllamaConnectionError):
+                await service.generate_embedding("hola")
+
+        with pytest.raises(OllamaUnavailableError):
+            await service.chat("sys", "user")
+        assert calls == 2
+        assert service.circuit_state() == CircuitState.OPEN
+
+    async def test_hedged_request_returns_fastest(self, settings: Settings):
+        """Should send a duplicate after the hedge delay and use the first success."""
+        settings.ollama_hedge_enabled = True
+        settings.ollama_hedge_min_delay = 0.01
+        calls = 0
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            nonlocal calls
+            calls += 1
+            if calls == 1:
+                await asyncio.sleep(1)
+            return httpx.Response(200, json={"embedding": [float(calls)]})
+
+        service = _service(settings, handler)
+
+        assert await service.generate_embedding("hola") == [2.0]
+        assert service.hedges == 1
+
+    async def test_batch_embeddings_are_not_hedged(self, settings: Settings):
+        """Should neither duplicate a slow batch nor count it toward the hedge delay."""
+        settings.ollama_hedge_enabled = True
+        settings.ollama_hedge_min_delay = 0.01
+        calls = 0
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.05)
+            return httpx.Response(200, json={"embeddings": [[0.1], [0.2]]})
+
+        service = _service(settings, handler)
+
+        assert await service.generate_embeddings(["a", "b"]) == [[0.1], [0.2]]
+        assert calls == 1
+        assert service.hedges == 0
+        assert service._embed_latency.percentile(0.95) is None
+
+
+class TestOllamaServiceBackends:
+    """Tests for load balancing across two stub Ollama backends."""
+
+    @pytest.fixture
+    def settings(self, test_settings: Settings) -> Settings:
+        test_settings.ollama_urls = "http://ollama-a:11434,http://ollama-b:11434"
+        test_settings.ollama_retry_attempts = 0
+        return test_settings
+
+    async def test_spreads_concurrent_requests(self, settings: Settings):
+        """Should send concurrent requests to the backend with fewer in flight."""
+        hosts: list[str] = []
+
+        async def handler(request: httpx.Request) -> httpx.Response:
+            hosts.append(request.url.host)
+            await asyncio.sleep(0.01)
+            return httpx.Response(200, json={"message": {"content": "ok"}})
+
+        service = _service(settings, handler)
+
+        await asyncio.gather(*(service.chat("sys", "user") for _ in range(4)))
+
+        assert sorted(hosts) == ["ollama-a", "ollama-a", "ollama-b", "ollama-b"]
+
+    async def test_ejects_failing_backend(self, settings: Settings):
+        """Should stop routing to a backend once its circuit opens."""
+        settings.ollama_breaker_failure_threshold = 1
+        hosts: list[str] = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            hosts.append(request.url.host)
+            if request.url.host == "ollama-a":
+                raise httpx.ConnectError("refused", request=request)
+            return httpx.Response(200, json={"embedding": [1.0]})
+
+        service = _service(settings, handler)
+
+        with pytest.raises(OllamaConnectionError):
+            await service.generate_embedding("uno")
+        for _ in range(3):
+            assert await service.generate_embedding("dos") == [1.0]
+
+        assert hosts == ["ollama-a", "ollama-b", "ollama-b", "ollama-b"]
+        assert service.circuit_state() == CircuitState.CLOSED
+
+    async def test_role_affinity(self, test_settings: Settings):
+        """Should pin embedding and chat traffic to their configured hosts."""
+        test_settings.ollama_embed_urls = "http://embed-box:11434"
+        test_settings.ollama_chat_urls = "http://chat-box:11434"
+        hosts: dict[str, str] = {}
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            hosts[request.url.path] = request.url.host
+            if request.url.path == "/api/chat":
+                return httpx.Response(200, json={"message": {"content": "ok"}})
+            return httpx.Response(200, json={"embedding": [1.0]})
+
+        service = _service(test_settings, handler)
+
+        await service.generate_embedding("hola")
+        await service.chat("sys", "user")
+
+        assert hosts == {"/api/embeddings": "embed-box", "/api/chat": "chat-box"}
@@ -48,6 +48,14 @@ class TestPromptServiceUserPrompt:
 
         assert "SIN_EVIDENCIA" in result
 
+    def test_user_prompt_with_merged_span(self, prompt_service: PromptService):
+        """Should cite every chunk of a merged evidence span."""
+        evidence = [([3, 4], "Ingredientes: arroz, hongos. Alérgenos: lácteos")]
+
+        result = prompt_service.build_user_prompt("Tiene lácteos?", evidence)
+
+        assert "[chunk:3] [chunk:4] Ingredientes" in result
+
 
 class TestPromptServiceResponses:
     """Tests for PromptService response methods."""
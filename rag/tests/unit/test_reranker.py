@@ -0,0 +1,69 @@
+"""Tests for Reranker."""
+
+import time
+
+import pytest
+
+from src.config import Settings
+from src.repositories.embedding_repository import SearchHit
+from src.services import Reranker, TextService
+
+
+@pytest.fixture
+def reranker(test_settings: Settings) -> Reranker:
+    """Re-ranker with default weights."""
+    return Reranker(TextService(test_settings), test_settings)
+
+
+class TestReranker:
+    """Tests for Reranker.rerank."""
+
+    def test_keeps_top_k(self, reranker: Reranker):
+        """Should return top_k hits with one re-ranking score each."""
+        hits = [SearchHit(i, f"Plato {i} con salsa casera", 0.5 + i / 100, i) for i in range(9)]
+
+        result = reranker.rerank("Qué salsa lleva?", hits, 3)
+
+        assert len(result.hits) == 3
+        assert len(result.scores) == 3
+        assert result.scores == sorted(result.scores, reverse=True)
+
+    def test_allergen_terms_promote_matching_chunk(self, reranker: Reranker):
+        """Should lift a chunk naming the asked allergen above a closer generic one."""
+        hits = [
+            SearchHit(1, "Milanesa con papas fritas y ensalada", 0.82, 10, 0),
+            SearchHit(2, "Alérgenos: puede contener trazas de maní", 0.78, 10, 1),
+        ]
+
+        result = reranker.rerank("¿La milanesa tiene maní?", hits, 2)
+
+        assert [h.chunk_id for h in result.hits] == [2, 1]
+
+    def test_mmr_skips_near_duplicates(self, test_settings: Settings):
+        """Should prefer new evidence over a chunk repeating a picked one."""
+        test_settings.rerank_mmr_lambda = 0.5
+        reranker = Reranker(TextService(test_settings), test_settings)
+        overlap = "Ingredientes: harina de trigo, huevo, pan rallado, aceite de girasol"
+        hits = [
+            SearchHit(1, overlap, 0.90, 10, 0),
+            SearchHit(2, overlap + ", sal", 0.89, 10, 1),
+            SearchHit(3, "Precio y porciones: plato individual para una persona", 0.80, 10, 2),
+        ]
+
+        result = reranker.rerank("Ingredientes de la milanesa", hits, 2)
+
+        assert [h.chunk_id for h in result.hits] == [1, 3]
+
+    def test_is_fast(self, reranker: Reranker):
+        """Should re-rank a few dozen cached candidates in about a millisecond."""
+        hits = [
+            SearchHit(i, f"Chunk {i}: harina, huevo, leche, maní, sésamo y salsa " * 20, 0.7, i % 4)
+            for i in range(24)
+        ]
+        reranker.rerank("Tiene maní?", hits, 6)
+
+        started = time.perf_counter()
+        for _ in range(50):
+            reranker.rerank("Tiene maní?", hits, 6)
+
+        assert (time.perf_counter() - started) / 50 < 0.005
@@ -0,0 +1,84 @@
+"""Tests for circuit breaker and latency tracking helpers."""
+
+from src.core.resilience import CircuitBreaker, CircuitState, LatencyTracker, backoff_delay
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestCircuitBreaker:
+    """Tests for closed/open/half-open transitions."""
+
+    def test_opens_after_threshold(self):
+        """Should open after the configured number of consecutive failures."""
+        breaker = CircuitBreaker("ollama", failure_threshold=3, reset_timeout=10)
+
+        breaker.record_failure()
+        breaker.record_failure()
+        assert breaker.state == CircuitState.CLOSED
+        breaker.record_failure()
+
+        assert breaker.state == CircuitState.OPEN
+        assert breaker.allow_request() is False
+
+    def test_success_resets_failure_count(self):
+        """Should only count consecutive failures."""
+        breaker = CircuitBreaker("ollama", failure_threshold=2, reset_timeout=10)
+
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+
+        assert breaker.state == CircuitState.CLOSED
+
+    def test_half_open_allows_single_probe(self):
+        """Should let one probe through after the reset timeout."""
+        clock = FakeClock()
+        breaker = CircuitBreaker("ollama", failure_threshold=1, reset_timeout=10, clock=clock)
+        breaker.record_failure()
+
+        clock.now = 10
+        assert breaker.state == CircuitState.HALF_OPEN
+        assert breaker.allow_request() is True
+        assert breaker.allow_request() is False
+
+        breaker.record_success()
+        assert breaker.state == CircuitState.CLOSED
+
+    def test_failed_probe_reopens(self):
+        """Should reopen when the half-open probe fails."""
+        clock = FakeClock()
+        breaker = CircuitBreaker("ollama", failure_threshold=1, reset_timeout=10, clock=clock)
+        breaker.record_failure()
+        clock.now = 10
+        assert breaker.allow_request() is True
+
+        breaker.record_failure()
+
+        assert breaker.state == CircuitState.OPEN
+        assert breaker.retry_after() == 10
+
+
+class TestLatencyTracker:
+    """Tests for percentile estimates."""
+
+    def test_percentile(self):
+        """Should return the requested quantile of the window."""
+        tracker = LatencyTracker(window=100)
+        for ms in range(1, 101):
+            tracker.record(ms / 1000)
+
+        assert tracker.percentile(0.95) == 0.096
+        assert LatencyTracker(window=10).percentile(0.95) is None
+
+
+def test_backoff_delay_is_capped():
+    """Should never exceed the cap."""
+    assert all(0 <= backoff_delay(attempt, 0.1, 0.5) <= 0.5 for attempt in range(10))
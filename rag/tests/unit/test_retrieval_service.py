@@ -0,0 +1,189 @@
+"""Tests for RetrievalService."""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.config import Settings
+from src.core.constants import DecisionType, SearchPath
+from src.repositories import AsyncEmbeddingRepository
+from src.repositories.embedding_repository import SearchHit
+from src.services.retrieval_service import RetrievalService
+from src.services.scope_cache import DishScopeCache
+from src.services.dish_catalog import DishCatalog
+from src.services.reranker import Reranker, RerankResult
+from src.services.vector_index import NumpyVectorIndex
+
+
+@pytest.fixture
+def embedding_repo() -> MagicMock:
+    """Embedding repository mock returning one confident hit."""
+    repo = MagicMock(spec=AsyncEmbeddingRepository)
+    repo.search_similar.return_value = [SearchHit(chunk_id=1, content="Gluten", score=0.9)]
+    return repo
+
+
+class TestRetrievalServicePlan:
+    """Tests for the choice of search path."""
+
+    async def test_unscoped_search_uses_hnsw(self, embedding_repo: MagicMock):
+        """Should search the whole index without counting a scope."""
+        service = RetrievalService(embedding_repo, Settings())
+
+        result = await service.search([0.1] * 768, top_k=3)
+
+        assert result.search_path is SearchPath.HNSW
+        assert result.decision is DecisionType.ANSWER
+        embedding_repo.scope_size.assert_not_awaited()
+
+    async def test_small_dish_uses_exact_scan(self, embedding_repo: MagicMock):
+        """Should scan a small dish exactly."""
+        embedding_repo.scope_size.return_value = 4
+        service = RetrievalService(embedding_repo, Settings(dish_exact_scan_max_rows=500))
+
+        result = await service.search([0.1] * 768, top_k=3, dish_id=7)
+
+        assert result.search_path is SearchPath.EXACT
+        embedding_repo.scope_size.assert_awaited_once_with(7, 501)
+        assert embedding_repo.search_similar.call_args.kwargs["path"] is SearchPath.EXACT
+
+    @pytest.mark.parametrize(
+        "iterative, expected",
+        [(True, SearchPath.HNSW_ITERATIVE), (False, SearchPath.HNSW_FILTERED)],
+    )
+    async def test_large_dish_uses_filtered_index_scan(
+        self, embedding_repo: MagicMock, iterative: bool, expected: SearchPath
+    ):
+        """Should go through the index when the dish exceeds the exact-scan limit."""
+        embedding_repo.scope_size.return_value = 11
+        settings = Settings(dish_exact_scan_max_rows=10, hnsw_iterative_scan=iterative)
+        service = RetrievalService(embedding_repo, settings)
+
+        result = await service.search([0.1] * 768, top_k=3, dish_id=7)
+
+        assert result.search_path is expected
+
+    async def test_scope_size_is_cached_per_catalog_version(self, embedding_repo: MagicMock):
+        """Should count a dish once per catalog version."""
+        embedding_repo.scope_size.return_value = 4
+        settings = Settings(dish_exact_scan_max_rows=500)
+        catalog = MagicMock(spec=DishCatalog)
+        catalog.version = "v1"
+        service = RetrievalService(
+            embedding_repo, settings, scope_cache=DishScopeCache(settings, catalog)
+        )
+
+        await service.search([0.1] * 768, top_k=3, dish_id=7)
+        result = await service.search([0.1] * 768, top_k=3, dish_id=7)
+        assert result.search_path is SearchPath.EXACT
+        embedding_repo.scope_size.assert_awaited_once()
+
+        catalog.version = "v2"
+        await service.search([0.1] * 768, top_k=3, dish_id=7)
+        assert embedding_repo.scope_size.await_count == 2
+
+    async def test_loaded_vector_index_bypasses_pgvector(self, embedding_repo: MagicMock):
+        """Should search the in-process index once it has loaded."""
+        vector_index = MagicMock(spec=NumpyVectorIndex)
+        vector_index.ready = True
+        vector_index.search.return_value = [SearchHit(chunk_id=2, content="Huevo", score=0.8)]
+        service = RetrievalService(embedding_repo, Settings(), vector_index=vector_index)
+
+        result = await service.search([0.1] * 768, top_k=3, dish_id=7)
+
+        assert result.search_path is SearchPath.NUMPY
+        assert [h.chunk_id for h in result.hits] == [2]
+        embedding_repo.search_similar.assert_not_awaited()
+
+
+class TestRetrievalServiceHybrid:
+    """Tests for hybrid (vector + full-text) retrieval."""
+
+    async def test_hybrid_mode_fuses_in_sql(self, embedding_repo: MagicMock):
+        """Should run the fused query and keep cosine-based confidence."""
+        embedding_repo.search_hybrid.return_value = [
+            SearchHit(chunk_id=3, content="Salsa de maní", score=0.7),
+            SearchHit(chunk_id=1, content="Gluten", score=0.9),
+        ]
+        settings = Settings(retrieval_mode="hybrid", hybrid_candidates=20, rrf_k=60)
+        service = RetrievalService(embedding_repo, settings)
+
+        result = await service.search([0.1] * 768, top_k=3, query_text="Tiene maní?")
+
+        assert result.hybrid is True
+        assert [h.chunk_id for h in result.hits] == [3, 1]
+        assert result.confidence == 0.9
+        kwargs = embedding_repo.search_hybrid.call_args.kwargs
+        assert kwargs["query_text"] == "Tiene maní?"
+        assert kwargs["candidates"] == 20 and kwargs["rrf_k"] == 60
+        embedding_repo.search_similar.assert_not_awaited()
+
+    async def test_vector_mode_ignores_query_text(self, embedding_repo: MagicMock):
+        """Should stay on vector search unless hybrid mode is configured."""
+        service = RetrievalService(embedding_repo, Settings(retrieval_mode="vector"))
+
+        result = await service.search([0.1] * 768, top_k=3, query_text="Tiene maní?")
+
+        assert result.hybrid is False
+        embedding_repo.search_hybrid.assert_not_awaited()
+
+
+class TestRetrievalServiceRerank:
+    """Tests for the re-ranking stage."""
+
+    async def test_over_fetches_and_keeps_top_k(self, embedding_repo: MagicMock):
+        """Should fetch fetch_factor x top_k candidates and keep top_k re-ranked hits."""
+        candidates = [SearchHit(i, f"Chunk {i}", 0.9 - i / 100) for i in range(9)]
+        embedding_repo.search_similar.return_value = candidates
+        reranker = MagicMock(spec=Reranker)
+        reranker.rerank.return_value = RerankResult(hits=candidates[3:6], scores=[0.7, 0.6, 0.5])
+        settings = Settings(rerank_fetch_factor=3)
+        service = RetrievalService(embedding_repo, settings, reranker=reranker)
+
+        result = await service.search([0.1] * 768, top_k=3, query_text="Tiene maní?")
+
+        assert embedding_repo.search_similar.call_args.kwargs["top_k"] == 9
+        reranker.rerank.assert_called_once_with("Tiene maní?", candidates, 3)
+        assert [h.chunk_id for h in result.hits] == [3, 4, 5]
+        assert result.rerank_scores == [0.7, 0.6, 0.5]
+        assert result.candidates == 9
+        assert result.confidence == pytest.approx(0.87)
+
+
+class TestRetrievalServiceBatch:
+    """Tests for batch retrieval."""
+
+    async def test_batch_goes_to_sql_in_one_call(self, embedding_repo: MagicMock):
+        """Should search every query in one repository call, one result each."""
+        embedding_repo.search_batch.return_value = [
+            [SearchHit(chunk_id=1, content="Gluten", score=0.9)],
+            [],
+        ]
+        service = RetrievalService(embedding_repo, Settings(hnsw_ef_search=40))
+
+        results = await service.search_batch(
+            [[0.1] * 768, [0.2] * 768], top_k=3, dish_ids=[None, 7]
+        )
+
+        embedding_repo.search_batch.assert_awaited_once()
+        assert embedding_repo.search_batch.call_args.kwargs["dish_ids"] == [None, 7]
+        assert [r.decision for r in results] == [DecisionType.ANSWER, DecisionType.DISCLAIMER]
+        assert results[0].search_path is SearchPath.BATCH
+
+    async def test_vector_index_scores_each_dish_together(self, embedding_repo: MagicMock):
+        """Should call search_many once per dish and return results in query order."""
+        vector_index = MagicMock(spec=NumpyVectorIndex)
+        vector_index.ready = True
+        vector_index.search_many.side_effect = lambda queries, top_k, dish_id: [
+            [SearchHit(chunk_id=dish_id or 0, content="x", score=q[0])] for q in queries
+        ]
+        service = RetrievalService(embedding_repo, Settings(), vector_index=vector_index)
+
+        results = await service.search_batch(
+            [[0.9], [0.5], [0.8]], top_k=1, dish_ids=[7, None, 7]
+        )
+
+        assert vector_index.search_many.call_count == 2
+        assert [r.hits[0].chunk_id for r in results] == [7, 0, 7]
+        assert [r.confidence for r in results] == [0.9, 0.5, 0.8]
+        embedding_repo.search_batch.assert_not_awaited()
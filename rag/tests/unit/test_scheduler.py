@@ -0,0 +1,101 @@
+"""Tests for LLMScheduler."""
+
+import asyncio
+
+import pytest
+
+from src.core.exceptions import OverloadedError, QueueFullError
+from src.core.scheduler import LLMScheduler, Priority
+
+
+class TestLLMScheduler:
+    """Tests for bounded, priority-aware scheduling."""
+
+    async def test_limits_concurrency(self):
+        """Should never run more than max_concurrency holders at once."""
+        scheduler = LLMScheduler("chat", max_concurrency=2, max_queue=10)
+        running = 0
+        peak = 0
+
+        async def work() -> None:
+            nonlocal running, peak
+            async with scheduler.slot():
+                running += 1
+                peak = max(peak, running)
+                await asyncio.sleep(0.01)
+                running -= 1
+
+        await asyncio.gather(*(work() for _ in range(6)))
+
+        assert peak == 2
+        assert scheduler.stats()["admitted"] == 6
+
+    async def test_high_priority_served_first(self):
+        """Should grant the next free slot to allergy-mode (HIGH) waiters first."""
+        scheduler = LLMScheduler("chat", max_concurrency=1, max_queue=10)
+        order: list[str] = []
+        release = asyncio.Event()
+
+        async def holder() -> None:
+            async with scheduler.slot():
+                await release.wait()
+
+        async def waiter(name: str, priority: Priority) -> None:
+            async with scheduler.slot(priority):
+                order.append(name)
+
+        first = asyncio.create_task(holder())
+        await asyncio.sleep(0)
+        normal = asyncio.create_task(waiter("normal", Priority.NORMAL))
+        await asyncio.sleep(0)
+        allergy = asyncio.create_task(waiter("allergy", Priority.HIGH))
+        await asyncio.sleep(0)
+        assert scheduler.queue_depth == 2
+
+        release.set()
+        await asyncio.gather(first, normal, allergy)
+
+        assert order == ["allergy", "normal"]
+
+    async def test_rejects_when_queue_full(self):
+        """Should raise QueueFullError when the wait queue is full."""
+        scheduler = LLMScheduler("chat", max_concurrency=1, max_queue=1)
+        release = asyncio.Event()
+
+        async def holder() -> None:
+            async with scheduler.slot():
+                await release.wait()
+
+        tasks = [asyncio.create_task(holder()) for _ in range(2)]
+        await asyncio.sleep(0)
+
+        with pytest.raises(QueueFullError) as exc:
+            async with scheduler.slot():
+                pass
+        assert exc.value.retry_after >= 1
+
+        release.set()
+        await asyncio.gather(*tasks)
+
+    async def test_rejects_after_deadline(self):
+        """Should raise OverloadedError when a slot does not free up in time."""
+        scheduler = LLMScheduler("chat", max_concurrency=1, max_queue=10)
+        release = asyncio.Event()
+
+        async def holder() -> None:
+            async with scheduler.slot():
+                await release.wait()
+
+        task = asyncio.create_task(holder())
+        await asyncio.sleep(0)
+
+        with pytest.raises(OverloadedError):
+            async with scheduler.slot(timeout=0.01):
+                pass
+        assert scheduler.queue_depth == 0
+
+        release.set()
+        await task
+        async with scheduler.slot(timeout=0.01):
+            pass
+        assert scheduler.stats()["active"] == 0
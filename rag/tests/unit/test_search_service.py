@@ -0,0 +1,110 @@
+"""Tests for SearchService."""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.config import Settings
+from src.core.constants import DecisionType
+from src.repositories.embedding_repository import SearchHit
+from src.schemas.search import SearchQueryIn
+from src.services import (
+    OllamaService,
+    QueryEmbeddingCache,
+    SearchResultCache,
+    SearchService,
+    TextService,
+)
+from src.services.retrieval_service import RetrievalResult, RetrievalService
+
+
+@pytest.fixture
+def retrieval() -> MagicMock:
+    """Retrieval service mock returning one confident hit per query."""
+    result = RetrievalResult(
+        hits=[SearchHit(chunk_id=1, content="Milanesa: contiene gluten", score=0.9, dish_id=4)],
+        confidence=0.9,
+        decision=DecisionType.ANSWER,
+    )
+    retrieval = MagicMock(spec=RetrievalService)
+    retrieval.search.return_value = result
+    retrieval.search_batch.side_effect = lambda embeddings, *args, **kwargs: [result] * len(
+        embeddings
+    )
+    return retrieval
+
+
+def _search_service(
+    settings: Settings, ollama: OllamaService, retrieval: MagicMock
+) -> SearchService:
+    return SearchService(
+        ollama_service=ollama,
+        text_service=TextService(settings),
+        retrieval_service=retrieval,
+        embedding_cache=QueryEmbeddingCache(settings),
+        result_cache=SearchResultCache(settings),
+    )
+
+
+class TestSearchService:
+    """Tests for retrieval-only search."""
+
+    async def test_returns_ranked_previews(
+        self, test_settings: Settings, mock_ollama_service: OllamaService, retrieval: MagicMock
+    ):
+        """Should return hits with previews, confidence and decision."""
+        service = _search_service(test_settings, mock_ollama_service, retrieval)
+
+        result = await service.search("Tiene gluten?", dish_id=4, top_k=3)
+
+        assert result.decision == "answer"
+        assert result.confidence == 0.9
+        assert result.hits[0].chunk_id == 1
+        assert result.hits[0].preview.startswith("Milanesa")
+        assert retrieval.search.call_args.kwargs["dish_id"] == 4
+
+    async def test_repeated_question_is_served_from_cache(
+        self, test_settings: Settings, mock_ollama_service: OllamaService, retrieval: MagicMock
+    ):
+        """Should neither embed nor search again for the same canonical question."""
+        service = _search_service(test_settings, mock_ollama_service, retrieval)
+
+        await service.search("Tiene gluten?", dish_id=4, top_k=3)
+        cached = await service.search("tiene  GLUTEN?", dish_id=4, top_k=3)
+
+        assert cached.question == "tiene  GLUTEN?"
+        mock_ollama_service.generate_embedding.assert_awaited_once()
+        retrieval.search.assert_awaited_once()
+
+    async def test_cache_is_scoped_by_dish_and_top_k(
+        self, test_settings: Settings, mock_ollama_service: OllamaService, retrieval: MagicMock
+    ):
+        """Should search again for another dish or top_k."""
+        service = _search_service(test_settings, mock_ollama_service, retrieval)
+
+        await service.search("Tiene gluten?", dish_id=4, top_k=3)
+        await service.search("Tiene gluten?", dish_id=5, top_k=3)
+        await service.search("Tiene gluten?", dish_id=4, top_k=6)
+
+        assert retrieval.search.await_count == 3
+
+
+class TestSearchServiceBatch:
+    """Tests for batch search."""
+
+    async def test_embeds_all_questions_in_one_call(
+        self, test_settings: Settings, mock_ollama_service: OllamaService, retrieval: MagicMock
+    ):
+        """Should embed the batch together and return one result per query."""
+        mock_ollama_service.generate_embeddings = AsyncMock(return_value=[[0.1], [0.2]])
+        service = _search_service(test_settings, mock_ollama_service, retrieval)
+        queries = [
+            SearchQueryIn(question="Tiene gluten?", dish_id=4),
+            SearchQueryIn(question="Es vegano?"),
+        ]
+
+        out = await service.search_batch(queries, top_k=3)
+
+        mock_ollama_service.generate_embeddings.assert_awaited_once()
+        assert retrieval.search_batch.call_args.kwargs["dish_ids"] == [4, None]
+        assert [r.question for r in out.results] == ["Tiene gluten?", "Es vegano?"]
@@ -0,0 +1,84 @@
+"""Tests for SingleFlight."""
+
+import asyncio
+
+import pytest
+
+from src.core.single_flight import SingleFlight
+
+
+class TestSingleFlight:
+    """Tests for coalescing identical in-flight calls."""
+
+    async def test_concurrent_calls_share_one_execution(self):
+        """Should run the function once for concurrent callers with the same key."""
+        flight: SingleFlight[str, int] = SingleFlight()
+        calls = 0
+        release = asyncio.Event()
+
+        async def work() -> int:
+            nonlocal calls
+            calls += 1
+            await release.wait()
+            return 42
+
+        tasks = [asyncio.create_task(flight.do("k", work)) for _ in range(5)]
+        await asyncio.sleep(0)
+        release.set()
+
+        assert await asyncio.gather(*tasks) == [42] * 5
+        assert calls == 1
+        assert flight.stats() == {"in_flight": 0, "leaders": 1, "coalesced": 4}
+
+    async def test_different_keys_run_separately(self):
+        """Should not coalesce calls with different keys."""
+        flight: SingleFlight[str, str] = SingleFlight()
+
+        async def work(value: str) -> str:
+            await asyncio.sleep(0)
+            return value
+
+        results = await asyncio.gather(
+            flight.do("a", lambda: work("a")),
+            flight.do("b", lambda: work("b")),
+        )
+
+        assert results == ["a", "b"]
+        assert flight.leaders == 2
+
+    async def test_exception_is_shared_and_key_released(self):
+        """Should propagate the error to every caller and allow a fresh retry."""
+        flight: SingleFlight[str, int] = SingleFlight()
+
+        async def fail() -> int:
+            await asyncio.sleep(0)
+            raise RuntimeError("boom")
+
+        results = await asyncio.gather(
+            flight.do("k", fail), flight.do("k", fail), return_exceptions=True
+        )
+        assert all(isinstance(r, RuntimeError) for r in results)
+
+        async def ok() -> int:
+            return 1
+
+        assert await flight.do("k", ok) == 1
+
+    async def test_cancelled_caller_does_not_cancel_shared_work(self):
+        """Should keep the shared task running when one waiter is cancelled."""
+        flight: SingleFlight[str, int] = SingleFlight()
+        release = asyncio.Event()
+
+        async def work() -> int:
+            await release.wait()
+            return 7
+
+        leader = asyncio.create_task(flight.do("k", work))
+        follower = asyncio.create_task(flight.do("k", work))
+        await asyncio.sleep(0)
+        leader.cancel()
+        release.set()
+
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        assert await follower == 7
@@ -110,3 +110,18 @@ class TestTextServicePreview:
         text = "hello\nworld"
         result = text_service.truncate_for_preview(text)
         assert "\n" not in result
+
+
+class TestTextServiceCanonicalize:
+    """Tests for TextService.canonicalize method."""
+
+    def test_folds_accents_and_case(self, text_service: TextService):
+        """Should accent-fold and case-fold the question."""
+        assert text_service.canonicalize("¿Tiene  GLUTEN?") == text_service.canonicalize(
+            "¿tiene gluten?"
+        )
+        assert text_service.canonicalize("¿Es apto para celíacos?") == "¿es apto para celiacos?"
+
+    def test_collapses_whitespace(self, text_service: TextService):
+        """Should collapse newlines and repeated spaces."""
+        assert text_service.canonicalize("  es\n\nvegano ") == "es vegano"
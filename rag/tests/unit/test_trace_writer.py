@@ -0,0 +1,113 @@
+"""Tests for TraceWriter."""
+
+from dataclasses import replace
+from unittest.mock import MagicMock
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+from src.config import Settings
+from src.models.entities import ChatTurn
+from src.services.trace_writer import TraceRecord, TraceWriter
+
+
+def _record(n: int) -> TraceRecord:
+    return TraceRecord(
+        turn_id=n,
+        trace_id=100 + n,
+        dish_id=None,
+        user_text="Tiene gluten?",
+        bot_text="Sí.",
+        used_chunk_ids=[1],
+        scores=[0.9],
+        confidence=0.9,
+        decision="answer",
+    )
+
+
+@pytest.fixture
+def session() -> MagicMock:
+    """Session mock shared by every writer transaction."""
+    return MagicMock()
+
+
+class TestTraceWriter:
+    """Tests for write-behind persistence of chat turns and traces."""
+
+    async def test_flushes_queued_records_on_close(
+        self, test_settings: Settings, session: MagicMock
+    ):
+        """Should write every queued record before shutting down."""
+        writer = TraceWriter(lambda: session, test_settings)
+        writer.start()
+
+        for n in range(5):
+            await writer.submit(_record(n))
+        await writer.aclose()
+
+        assert writer.stats()["written"] == 5
+        assert writer.stats()["written_inline"] == 0
+        assert session.add.call_count == 10
+        session.close.assert_called()
+
+    async def test_writes_inline_when_queue_is_full(
+        self, test_settings: Settings, session: MagicMock
+    ):
+        """Should apply backpressure instead of dropping records."""
+        test_settings.trace_writer_max_queue = 1
+        writer = TraceWriter(lambda: session, test_settings)
+        writer.start()
+
+        await writer.submit(_record(1))
+        await writer.submit(_record(2))
+        await writer.aclose()
+
+        assert writer.stats()["written"] == 2
+        assert writer.stats()["written_inline"] == 1
+
+    async def test_counts_failed_batches(self, test_settings: Settings, session: MagicMock):
+        """Should keep running after a failed write and count the lost records."""
+        session.commit.side_effect = [RuntimeError("db down"), None]
+        writer = TraceWriter(lambda: session, test_settings)
+        writer.start()
+
+        await writer.submit(_record(1))
+        await writer._queue.join()
+        await writer.submit(_record(2))
+        await writer.aclose()
+
+        assert writer.stats()["failed"] == 1
+        assert writer.stats()["written"] == 1
+
+    async def test_failed_batch_is_retried_record_by_record(
+        self, test_settings: Settings, session: MagicMock
+    ):
+        """Should lose only the record that fails, not the rest of its batch."""
+        session.commit.side_effect = [RuntimeError("fk violation"), None, RuntimeError(), None]
+        writer = TraceWriter(lambda: session, test_settings)
+        writer.start()
+
+        for n in range(3):
+            await writer.submit(_record(n))
+        await writer.aclose()
+
+        assert writer.stats()["failed"] == 1
+        assert writer.stats()["written"] == 2
+
+    async def test_unknown_dish_is_written_without_it(
+        self, test_settings: Settings, session: MagicMock
+    ):
+        """Should keep a turn whose dish fails the foreign key, without the dish."""
+        session.commit.side_effect = [IntegrityError("INSERT", {}, Exception("fk")), None]
+        writer = TraceWriter(lambda: session, test_settings)
+        writer.start()
+
+        await writer.submit(replace(_record(1), dish_id=404))
+        await writer.aclose()
+
+        turns = [c.args[0] for c in session.add.call_args_list if isinstance(c.args[0], ChatTurn)]
+        assert [t.dish_id for t in turns] == [404, None]
+        trace = session.add.call_args_list[-1].args[0]
+        assert trace.meta_data["unknown_dish_id"] == 404
+        assert writer.stats()["written"] == 1
+        assert writer.stats()["failed"] == 0
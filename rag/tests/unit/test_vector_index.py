@@ -0,0 +1,157 @@
+"""Tests for NumpyVectorIndex."""
+
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+from src.config import Settings
+from src.repositories.embedding_repository import SnapshotState
+from src.services import vector_index as vector_index_module
+from src.services.vector_index import NumpyVectorIndex, top_k_indices
+
+
+DIM = 768
+
+
+def _vector(*values: float) -> list[float]:
+    vector = [0.0] * DIM
+    vector[: len(values)] = values
+    return vector
+
+
+ROWS = [
+    (1, 10, 0, "Milanesa: gluten, huevo", _vector(1.0, 0.0)),
+    (2, 10, 1, "Milanesa: guarnición", _vector(0.8, 0.6)),
+    (3, 20, 0, "Ensalada: sin TACC", _vector(0.0, 1.0)),
+    (4, None, 0, "Horarios del local", _vector(-1.0, 0.0)),
+]
+
+
+@pytest.fixture
+def settings(tmp_path) -> Settings:
+    """Settings writing snapshots to a temporary directory."""
+    return Settings(vector_snapshot_dir=str(tmp_path / "index"))
+
+
+@pytest.fixture
+def index(settings: Settings) -> NumpyVectorIndex:
+    """Index built from in-memory rows."""
+    index = NumpyVectorIndex(MagicMock(), settings)
+    index.install(ROWS)
+    return index
+
+
+class TestTopKIndices:
+    """Tests for top_k_indices."""
+
+    def test_matches_full_sort(self):
+        """Should return the same indices as a full descending sort."""
+        scores = np.random.default_rng(0).random((3, 50))
+
+        result = top_k_indices(scores, 5)
+
+        assert (result == np.argsort(-scores, axis=1)[:, :5]).all()
+
+    def test_k_larger_than_rows(self):
+        """Should return every column when k exceeds their number."""
+        assert top_k_indices(np.array([[0.1, 0.9]]), 5).tolist() == [[1, 0]]
+
+
+class TestNumpyVectorIndex:
+    """Tests for NumpyVectorIndex."""
+
+    def test_search_ranks_by_cosine(self, index: NumpyVectorIndex):
+        """Should rank chunks by cosine similarity and clip negative scores."""
+        hits = index.search(_vector(1.0, 0.0), top_k=4)
+
+        assert [h.chunk_id for h in hits] == [1, 2, 3, 4]
+        assert hits[0].score == pytest.approx(1.0)
+        assert hits[1].score == pytest.approx(0.8)
+        assert hits[3].score == 0.0
+        assert hits[0].dish_id == 10 and hits[3].dish_id is None
+
+    def test_dish_scope_is_a_slice(self, index: NumpyVectorIndex):
+        """Should only return the dish's chunks."""
+        hits = index.search(_vector(0.0, 1.0), top_k=3, dish_id=10)
+
+        assert [h.chunk_id for h in hits] == [2, 1]
+        assert index.search(_vector(1.0), top_k=3, dish_id=99) == []
+
+    def test_search_many_scores_batch(self, index: NumpyVectorIndex):
+        """Should answer several queries in one call."""
+        results = index.search_many([_vector(1.0), _vector(0.0, 1.0)], top_k=1)
+
+        assert [r[0].chunk_id for r in results] == [1, 3]
+
+    def test_snapshot_is_memory_mapped(self, index: NumpyVectorIndex):
+        """Should serve the matrix from the snapshot file."""
+        assert isinstance(index._snapshot.vectors, np.memmap)
+
+
+class TestNumpyVectorIndexRefresh:
+    """Tests for refreshing the index from kb_embedding."""
+
+    @pytest.fixture
+    def repo(self, monkeypatch) -> MagicMock:
+        """Embedding repository mock used by refresh()."""
+        repo = MagicMock()
+        monkeypatch.setattr(vector_index_module, "EmbeddingRepository", lambda session: repo)
+        return repo
+
+    def test_appends_new_rows_incrementally(self, settings: Settings, repo: MagicMock):
+        """Should read only rows past the snapshot when nothing was deleted."""
+        index = NumpyVectorIndex(MagicMock(), settings)
+        repo.snapshot_state.return_value = SnapshotState(2, 2, "a", "")
+        repo.export_rows.return_value = ROWS[:2]
+        assert index.refresh() is True
+
+        repo.snapshot_state.return_value = SnapshotState(3, 3, "b", "a")
+        repo.export_rows.return_value = ROWS[2:3]
+        assert index.refresh() is True
+
+        repo.snapshot_state.assert_called_with(2)
+        repo.export_rows.assert_called_with(2)
+        assert index.stats()["rows"] == 3
+        assert index.incremental_refreshes == 1
+        assert index.search(_vector(0.0, 1.0), top_k=1)[0].chunk_id == 3
+
+    def test_updated_row_rebuilds(self, settings: Settings, repo: MagicMock):
+        """Should rebuild when an embedding changed in place (same count and max id)."""
+        index = NumpyVectorIndex(MagicMock(), settings)
+        repo.snapshot_state.return_value = SnapshotState(2, 2, "a", "")
+        repo.export_rows.return_value = ROWS[:2]
+        index.refresh()
+
+        reembedded = (2, 10, 1, "Milanesa: guarnición", _vector(-1.0, 0.0))
+        repo.snapshot_state.return_value = SnapshotState(2, 2, "c", "c")
+        repo.export_rows.return_value = [ROWS[0], reembedded]
+        assert index.refresh() is True
+
+        repo.export_rows.assert_called_with()
+        assert index.full_rebuilds == 2
+        assert index.incremental_refreshes == 0
+        assert index.search(_vector(-1.0, 0.0), top_k=1)[0].chunk_id == 2
+
+    def test_unchanged_table_is_not_reloaded(self, settings: Settings, repo: MagicMock):
+        """Should skip refresh when kb_embedding did not change."""
+        index = NumpyVectorIndex(MagicMock(), settings)
+        repo.snapshot_state.return_value = SnapshotState(2, 2, "a", "a")
+        repo.export_rows.return_value = ROWS[:2]
+        index.refresh()
+
+        assert index.refresh() is False
+        assert repo.export_rows.call_count == 1
+
+    def test_other_worker_maps_existing_snapshot(self, settings: Settings, repo: MagicMock):
+        """Should map a snapshot written by another worker without reading rows."""
+        repo.snapshot_state.return_value = SnapshotState(4, 4, "a", "")
+        repo.export_rows.return_value = ROWS
+        NumpyVectorIndex(MagicMock(), settings).refresh()
+        repo.export_rows.reset_mock()
+
+        other = NumpyVectorIndex(MagicMock(), settings)
+        other.refresh()
+
+        repo.export_rows.assert_not_called()
+        assert other.stats()["rows"] == 4
@@ -0,0 +1,172 @@
+"""Tests for configurable embedding storage."""
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from src.config import Settings
+from src.core.constants import SearchPath
+from src.models.vector_storage import VectorStorage
+from src.repositories.embedding_repository import (
+    _batch_search_statement,
+    _group_batch_hits,
+    _hybrid_statement,
+    _path_settings_statement,
+    _scan_settings_statement,
+    _search_statement,
+    _snapshot_state_statement,
+)
+
+
+def compile_sql(stmt) -> str:
+    return str(stmt.compile(dialect=postgresql.dialect()))
+
+
+class TestVectorStorage:
+    """Tests for VectorStorage."""
+
+    def test_from_settings_truncates_dimension(self):
+        """Should store only embedding_store_dim leading dimensions."""
+        settings = Settings(embedding_storage="halfvec", embedding_dim=768, embedding_store_dim=256)
+        storage = VectorStorage.from_settings(settings)
+
+        assert storage.dim == 256
+        assert storage.column_sql == "halfvec(256)"
+        assert storage.opclass == "halfvec_cosine_ops"
+        assert storage.truncate([0.5] * 768) == [0.5] * 256
+
+    def test_store_dim_zero_keeps_full_dimension(self):
+        """Should keep the model dimension when no truncation is configured."""
+        storage = VectorStorage.from_settings(Settings(embedding_store_dim=0))
+
+        assert storage.dim == 768
+        assert storage.column_sql == "vector(768)"
+
+    def test_binary_indexes_quantized_bits(self):
+        """Should keep float vectors but index their binary quantization."""
+        storage = VectorStorage(mode="binary", dim=768)
+
+        assert storage.column_sql == "vector(768)"
+        assert storage.index_expression == "(binary_quantize(embedding)::bit(768))"
+        assert storage.opclass == "bit_hamming_ops"
+
+    def test_rejects_unknown_mode(self):
+        """Should fail fast on an unknown storage mode."""
+        with pytest.raises(ValueError):
+            VectorStorage(mode="pq")
+
+
+class TestSearchStatement:
+    """Tests for the storage-dependent search query."""
+
+    def test_float_search_orders_by_cosine(self):
+        """Should rank directly by cosine distance for float storage."""
+        sql = compile_sql(_search_statement([0.1] * 768, 5, None, VectorStorage("halfvec", 256)))
+
+        assert "<=>" in sql
+        assert "binary_quantize" not in sql
+
+    def test_binary_search_rescores_hamming_candidates(self):
+        """Should over-fetch Hamming candidates and re-rank them by cosine."""
+        storage = VectorStorage(mode="binary", dim=768, rescore_factor=4)
+        stmt = _search_statement([0.1] * 768, 5, 3, storage)
+        sql = compile_sql(stmt)
+
+        assert "<~>" in sql
+        assert "BIT(768)" in sql
+        assert "<=>" in sql
+        params = stmt.compile().params.values()
+        assert 20 in params and 5 in params
+
+    def test_exact_path_scans_dish_without_index(self):
+        """Should compute every distance of the dish in a materialized CTE."""
+        sql = compile_sql(_search_statement([0.1] * 768, 5, 3, path=SearchPath.EXACT))
+
+        assert "AS MATERIALIZED" in sql
+        assert "kb_embedding.dish_id =" in sql
+
+    def test_iterative_path_enables_iterative_scan(self):
+        """Should enable the iterative HNSW scan only when asked."""
+        assert _scan_settings_statement(None, 5) is None
+        stmt = _scan_settings_statement(None, 5, iterative=True)
+
+        assert "hnsw.iterative_scan" in str(stmt)
+
+    def test_exact_path_skips_scan_settings(self):
+        """Should not spend a round trip on HNSW settings for an exact scan."""
+        assert _path_settings_statement(100, 5, SearchPath.EXACT) is None
+        stmt = _path_settings_statement(100, 5, SearchPath.HNSW_ITERATIVE)
+
+        assert "hnsw.iterative_scan" in str(stmt)
+
+    @pytest.mark.parametrize(
+        "storage, ef_search, expected",
+        [
+            (VectorStorage("vector"), 40, "40"),
+            (VectorStorage("vector"), 2, "5"),
+            (VectorStorage("binary", rescore_factor=4), 10, "20"),
+        ],
+    )
+    def test_ef_search_covers_rows_needed(self, storage, ef_search, expected):
+        """Should set ef_search locally, never below the rows the search must return."""
+        stmt = _scan_settings_statement(ef_search, 5, storage=storage)
+
+        assert "set_config('hnsw.ef_search'" in str(stmt)
+        assert stmt.compile().params["ef_search"] == expected
+
+    def test_hybrid_fuses_vector_and_full_text_ranks(self):
+        """Should join vector and full-text candidates and order by fused rank."""
+        sql = compile_sql(_hybrid_statement([0.1] * 768, "Tiene maní?", 5, None, 20, 60))
+
+        assert "FULL OUTER JOIN" in sql
+        assert "plainto_tsquery" in sql and "@@" in sql
+        assert "row_number() OVER" in sql
+        assert "<=>" in sql
+
+
+class TestBatchSearchStatement:
+    """Tests for the multi-query search statement."""
+
+    def test_one_lateral_search_per_query(self):
+        """Should unnest the queries and search each one in a LATERAL subquery."""
+        stmt = _batch_search_statement([[0.5] * 768, [0.25] * 768], [None, 3], 5)
+        sql = str(stmt)
+        params = stmt.compile().params
+
+        assert "WITH ORDINALITY" in sql and "CROSS JOIN LATERAL" in sql
+        assert "vector(768)[]" in sql
+        assert "OFFSET 0" in sql
+        assert params["dish_ids"] == [0, 3]
+        assert params["vectors"][1].startswith("[0.25,")
+        assert params["candidates"] == params["top_k"] == 5
+
+    def test_binary_storage_rescores_hamming_candidates(self):
+        """Should over-fetch Hamming candidates for unscoped queries in binary mode."""
+        storage = VectorStorage(mode="binary", dim=768, rescore_factor=4)
+        stmt = _batch_search_statement([[0.1] * 768], [None], 5, storage)
+
+        assert "<~>" in str(stmt)
+        assert stmt.compile().params["candidates"] == 20
+
+    def test_rows_are_grouped_per_query(self):
+        """Should split rows by query position, keeping empty results."""
+        rows = [(1, 10, "a", None, 0, 0.1), (3, 11, "b", 2, 0, 0.3), (3, 12, "c", 2, 1, 0.4)]
+
+        hits = _group_batch_hits(rows, 3)
+
+        assert [[h.chunk_id for h in group] for group in hits] == [[10], [], [11, 12]]
+        assert hits[0][0].score == pytest.approx(0.9)
+
+
+class TestSnapshotStateStatement:
+    """Tests for the vector index snapshot fingerprint."""
+
+    def test_digest_covers_row_contents(self):
+        """Should hash every exported column, in chunk order, with a filtered base digest."""
+        stmt = _snapshot_state_statement(7)
+        sql = compile_sql(stmt)
+
+        assert "CAST(kb_embedding.embedding AS TEXT)" in sql
+        assert "kb_chunk.content" in sql
+        assert "ORDER BY kb_embedding.chunk_id" in sql
+        assert "FILTER (WHERE kb_embedding.chunk_id <=" in sql
+        assert 7 in stmt.compile().params.values()
@@ -0,0 +1,101 @@
+"""Tests for WarmupService."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.config import Settings
+from src.services import OllamaService, WarmupService
+
+
+@pytest.fixture
+def settings(test_settings: Settings) -> Settings:
+    """Settings with Postgres prewarm off (no database in unit tests)."""
+    test_settings.warmup_pg_prewarm = False
+    test_settings.warmup_ping_interval = 0
+    return test_settings
+
+
+@pytest.fixture
+def ollama() -> MagicMock:
+    """Ollama service mock whose preload succeeds."""
+    service = MagicMock(spec=OllamaService)
+    service.preload = AsyncMock(return_value={"http://ollama chat": True, "http://ollama embed": True})
+    return service
+
+
+class TestWarmupService:
+    """Tests for startup warm-up and readiness."""
+
+    async def test_ready_after_warm_up(self, settings: Settings, ollama: MagicMock):
+        """Should hold readiness until models are preloaded."""
+        release = asyncio.Event()
+
+        async def slow_preload() -> dict[str, bool]:
+            await release.wait()
+            return {"http://ollama chat": True}
+
+        ollama.preload = AsyncMock(side_effect=slow_preload)
+        warmup = WarmupService(ollama, MagicMock(), settings)
+        warmup.start()
+        await asyncio.sleep(0)
+
+        assert not warmup.ready
+        release.set()
+        await asyncio.wait_for(warmup.wait_ready(), 1)
+
+        assert warmup.stats()["models_loaded"] == 1
+        await warmup.aclose()
+
+    async def test_disabled_is_ready_immediately(self, settings: Settings, ollama: MagicMock):
+        """Should skip warm-up entirely when disabled."""
+        settings.warmup_enabled = False
+        warmup = WarmupService(ollama, MagicMock(), settings)
+
+        warmup.start()
+
+        assert warmup.ready
+        ollama.preload.assert_not_called()
+
+    async def test_ready_even_if_warm_up_fails(self, settings: Settings, ollama: MagicMock):
+        """Should become ready when warm-up errors or times out."""
+        settings.warmup_timeout = 0.01
+
+        async def hanging_preload() -> dict[str, bool]:
+            await asyncio.sleep(1)
+            return {}
+
+        ollama.preload = AsyncMock(side_effect=hanging_preload)
+        warmup = WarmupService(ollama, MagicMock(), settings)
+
+        warmup.start()
+        await asyncio.wait_for(warmup.wait_ready(), 1)
+
+        assert warmup.ready
+        await warmup.aclose()
+
+    async def test_pings_keep_models_loaded(self, settings: Settings, ollama: MagicMock):
+        """Should re-send the preload every ping interval."""
+        settings.warmup_ping_interval = 0.01
+        warmup = WarmupService(ollama, MagicMock(), settings)
+
+        warmup.start()
+        await asyncio.sleep(0.05)
+        await warmup.aclose()
+
+        assert warmup.pings >= 2
+        assert ollama.preload.await_count == warmup.pings + 1
+
+    async def test_prewarms_hot_relations(self, settings: Settings, ollama: MagicMock):
+        """Should pg_prewarm the vector index and hot tables."""
+        settings.warmup_pg_prewarm = True
+        session = MagicMock()
+        session.scalar.return_value = 42
+        warmup = WarmupService(ollama, lambda: session, settings)
+
+        await warmup.warm_up()
+
+        assert warmup.prewarmed_blocks["kb_embedding_hnsw"] == 42
+        assert warmup.stats()["prewarmed_blocks"] == 42 * len(WarmupService.PREWARM_RELATIONS)
+        session.close.assert_called_once()